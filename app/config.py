@@ -3,8 +3,9 @@
 import os
 import logging
 from pathlib import Path
-from typing import Optional
+from typing import Dict, Optional
 from functools import lru_cache
+from pydantic import BaseModel
 from pydantic_settings import BaseSettings
 
 logger = logging.getLogger(__name__)
@@ -13,6 +14,16 @@ logger = logging.getLogger(__name__)
 PROJECT_ROOT = Path(__file__).parent.parent
 
 
+class ModelRoute(BaseModel):
+    """Model, limits and latency SLO for one kind of AI request"""
+
+    model: Optional[str] = None  # Defaults to OPENAI_MODEL
+    max_tokens: Optional[int] = None  # Completion limit per answer/summary; defaults to the method's own
+    timeout: Optional[float] = None  # Seconds per call; defaults to OPENAI_TIMEOUT
+    latency_slo: Optional[float] = None  # Seconds; slower calls shift the route to fallback_model
+    fallback_model: Optional[str] = None  # Defaults to OPENAI_FALLBACK_MODEL
+
+
 class Settings(BaseSettings):
     """Application settings from environment variables"""
 
@@ -38,18 +49,110 @@ class Settings(BaseSettings):
         "https://www.googleapis.com/auth/gmail.readonly",
         "https://www.googleapis.com/auth/gmail.send",
     ]
+    GMAIL_API_BASE: Optional[str] = None  # Override the Gmail API endpoint (skips OAuth, for local stand-ins)
+    GMAIL_FETCH_CONCURRENCY: int = 8  # Parallel messages.get or batch requests
+    GMAIL_BATCH_SIZE: int = 50  # Messages per batch HTTP request (max 100; 0 or 1 fetches one by one)
+    GMAIL_BATCH_RETRIES: int = 3  # Retries for messages that failed with a rate-limit or server error
+    GMAIL_BATCH_RETRY_DELAY: float = 0.5  # First retry backoff in seconds, doubled per retry
+    GMAIL_SUMMARY_CONCURRENCY: int = 4  # Parallel batched summary requests per sweep
+    EMAIL_BACKFILL_INTERVAL: int = 600  # Seconds between sweeps for stored emails missing a summary or priority
+    EMAIL_BACKFILL_BATCH: int = 50  # Emails enriched per backfill sweep
 
     # Telegram
     TELEGRAM_BOT_TOKEN: str = ""  # Required - set in Railway Variables
+    TELEGRAM_API_BASE: str = "https://api.telegram.org"
     TELEGRAM_WEBHOOK_URL: Optional[str] = None
     TELEGRAM_WEBHOOK_SECRET: str = "your-secret-key"
     TELEGRAM_USER_ID: int = 0  # Required - set in Railway Variables
+    TELEGRAM_MODE: str = "webhook"  # "webhook" or "polling" (getUpdates, no public URL needed)
+    TELEGRAM_POLL_TIMEOUT: int = 30  # Long-polling timeout in seconds
+    TELEGRAM_POLL_LIMIT: int = 100  # Updates fetched per getUpdates call
+    TELEGRAM_POOL_LIMIT: int = 100  # Max open connections in the shared pool
+    TELEGRAM_POOL_LIMIT_PER_HOST: int = 30
+    TELEGRAM_DNS_CACHE_TTL: int = 300  # seconds
+    TELEGRAM_KEEPALIVE_TIMEOUT: float = 60.0  # seconds
+    TELEGRAM_REQUEST_TIMEOUT: float = 30.0  # seconds
+
+    # Update processing (webhook worker pool)
+    UPDATE_WORKERS: int = 4
+    UPDATE_QUEUE_SIZE: int = 100  # Max queued updates across all workers
+    UPDATE_ENQUEUE_TIMEOUT: float = 2.0  # seconds to wait before returning 503
+    UPDATE_DRAIN_TIMEOUT: float = 10.0  # seconds to drain the queue on shutdown
+    UPDATE_DEDUP_WINDOW: int = 10000  # Recent update IDs remembered for deduplication
+    MESSAGE_FLUSH_SIZE: int = 50  # Buffered messages that trigger a database write
+    MESSAGE_FLUSH_INTERVAL: float = 1.0  # Max seconds a message waits to be written
+    MESSAGE_WRITE_RETRIES: int = 5  # Failed flushes before a message row is dropped
+
+    # Outbound send queue (Telegram rate limits)
+    SEND_WORKERS: int = 4
+    SEND_QUEUE_SIZE: int = 1000  # Messages beyond this are dropped
+    TELEGRAM_GLOBAL_RATE: float = 30.0  # messages/second across all chats
+    TELEGRAM_CHAT_RATE: float = 1.0  # messages/second per chat
+    TELEGRAM_CHAT_BURST: float = 3.0
 
     # OpenAI
     OPENAI_API_KEY: str = ""  # Required - set in Railway Variables
+    OPENAI_BASE_URL: Optional[str] = None  # Override the OpenAI API endpoint
     OPENAI_MODEL: str = "gpt-3.5-turbo"
     OPENAI_TEMPERATURE: float = 0.7
     OPENAI_MAX_TOKENS: int = 1000
+    OPENAI_TIMEOUT: float = 30.0  # seconds per completion call
+    OPENAI_MAX_CONCURRENCY: int = 8  # Max simultaneous OpenAI requests
+    OPENAI_FALLBACK_MODEL: Optional[str] = None  # Faster model used while a route misses its latency SLO
+    # Per-method routing (JSON in the environment replaces the whole table)
+    MODEL_ROUTES: Dict[str, ModelRoute] = {
+        "classify": ModelRoute(latency_slo=3.0),
+        "summarize": ModelRoute(latency_slo=10.0),
+        "reply": ModelRoute(latency_slo=15.0),
+        "answer": ModelRoute(latency_slo=10.0),  # Time to first token when streaming
+        "daily_summary": ModelRoute(latency_slo=10.0),
+        "conversation_summary": ModelRoute(latency_slo=15.0),
+    }
+    MODEL_SLO_PERCENTILE: float = 90.0  # Recent-latency percentile compared with a route's SLO
+    MODEL_SLO_MIN_SAMPLES: int = 5  # Primary-model calls needed before the SLO is checked
+    MODEL_FALLBACK_COOLDOWN: float = 120.0  # Seconds on the fallback model before the primary is tried again
+    LLM_LEDGER_ENABLED: bool = True  # Record model, tokens, latency and outcome of every completion
+    LLM_LEDGER_FLUSH_SIZE: int = 100  # Buffered calls that trigger a database write
+    LLM_LEDGER_FLUSH_INTERVAL: float = 5.0  # Max seconds a call waits to be written
+    SINGLE_FLIGHT_ENABLED: bool = True  # Share one upstream call among identical concurrent requests
+    ANSWER_CACHE_ENABLED: bool = True  # Reuse answers to repeated questions
+    ANSWER_CACHE_TTL: int = 86400  # seconds
+    ANSWER_CACHE_MEMORY_SIZE: int = 1000  # In-memory LRU entries
+    ANSWER_CACHE_MAX_ROWS: int = 10000  # SQLite tier size
+    SEMANTIC_CACHE_ENABLED: bool = False  # Also reuse answers to paraphrased questions (off until checked on a paraphrase set)
+    SEMANTIC_CACHE_THRESHOLD: float = 0.85  # Minimum cosine similarity for a hit
+    SEMANTIC_CACHE_SIZE: int = 10000  # Questions kept in the similarity index
+    SEMANTIC_CACHE_DIM: int = 256  # Hashed embedding size
+    CONVERSATION_MEMORY_ENABLED: bool = True  # Send recent turns with questions so follow-ups work
+    CONVERSATION_MAX_USERS: int = 1000  # Conversations kept in memory
+    CONVERSATION_MAX_TURNS: int = 20  # Turns kept per conversation
+    CONVERSATION_TOKEN_BUDGET: int = 1000  # Max estimated tokens of recent turns per question
+    CONVERSATION_IDLE_TIMEOUT: int = 1800  # Seconds of silence before questions stand alone again
+    CONVERSATION_SUMMARY_MIN_TOKENS: int = 150  # Older-turn tokens that trigger a summary update
+    CONVERSATION_SUMMARY_MAX_TOKENS: int = 200  # Max length of the rolling summary
+    EMAIL_SUMMARY_BATCH_TOKENS: int = 3000  # Estimated input tokens per batched summary request
+    EMAIL_SUMMARY_BATCH_SIZE: int = 10  # Max emails per batched summary request
+    EMAIL_SUMMARY_TOKEN_BUDGET: int = 1000  # Max estimated body tokens sent per email summary
+    TEXT_SUMMARY_TOKEN_BUDGET: int = 1000  # Max estimated tokens sent by summarize_text
+    EMAIL_PRIORITY_TOKEN_BUDGET: int = 300  # Max estimated body tokens sent for classification
+    PRIORITY_CLASSIFIER_ENABLED: bool = True  # Classify priority locally before asking the LLM
+    PRIORITY_CLASSIFIER_THRESHOLD: float = 0.9  # Min local confidence to skip the LLM, until calibrated
+    PRIORITY_SHADOW_RATE: float = 0.1  # Share of confident local predictions also checked with the LLM
+    PRIORITY_TARGET_AGREEMENT: float = 0.95  # Measured LLM agreement required to answer locally
+    PRIORITY_CALIBRATION_MIN_SAMPLES: int = 50  # LLM comparisons needed to measure the threshold
+    PRIORITY_CLASSIFIER_MIN_SAMPLES: int = 50  # LLM-labelled emails needed before local predictions are used
+    PRIORITY_CLASSIFIER_DIM: int = 16384  # Hashed feature buckets
+    STREAM_ANSWERS: bool = True  # Stream Q&A answers into Telegram via message edits
+    STREAM_EDIT_INTERVAL: float = 1.0  # Minimum seconds between streaming edits
+
+    # Upstream resilience (circuit breakers, deadlines, hedged requests)
+    UPDATE_DEADLINE: float = 25.0  # Seconds all upstream calls for one Telegram update may take
+    REALTIME_TIMEOUT: float = 10.0  # seconds per stock/crypto/weather request
+    CIRCUIT_FAILURE_THRESHOLD: int = 5  # Consecutive failures that open a dependency's circuit
+    CIRCUIT_RESET_TIMEOUT: float = 30.0  # Seconds an open circuit fails fast before probing
+    HEDGE_PERCENTILE: float = 95.0  # Latency percentile after which a hedged request is sent
+    HEDGE_MIN_SAMPLES: int = 20  # Successful calls needed before hedging starts
+    OPENAI_HEDGE_ENABLED: bool = False  # Also hedge completions (can double token spend)
 
     # Scheduler
     SCHEDULER_ENABLED: bool = True
@@ -66,6 +169,9 @@ class Settings(BaseSettings):
     LOG_FILE: Path = PROJECT_ROOT / "logs" / "bot.log"
     LOG_FORMAT: str = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
 
+    # Metrics
+    METRICS_ENABLED: bool = True  # Per-stage latency histograms served at /metrics
+
     # Retry settings
     MAX_RETRIES: int = 3
     RETRY_DELAY: int = 5  # seconds
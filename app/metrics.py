@@ -0,0 +1,206 @@
+"""Lightweight latency metrics with Prometheus text exposition"""
+
+import time
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar
+from typing import Optional, Callable, Dict, List, Tuple, Iterator
+
+from app.config import get_settings
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+class Histogram:
+    """Cumulative-bucket histogram keyed by label values"""
+
+    def __init__(
+        self,
+        name: str,
+        description: str,
+        label_names: Tuple[str, ...],
+        buckets: Tuple[float, ...] = DEFAULT_BUCKETS,
+    ):
+        """
+        Initialize histogram
+
+        Args:
+            name: Metric name
+            description: Help text
+            label_names: Names of the labels every observation carries
+            buckets: Upper bounds of the histogram buckets
+        """
+        self.name = name
+        self.description = description
+        self.label_names = label_names
+        self.buckets = buckets
+        # label values -> [bucket counts..., sum, count]
+        self._series: Dict[Tuple[str, ...], List[float]] = {}
+
+    def observe(self, value: float, **labels: str):
+        """
+        Record an observation
+
+        Args:
+            value: Observed value (seconds for latency)
+            **labels: Label values
+        """
+        key = tuple(str(labels.get(name, "")) for name in self.label_names)
+        series = self._series.get(key)
+        if series is None:
+            series = self._series[key] = [0.0] * (len(self.buckets) + 2)
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                series[i] += 1
+        series[-2] += value
+        series[-1] += 1
+
+    def render(self) -> List[str]:
+        """Render the histogram in Prometheus text format"""
+        lines = [
+            f"# HELP {self.name} {self.description}",
+            f"# TYPE {self.name} histogram",
+        ]
+        for key, series in sorted(self._series.items()):
+            labels = ",".join(f'{n}="{v}"' for n, v in zip(self.label_names, key))
+            for bound, count in zip(self.buckets, series):
+                lines.append(f'{self.name}_bucket{{{labels},le="{bound}"}} {int(count)}')
+            lines.append(f'{self.name}_bucket{{{labels},le="+Inf"}} {int(series[-1])}')
+            lines.append(f"{self.name}_sum{{{labels}}} {series[-2]:.6f}")
+            lines.append(f"{self.name}_count{{{labels}}} {int(series[-1])}")
+        return lines
+
+
+STAGE_SECONDS = Histogram(
+    "bot_stage_duration_seconds",
+    "Time spent in each request pipeline stage",
+    ("pipeline", "stage", "action"),
+)
+
+# name -> (help text, metric type, callback returning the current value)
+_gauges: Dict[str, Tuple[str, str, Callable[[], float]]] = {}
+
+
+def register_gauge(
+    name: str,
+    description: str,
+    callback: Callable[[], float],
+    metric_type: str = "gauge",
+):
+    """
+    Register a metric whose value is read when metrics are rendered
+
+    Args:
+        name: Metric name
+        description: Help text
+        callback: Function returning the current value
+        metric_type: Prometheus type ("gauge" or "counter")
+    """
+    _gauges[name] = (description, metric_type, callback)
+
+
+class PipelineTimer:
+    """Collects stage durations for one request until its action is known"""
+
+    def __init__(self, pipeline: str):
+        """
+        Initialize pipeline timer
+
+        Args:
+            pipeline: Pipeline name (e.g. webhook, command)
+        """
+        self.pipeline = pipeline
+        self.action = "unknown"
+        self._stages: List[Tuple[str, float]] = []
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        """Time a stage of the pipeline"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._stages.append((name, time.perf_counter() - started))
+
+    def finish(self):
+        """Record all stage durations labelled with the final action"""
+        for name, seconds in self._stages:
+            STAGE_SECONDS.observe(
+                seconds, pipeline=self.pipeline, stage=name, action=self.action
+            )
+
+
+_current_timer: ContextVar[Optional[PipelineTimer]] = ContextVar(
+    "current_timer", default=None
+)
+
+
+@contextmanager
+def track_pipeline(pipeline: str) -> Iterator[Optional[PipelineTimer]]:
+    """
+    Time a request pipeline; stages inside it are recorded with stage()
+
+    Does nothing when METRICS_ENABLED is off.
+
+    Args:
+        pipeline: Pipeline name
+
+    Yields:
+        Pipeline timer, or None when metrics are disabled
+    """
+    if not get_settings().METRICS_ENABLED:
+        yield None
+        return
+
+    timer = PipelineTimer(pipeline)
+    token = _current_timer.set(timer)
+    try:
+        with timer.stage("total"):
+            yield timer
+    finally:
+        _current_timer.reset(token)
+        timer.finish()
+
+
+def stage(name: str):
+    """
+    Time a stage of the current pipeline (no-op outside a pipeline)
+
+    Args:
+        name: Stage name (e.g. parse_command, gmail, send_message)
+
+    Returns:
+        Context manager timing the stage
+    """
+    timer = _current_timer.get()
+    return timer.stage(name) if timer else nullcontext()
+
+
+def set_action(action: str):
+    """
+    Set the action label of the current pipeline
+
+    Args:
+        action: Parsed action (e.g. get_stock_price, read_emails)
+    """
+    timer = _current_timer.get()
+    if timer:
+        timer.action = action
+
+
+def render_prometheus() -> str:
+    """
+    Render all metrics in Prometheus text format
+
+    Returns:
+        Metrics exposition text
+    """
+    lines = STAGE_SECONDS.render()
+    for name, (description, metric_type, callback) in sorted(_gauges.items()):
+        try:
+            value = float(callback())
+        except Exception:
+            continue
+        lines.append(f"# HELP {name} {description}")
+        lines.append(f"# TYPE {name} {metric_type}")
+        lines.append(f"{name} {value}")
+    return "\n".join(lines) + "\n"
@@ -1,6 +1,15 @@
 """Models package for database and API schemas"""
 
-from .database import Base, Task, Email, Message, ScheduledJob
+from .database import (
+    Base,
+    Task,
+    Email,
+    Message,
+    ScheduledJob,
+    BotState,
+    AnswerCacheEntry,
+    LLMCall,
+)
 from .schemas import (
     TaskCreate,
     TaskUpdate,
@@ -16,6 +25,9 @@ __all__ = [
     "Email",
     "Message",
     "ScheduledJob",
+    "BotState",
+    "AnswerCacheEntry",
+    "LLMCall",
     "TaskCreate",
     "TaskUpdate",
     "EmailSchema",
@@ -2,7 +2,9 @@
 
 from datetime import datetime
 from typing import Optional
-from sqlalchemy import create_engine, Column, String, Integer, DateTime, Text, Boolean, Enum
+from sqlalchemy import (
+    create_engine, inspect, text, Column, String, Integer, DateTime, Text, Boolean, Enum, Index
+)
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 import enum
@@ -67,6 +69,7 @@ class Email(Base):
     body = Column(Text, nullable=False)
     summary = Column(Text, nullable=True)
     priority = Column(Enum(EmailPriority), default=EmailPriority.MEDIUM)
+    priority_source = Column(String(20), nullable=True)  # "llm" or "local" once classified
     is_unread = Column(Boolean, default=True)
     is_replied = Column(Boolean, default=False)
     received_at = Column(DateTime, nullable=False)
@@ -81,9 +84,13 @@ class Message(Base):
     """Telegram message model"""
 
     __tablename__ = "messages"
+    # Telegram message IDs are only unique within one chat
+    __table_args__ = (
+        Index("ix_messages_user_message", "user_id", "telegram_message_id", unique=True),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
-    telegram_message_id = Column(String(255), unique=True, index=True)
+    telegram_message_id = Column(String(255), index=True)
     user_id = Column(Integer, nullable=False)
     text = Column(Text, nullable=False)
     command = Column(String(255), nullable=True)
@@ -116,6 +123,53 @@ class ScheduledJob(Base):
         return f"<ScheduledJob(id={self.id}, name={self.name}, type={self.job_type})>"
 
 
+class BotState(Base):
+    """Key-value store for bot runtime state (e.g. polling offsets)"""
+
+    __tablename__ = "bot_state"
+
+    key = Column(String(100), primary_key=True)
+    value = Column(Text, nullable=True)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def __repr__(self):
+        return f"<BotState(key={self.key}, value={self.value})>"
+
+
+class AnswerCacheEntry(Base):
+    """Cached AI answer for a normalized question"""
+
+    __tablename__ = "answer_cache"
+
+    key = Column(String(64), primary_key=True)  # sha256 of question + model settings
+    question = Column(Text, nullable=False)
+    answer = Column(Text, nullable=False)
+    model = Column(String(100), nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow, index=True)
+    expires_at = Column(DateTime, nullable=False, index=True)
+
+    def __repr__(self):
+        return f"<AnswerCacheEntry(key={self.key[:8]}, question={self.question[:50]})>"
+
+
+class LLMCall(Base):
+    """One chat completion request, for the append-only LLM usage ledger"""
+
+    __tablename__ = "llm_calls"
+
+    id = Column(Integer, primary_key=True)
+    created_at = Column(DateTime, default=datetime.utcnow, index=True)
+    method = Column(String(30), nullable=False)  # MODEL_ROUTES route, e.g. "classify"
+    model = Column(String(100), nullable=False)
+    prompt_tokens = Column(Integer, nullable=True)
+    completion_tokens = Column(Integer, nullable=True)
+    latency_ms = Column(Integer, nullable=False)
+    outcome = Column(String(20), nullable=False)  # ok, timeout, error, rejected, cancelled
+
+    def __repr__(self):
+        return f"<LLMCall(id={self.id}, method={self.method}, outcome={self.outcome})>"
+
+
 # Database engine and session
 engine = create_engine(
     settings.DATABASE_URL, connect_args={"check_same_thread": False}
@@ -135,3 +189,69 @@ def get_db():
 def init_db():
     """Initialize database tables"""
     Base.metadata.create_all(bind=engine)
+    _add_missing_columns()
+    _sync_indexes()
+
+
+def _add_missing_columns():
+    """Add nullable columns that were introduced after a table was created"""
+    inspector = inspect(engine)
+    with engine.begin() as connection:
+        for table in Base.metadata.sorted_tables:
+            existing = {column["name"] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in existing or not column.nullable:
+                    continue
+                column_type = column.type.compile(dialect=engine.dialect)
+                connection.execute(
+                    text(f"ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}")
+                )
+
+
+def _sync_indexes():
+    """Create indexes added after a table was created, rebuilding ones whose uniqueness changed"""
+    inspector = inspect(engine)
+    with engine.begin() as connection:
+        for table in Base.metadata.sorted_tables:
+            existing = {
+                index["name"]: bool(index["unique"]) for index in inspector.get_indexes(table.name)
+            }
+            for index in table.indexes:
+                if existing.get(index.name) == bool(index.unique):
+                    continue
+                if index.name in existing:
+                    index.drop(connection)
+                index.create(connection)
+
+
+def get_state(db, key: str, default: Optional[str] = None) -> Optional[str]:
+    """
+    Read a value from the bot_state table
+
+    Args:
+        db: Database session
+        key: State key
+        default: Value returned when the key is not set
+
+    Returns:
+        Stored value or default
+    """
+    state = db.get(BotState, key)
+    return state.value if state else default
+
+
+def set_state(db, key: str, value: str) -> None:
+    """
+    Write a value to the bot_state table and commit
+
+    Args:
+        db: Database session
+        key: State key
+        value: Value to store
+    """
+    state = db.get(BotState, key)
+    if state:
+        state.value = value
+    else:
+        db.add(BotState(key=key, value=value))
+    db.commit()
@@ -1,7 +1,7 @@
 """Email management router"""
 
 import logging
-from typing import List
+from typing import List, Optional
 from fastapi import APIRouter, HTTPException, Depends
 from sqlalchemy.orm import Session
 
@@ -9,14 +9,17 @@ from app.config import get_settings
 from app.models.schemas import EmailSchema
 from app.models.database import get_db, Email
 from app.services.gmail_service import GmailService
-from app.services.ai_service import AIService
+from app.services.ai_service import get_ai_service
+from app.services.email_ingest import get_email_ingest, summary_or_preview
+from app.services.priority_classifier import get_priority_classifier
+from app.services.text_reducer import reduction_stats
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/email", tags=["email"])
 
 settings = get_settings()
 gmail_service = GmailService()
-ai_service = AIService()
+ai_service = get_ai_service()
 
 
 @router.get("/unread", response_model=List[EmailSchema])
@@ -40,29 +43,11 @@ async def get_unread_emails(
         )
     
     try:
-        emails = gmail_service.get_unread_emails(
-            max_results=limit, summary_ai=ai_service
+        # Stored emails are served as is; new ones are summarized and classified once
+        emails, _ = await get_email_ingest().get_unread(
+            gmail_service, ai_service, max_results=limit
         )
 
-        # Save to database
-        for email_data in emails:
-            existing = db.query(Email).filter(
-                Email.gmail_id == email_data["gmail_id"]
-            ).first()
-
-            if not existing:
-                email = Email(
-                    gmail_id=email_data["gmail_id"],
-                    sender=email_data["sender"],
-                    subject=email_data["subject"],
-                    body=email_data["body"],
-                    summary=email_data.get("summary"),
-                    received_at=email_data["received_at"],
-                )
-                db.add(email)
-
-        db.commit()
-
         return emails
 
     except Exception as e:
@@ -82,7 +67,7 @@ async def get_inbox_emails(limit: int = 20) -> List[EmailSchema]:
         List of inbox emails
     """
     try:
-        return gmail_service.get_email_by_label("INBOX", max_results=limit)
+        return await gmail_service.get_email_by_label("INBOX", max_results=limit)
     except Exception as e:
         logger.error(f"Error fetching inbox: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -152,14 +137,18 @@ async def create_draft(recipient: str, subject: str, body: str) -> dict:
 @router.get("/summary/{email_id}")
 async def get_email_summary(email_id: int, db: Session = Depends(get_db)) -> dict:
     """
-    Get or generate summary for an email
+    Get the stored summary for an email
+
+    Summaries are computed when emails are ingested; an email stored
+    without one is completed by the backfill step first. If that fails
+    too, the start of the body is returned and summarized is false.
 
     Args:
         email_id: Email ID in database
         db: Database session
 
     Returns:
-        Email summary
+        Email summary and priority
     """
     try:
         email = db.query(Email).filter(Email.id == email_id).first()
@@ -168,13 +157,15 @@ async def get_email_summary(email_id: int, db: Session = Depends(get_db)) -> dic
             raise HTTPException(status_code=404, detail="Email not found")
 
         if not email.summary:
-            email.summary = ai_service.summarize_email(email.subject, email.body)
-            db.commit()
+            await get_email_ingest().backfill(ai_service, email_ids=[email.id])
+            db.refresh(email)
 
         return {
             "id": email.id,
             "subject": email.subject,
-            "summary": email.summary,
+            "summary": summary_or_preview({"summary": email.summary, "body": email.body}),
+            "summarized": bool(email.summary),
+            "priority": email.priority.value if email.priority else None,
         }
 
     except Exception as e:
@@ -215,3 +206,72 @@ async def get_email_labels() -> dict:
     return {
         "labels": ["INBOX", "STARRED", "SENT", "DRAFT", "SPAM", "TRASH", "ALL_MAIL"]
     }
+
+
+@router.get("/token-savings")
+async def get_token_savings() -> dict:
+    """
+    Get how many tokens email pre-processing removed before LLM calls
+
+    Returns:
+        Estimated tokens in, out and saved per AI method
+    """
+    return reduction_stats()
+
+
+@router.get("/priority-classifier")
+async def get_priority_classifier_status() -> dict:
+    """
+    Get local priority classifier status
+
+    Returns:
+        Training size, agreement rate with the LLM, measured threshold and
+        prediction latency
+    """
+    stats = get_priority_classifier().stats()
+    stats["enabled"] = settings.PRIORITY_CLASSIFIER_ENABLED
+    stats["shadow_rate"] = settings.PRIORITY_SHADOW_RATE
+    return stats
+
+
+@router.post("/priority-classifier/retrain")
+async def retrain_priority_classifier() -> dict:
+    """
+    Learn LLM-labelled emails stored since the last training run
+
+    Returns:
+        Number of emails learned and updated classifier status
+    """
+    learned = await get_priority_classifier().retrain()
+    return {"learned": learned, **get_priority_classifier().stats()}
+
+
+@router.get("/ingest")
+async def get_ingest_status() -> dict:
+    """
+    Get email ingest status
+
+    Returns:
+        Ingest counters and the number of stored emails awaiting backfill
+    """
+    ingest = get_email_ingest()
+    return {**ingest.stats(), "pending_backfill": await ingest.pending()}
+
+
+@router.post("/backfill")
+async def backfill_emails(limit: Optional[int] = None) -> dict:
+    """
+    Summarize and classify stored emails missing a summary or priority
+
+    Args:
+        limit: Maximum emails to process (EMAIL_BACKFILL_BATCH if None)
+
+    Returns:
+        Number of emails processed
+    """
+    try:
+        processed = await get_email_ingest().backfill(ai_service, limit=limit)
+        return {"processed": processed, **get_email_ingest().stats()}
+    except Exception as e:
+        logger.error(f"Error backfilling emails: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
@@ -14,6 +14,7 @@ from app.workers.tasks import (
     check_emails,
     send_daily_summary,
     process_scheduled_tasks,
+    backfill_emails,
 )
 
 logger = logging.getLogger(__name__)
@@ -202,6 +203,8 @@ async def run_job_now(job_id: str) -> dict:
             result = await check_emails()
         elif job_id == "daily_summary":
             result = await send_daily_summary()
+        elif job_id == "email_backfill":
+            result = await backfill_emails()
         else:
             result = {"status": "unknown_job"}
 
@@ -1,23 +1,37 @@
 """Telegram bot webhook and message handler router"""
 
 import logging
+from typing import Optional
 from fastapi import APIRouter, HTTPException, Depends
+from pydantic import ValidationError
 from sqlalchemy.orm import Session
 
 from app.config import get_settings
+from app.metrics import track_pipeline, stage, set_action
 from app.models.schemas import TelegramUpdate, CommandRequest
-from app.models.database import get_db, Message
+from app.models.database import get_db, SessionLocal
 from app.services.telegram_service import TelegramService
-from app.services.ai_service import AIService
+from app.services.ai_service import get_ai_service
 from app.services.gmail_service import GmailService
 from app.services.realtime_service import RealtimeService
+from app.services.send_queue import get_send_queue
+from app.services.answer_cache import get_answer_cache
+from app.services.conversation_store import get_conversation_store
+from app.services.email_ingest import get_email_ingest, summary_or_preview
+from app.services.llm_ledger import get_llm_ledger
+from app.services.model_router import get_model_router
+from app.services.resilience import CircuitOpenError, DeadlineExceeded, deadline, get_dependency
+from app.services.semantic_cache import get_semantic_cache
+from app.workers.update_queue import get_update_queue
+from app.workers.update_dedup import get_update_dedup
+from app.workers.message_writer import get_message_writer
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/telegram", tags=["telegram"])
 
 settings = get_settings()
 telegram_service = TelegramService()
-ai_service = AIService()
+ai_service = get_ai_service()
 realtime_service = RealtimeService()
 
 # Initialize Gmail service with explicit logging
@@ -36,63 +50,133 @@ else:
     logger.info("Gmail is disabled in settings")
 
 
+# Slash commands handled by _handle_command (others are labelled /unknown in metrics)
+KNOWN_COMMANDS = {"start", "emails", "tasks", "summary", "fresh", "help"}
+
+
+class StreamedReply(str):
+    """Response text that was already delivered by streaming edits"""
+
+
 @router.post("/webhook")
 async def telegram_webhook(update: dict, db: Session = Depends(get_db)):
     """
     Telegram webhook endpoint for receiving messages
 
+    The update is validated and queued for the background worker pool,
+    and Telegram is acknowledged immediately.
+
     Args:
         update: Telegram update object
         db: Database session
     """
     try:
-        logger.info(f"Received Telegram update: {update}")
+        TelegramUpdate.model_validate(update)
+    except ValidationError as e:
+        logger.warning(f"Invalid Telegram update: {e}")
+        raise HTTPException(status_code=400, detail="Invalid Telegram update")
+
+    update_id = update["update_id"]
+    logger.info(f"Received Telegram update: {update_id}")
+
+    # Telegram redelivers slow updates - drop repeats before doing any work
+    dedup = get_update_dedup()
+    if not dedup.accept(update_id):
+        return {"status": "duplicate"}
+
+    if not update.get("message", {}).get("text"):
+        # Non-text updates (edits, stickers, joins...) are acknowledged and ignored
+        return {"status": "ignored"}
+
+    queue = get_update_queue()
+    if queue is None or not queue.running:
+        # No worker pool (e.g. running without lifespan) - process inline
+        try:
+            await process_update(update, db)
+        except Exception as e:
+            # The 500 makes Telegram redeliver, which must not look like a repeat
+            dedup.forget(update_id)
+            raise HTTPException(status_code=500, detail=str(e))
+        return {"status": "ok"}
 
-        # Parse the message
-        message_data = telegram_service.parse_message(update)
-        
-        logger.info(f"Parsed message data: {message_data}")
-
-        # Save message to database
-        msg = Message(
-            telegram_message_id=str(message_data["message_id"]),
-            user_id=message_data["user_id"],
-            text=message_data["text"],
-            command=message_data["command"],
-            is_command=message_data["is_command"],
-        )
-        db.add(msg)
-        db.commit()
-
-        # Process based on message type
-        if message_data["is_command"]:
-            logger.info(f"Processing as command: {message_data['command']}")
-            response = await _handle_command(
-                message_data["command"],
-                message_data["text"],
-                message_data["user_id"],
-                db,
-            )
-        else:
-            response = await _handle_natural_language(
-                message_data["text"],
-                message_data["user_id"],
-                db,
-            )
+    if not await queue.submit(update):
+        # Non-2xx makes Telegram redeliver later, which is our backpressure
+        dedup.forget(update_id)
+        raise HTTPException(status_code=503, detail="Update queue is full")
 
-        # Send response
-        if response:
-            await telegram_service.send_message(response, message_data["user_id"])
+    return {"status": "queued"}
 
-        # Update message with response
-        msg.response = response
-        db.commit()
 
-        return {"status": "ok"}
+async def process_update(update: dict, db: Optional[Session] = None) -> None:
+    """
+    Process a Telegram update and send the response
+
+    Runs in the update worker pool, so it opens its own database session
+    unless one is passed in.
+
+    Args:
+        update: Telegram update object
+        db: Optional database session
+    """
+    owns_session = db is None
+    if owns_session:
+        db = SessionLocal()
+
+    try:
+        with track_pipeline("webhook"):
+            # Parse the message
+            with stage("parse_message"):
+                message_data = telegram_service.parse_message(update)
+
+            logger.info(f"Parsed message data: {message_data}")
+
+            # Save message to database (batched by the write-behind buffer)
+            writer = get_message_writer()
+            with stage("db_insert"):
+                writer.record_message(message_data)
+
+            # Process based on message type; upstream calls share one deadline
+            try:
+                with deadline(settings.UPDATE_DEADLINE):
+                    if message_data["is_command"]:
+                        command = message_data["command"]
+                        logger.info(f"Processing as command: {command}")
+                        set_action(f"/{command}" if command in KNOWN_COMMANDS else "/unknown")
+                        with stage("handler"):
+                            response = await _handle_command(
+                                command,
+                                message_data["text"],
+                                message_data["user_id"],
+                                db,
+                            )
+                    else:
+                        with stage("handler"):
+                            response = await _handle_natural_language(
+                                message_data["text"],
+                                message_data["user_id"],
+                                db,
+                            )
+            except CircuitOpenError as e:
+                response = f"❌ {e}"
+            except DeadlineExceeded:
+                response = "❌ That took too long. Please try again in a moment."
+
+            # Send response (streamed answers have already been delivered)
+            if response and not isinstance(response, StreamedReply):
+                with stage("send_message"):
+                    await telegram_service.send_message(response, message_data["user_id"])
+
+            # Update message with response
+            writer.record_response(message_data["user_id"], message_data["message_id"], response)
 
     except Exception as e:
-        logger.error(f"Error processing telegram webhook: {e}")
-        raise HTTPException(status_code=500, detail=str(e))
+        logger.error(f"Error processing telegram update: {e}")
+        db.rollback()
+        raise
+
+    finally:
+        if owns_session:
+            db.close()
 
 
 async def _handle_command(
@@ -127,24 +211,19 @@ Available commands:
 /tasks - Show pending tasks
 /schedule - Schedule a task
 /summary - Get daily summary
+/fresh - Ask a question, skipping cached answers
 /help - Show this message"""
 
     elif command == "emails":
         if not gmail_service or not gmail_service.service:
             return "📧 Email service not configured. Please set up Gmail OAuth first."
         
-        emails = gmail_service.get_unread_emails(max_results=5)
-        
-        if not emails:
-            return "📭 No unread emails found!"
-        
-        response = f"📧 <b>Unread Emails ({len(emails)})</b>\n\n"
-        for i, email in enumerate(emails, 1):
-            sender = email.get('sender', 'Unknown')[:30]
-            subject = email.get('subject', 'No Subject')[:40]
-            response += f"{i}. <b>From:</b> {sender}\n   <b>Subject:</b> {subject}\n\n"
+        with stage("gmail"):
+            emails, _ = await get_email_ingest().get_unread(
+                gmail_service, ai_service, max_results=5
+            )
         
-        return response
+        return _format_unread_emails(emails)
 
     elif command == "tasks":
         from app.models.database import Task, TaskStatus
@@ -167,6 +246,12 @@ Available commands:
         result = await send_daily_summary(ai_service)
         return "📊 Daily summary sent!"
 
+    elif command == "fresh":
+        question = text.partition(" ")[2].strip()
+        if not question:
+            return "❓ Usage: /fresh your question - answers without using cached replies"
+        return await _answer_question(question, user_id, fresh=True)
+
     elif command == "help":
         return "Use /start to see available commands"
 
@@ -180,10 +265,12 @@ async def _handle_natural_language(text: str, user_id: int, db: Session) -> str:
         logger.info(f"Handling natural language message: '{text}' from user {user_id}")
         
         # Parse the command using AI
-        parsed = ai_service.parse_command(text)
+        with stage("parse_command"):
+            parsed = ai_service.parse_command(text)
 
         action = parsed.get("action", "unknown")
         parameters = parsed.get("parameters", {})
+        set_action(action)
         
         logger.info(f"Parsed action: {action}, parameters: {parameters}")
 
@@ -191,18 +278,12 @@ async def _handle_natural_language(text: str, user_id: int, db: Session) -> str:
             if not gmail_service or not gmail_service.service:
                 return "📧 Email service not configured. Please set up Gmail OAuth first."
             
-            emails = gmail_service.get_unread_emails(max_results=5)
-            
-            if not emails:
-                return "📭 No unread emails found!"
-            
-            response = f"📧 <b>Unread Emails ({len(emails)})</b>\n\n"
-            for i, email in enumerate(emails, 1):
-                sender = email.get('sender', 'Unknown')[:30]
-                subject = email.get('subject', 'No Subject')[:40]
-                response += f"{i}. <b>From:</b> {sender}\n   <b>Subject:</b> {subject}\n\n"
+            with stage("gmail"):
+                emails, _ = await get_email_ingest().get_unread(
+                    gmail_service, ai_service, max_results=5
+                )
             
-            return response
+            return _format_unread_emails(emails)
 
         elif action == "send_email":
             logger.info(f"Send email action triggered. gmail_service={gmail_service is not None}, service={gmail_service.service if gmail_service else None}")
@@ -269,11 +350,12 @@ Best regards,
             
             logger.info(f"Email body formatted for: {recipient_name}")
             
-            success = gmail_service.send_email(
-                recipient=recipient,
-                subject=subject,
-                body=email_body
-            )
+            with stage("gmail"):
+                success = gmail_service.send_email(
+                    recipient=recipient,
+                    subject=subject,
+                    body=email_body
+                )
             
             if success:
                 return f"✅ Email sent successfully to {recipient}!\n\n📧 <b>To:</b> {recipient_name}\n📝 <b>Message:</b> {message_content[:100]}{'...' if len(message_content) > 100 else ''}"
@@ -288,14 +370,14 @@ Best regards,
             # General Q&A using OpenAI
             question = parameters.get("question", text)
             logger.info(f"Processing Q&A request: {question}")
-            answer = ai_service.answer_question(question)
-            return f"🤖 {answer}"
+            return await _answer_question(question, user_id)
 
         elif action == "get_stock_price":
             # Real-time stock price
             symbol = parameters.get("symbol", "AAPL")
             logger.info(f"Getting stock price for: {symbol}")
-            result = await realtime_service.get_stock_price(symbol)
+            with stage("realtime"):
+                result = await realtime_service.get_stock_price(symbol)
             
             if result.get("success"):
                 change_emoji = "📈" if result["change"] >= 0 else "📉"
@@ -312,7 +394,8 @@ Best regards,
             # Real-time cryptocurrency price
             symbol = parameters.get("symbol", "BTC")
             logger.info(f"Getting crypto price for: {symbol}")
-            result = await realtime_service.get_crypto_price(symbol)
+            with stage("realtime"):
+                result = await realtime_service.get_crypto_price(symbol)
             
             if result.get("success"):
                 change_emoji = "📈" if result["change_24h"] >= 0 else "📉"
@@ -329,7 +412,8 @@ Best regards,
             # Current time in a city
             city = parameters.get("city", "New York")
             logger.info(f"Getting time for: {city}")
-            result = realtime_service.get_time_in_city(city)
+            with stage("realtime"):
+                result = realtime_service.get_time_in_city(city)
             
             if result.get("success"):
                 return (
@@ -345,7 +429,8 @@ Best regards,
             # Real-time weather
             city = parameters.get("city", "New York")
             logger.info(f"Getting weather for: {city}")
-            result = await realtime_service.get_weather(city)
+            with stage("realtime"):
+                result = await realtime_service.get_weather(city)
             
             if result.get("success"):
                 return (
@@ -362,8 +447,7 @@ Best regards,
         elif action == "unknown":
             # For unknown actions, try answering as a general question
             logger.info(f"Unknown action - trying Q&A fallback for: {text}")
-            answer = ai_service.answer_question(text)
-            return f"🤖 {answer}"
+            return await _answer_question(text, user_id)
 
         elif action == "schedule_task":
             task_name = parameters.get("task_name", "Scheduled Task")
@@ -374,19 +458,96 @@ Best regards,
         else:
             # DEFAULT: Answer any other message as a question using AI
             logger.info(f"Default action - answering as Q&A: {text}")
-            answer = ai_service.answer_question(text)
-            return f"🤖 {answer}"
+            return await _answer_question(text, user_id)
 
+    except (CircuitOpenError, DeadlineExceeded):
+        # Answered by process_update; retrying through the AI would not help
+        raise
     except Exception as e:
         logger.error(f"Error processing natural language: {e}")
         # Even on error, try to answer the question
         try:
-            answer = ai_service.answer_question(text)
+            answer = await ai_service.answer_question(text)
             return f"🤖 {answer}"
         except:
             return "❌ Sorry, I had trouble understanding that. Please try again or use /help."
 
 
+PRIORITY_MARKERS = {"urgent": "🔴 ", "high": "🟠 "}
+
+
+def _format_unread_emails(emails: list) -> str:
+    """
+    Format unread emails with their stored summaries
+
+    Args:
+        emails: Email dicts from the ingest stage
+
+    Returns:
+        Response text
+    """
+    if not emails:
+        return "📭 No unread emails found!"
+
+    response = f"📧 <b>Unread Emails ({len(emails)})</b>\n\n"
+    for i, email in enumerate(emails, 1):
+        sender = email.get('sender', 'Unknown')[:30]
+        subject = email.get('subject', 'No Subject')[:40]
+        marker = PRIORITY_MARKERS.get(email.get('priority'), "")
+        response += f"{i}. {marker}<b>From:</b> {sender}\n   <b>Subject:</b> {subject}\n"
+        if email.get('summary') or settings.SUMMARIZE_EMAILS:
+            response += f"   {summary_or_preview(email)}\n"
+        response += "\n"
+
+    return response
+
+
+async def _answer_question(question: str, chat_id: int, fresh: bool = False) -> str:
+    """
+    Answer a general question, streaming it into the chat when enabled
+
+    Args:
+        question: User's question
+        chat_id: Chat to stream the answer into
+        fresh: Skip the answer cache
+
+    Returns:
+        Response text (a StreamedReply if it was streamed)
+    """
+    with stage("ai"):
+        # Fail fast before posting a streaming placeholder
+        try:
+            get_dependency("openai").check()
+        except CircuitOpenError as e:
+            return f"❌ {e}"
+
+        # Follow-ups are answered with the chat's recent turns as context
+        messages, standalone = await ai_service.build_qa_messages(question, chat_id)
+        if standalone and not fresh:
+            cached = await ai_service.get_cached_answer(question)
+            if cached:
+                await ai_service.remember_turn(chat_id, question, cached)
+                return f"🤖 {cached}"
+
+        if settings.STREAM_ANSWERS:
+            answer, completed = await telegram_service.send_streaming_message(
+                ai_service.stream_answer(question, messages),
+                chat_id,
+                prefix="🤖 ",
+                edit_interval=settings.STREAM_EDIT_INTERVAL,
+            )
+            if answer is not None:
+                # A stream cut off by an error or the deadline is shown but not kept
+                if completed and answer:
+                    if standalone:
+                        await ai_service.cache_answer(question, answer)
+                    await ai_service.remember_turn(chat_id, question, answer)
+                return StreamedReply(f"🤖 {answer}")
+
+        answer = await ai_service.answer_question(question, fresh=True, user_id=chat_id)
+        return f"🤖 {answer}"
+
+
 @router.post("/command")
 async def handle_command(
     request: CommandRequest, db: Session = Depends(get_db)
@@ -402,8 +563,11 @@ async def handle_command(
         Command execution result
     """
     try:
-        parsed = ai_service.parse_command(request.text)
-        action = parsed.get("action", "unknown")
+        with track_pipeline("command"):
+            with stage("parse_command"):
+                parsed = ai_service.parse_command(request.text)
+            action = parsed.get("action", "unknown")
+            set_action(action)
 
         logger.info(f"Executing command: {action}")
 
@@ -440,6 +604,92 @@ async def get_bot_status() -> dict:
         return {"status": "error", "error": str(e)}
 
 
+@router.get("/queue")
+async def get_update_queue_status() -> dict:
+    """
+    Get update worker pool status
+
+    Returns:
+        Queue depth and processing counters
+    """
+    queue = get_update_queue()
+    stats = queue.stats() if queue else {"running": False, "depth": 0}
+    stats["dedup"] = get_update_dedup().stats()
+    stats["message_writer"] = get_message_writer().stats()
+    return stats
+
+
+@router.get("/answer-cache")
+async def get_answer_cache_status() -> dict:
+    """
+    Get answer cache status
+
+    Returns:
+        Hit/miss counters and memory tier size
+    """
+    stats = get_answer_cache().stats()
+    stats["enabled"] = settings.ANSWER_CACHE_ENABLED
+    stats["semantic"] = get_semantic_cache().stats()
+    stats["semantic"]["enabled"] = settings.SEMANTIC_CACHE_ENABLED
+    return stats
+
+
+@router.get("/model-routes")
+async def get_model_routes_status() -> dict:
+    """
+    Get model routing status
+
+    Returns:
+        Per-route models, latency against the SLO and fallback state
+    """
+    return get_model_router().stats()
+
+
+@router.get("/llm-usage")
+async def get_llm_usage(days: int = 7) -> dict:
+    """
+    Get per-method LLM usage
+
+    Args:
+        days: Look back this many days
+
+    Returns:
+        Call counts, outcomes, p50/p95 latency and tokens per day by method
+    """
+    if days < 1:
+        raise HTTPException(status_code=400, detail="days must be at least 1")
+    usage = await get_llm_ledger().aggregate(days)
+    usage["ledger"] = get_llm_ledger().stats()
+    return usage
+
+
+@router.get("/conversations")
+async def get_conversation_status() -> dict:
+    """
+    Get conversation memory status
+
+    Returns:
+        Conversation and turn counts
+    """
+    stats = get_conversation_store().stats()
+    stats["enabled"] = settings.CONVERSATION_MEMORY_ENABLED
+    return stats
+
+
+@router.get("/send-queue")
+async def get_send_queue_status() -> dict:
+    """
+    Get outbound send queue status
+
+    Returns:
+        Queue depth, per-lane wait times and drop counters
+    """
+    queue = get_send_queue()
+    if queue is None:
+        return {"running": False, "depth": 0}
+    return queue.stats()
+
+
 @router.post("/send")
 async def send_telegram_message(text: str, chat_id: int = None) -> dict:
     """
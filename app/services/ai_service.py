@@ -1,13 +1,51 @@
 """AI service for intent parsing, command generation, and email summarization"""
 
+import asyncio
+import json
 import logging
-from typing import Optional, Dict, Any
-from openai import OpenAI
+import random
+import time
+from typing import Optional, Dict, Any, AsyncIterator, List, Tuple
+from openai import APITimeoutError, AsyncOpenAI
 
 from app.config import get_settings
+from app.services.answer_cache import AnswerCache, get_answer_cache
+from app.services.conversation_store import Conversation, Turn, get_conversation_store
+from app.services.intent_matcher import match_intent
+from app.services.llm_ledger import call_outcome, get_llm_ledger
+from app.services.model_router import get_model_router
+from app.services.priority_classifier import get_priority_classifier
+from app.services.resilience import CircuitOpenError, DeadlineExceeded, get_dependency
+from app.services.semantic_cache import get_semantic_cache
+from app.services.single_flight import get_single_flight
+from app.services.text_reducer import estimate_tokens, reduce_for_llm, truncate_to_tokens
 
 logger = logging.getLogger(__name__)
 
+QA_SYSTEM_PROMPT = """You are a helpful personal assistant. Answer questions concisely and accurately.
+If asked about real-time data (weather, stock prices, current news), explain that you don't have access to real-time data but provide helpful general information.
+Keep responses brief but informative (max 200 words).
+Use emojis to make responses friendly."""
+QA_TEMPERATURE = 0.7
+
+BATCH_SUMMARY_PROMPT = """You summarize emails. Each email below starts with a line "### <id>".
+Summarize every email in maximum {max_length} characters, focusing on key information and action items.
+Respond with a JSON object of the form {{"summaries": {{"<id>": "<summary>", ...}}}} containing every id."""
+
+CONVERSATION_SUMMARY_PROMPT = """You maintain a short running summary of a conversation between a user and their assistant.
+Merge the previous summary with the new exchanges into one summary of at most {max_words} words.
+Keep facts about the user, their preferences and the topics discussed; drop small talk."""
+
+# Max estimated tokens of each answer sent for conversation summarization
+CONVERSATION_SUMMARY_ANSWER_TOKENS = 150
+
+
+def _timed_out(error: BaseException) -> bool:
+    """Whether a call hit its own timeout (ours or the OpenAI client's), not the deadline"""
+    return isinstance(error, (asyncio.TimeoutError, APITimeoutError)) and not isinstance(
+        error, DeadlineExceeded
+    )
+
 
 class AIService:
     """Service for AI-powered features using OpenAI API"""
@@ -15,10 +53,143 @@ class AIService:
     def __init__(self):
         """Initialize AI service"""
         self.settings = get_settings()
-        self.client = OpenAI(api_key=self.settings.OPENAI_API_KEY)
+        self.client = AsyncOpenAI(
+            api_key=self.settings.OPENAI_API_KEY,
+            base_url=self.settings.OPENAI_BASE_URL,
+            timeout=self.settings.OPENAI_TIMEOUT,
+        )
         self.model = self.settings.OPENAI_MODEL
         self.temperature = self.settings.OPENAI_TEMPERATURE
         self.max_tokens = self.settings.OPENAI_MAX_TOKENS
+        self.timeout = self.settings.OPENAI_TIMEOUT
+        # Caps concurrent OpenAI requests; get_ai_service() shares one instance
+        # so the cap (and the HTTP connection pool) is process-wide
+        self._semaphore = asyncio.Semaphore(self.settings.OPENAI_MAX_CONCURRENCY)
+        # Conversation summary updates running in the background
+        self._background: set = set()
+
+    async def _complete(
+        self,
+        route: str,
+        messages: List[Dict[str, str]],
+        temperature: float,
+        max_tokens: int,
+        timeout: Optional[float] = None,
+        response_format: Optional[Dict[str, str]] = None,
+    ) -> str:
+        """
+        Run a chat completion under the concurrency cap and a timeout
+
+        The model and timeout come from the route (see MODEL_ROUTES). A
+        call that times out on the route's primary model is retried once
+        on its fallback model. Identical concurrent requests share one API
+        call. Calls go through the "openai" circuit breaker and are bounded
+        by the request deadline.
+
+        Args:
+            route: Routing table entry (classify, summarize, reply, answer, ...)
+            messages: Chat messages
+            temperature: Sampling temperature
+            max_tokens: Completion token limit
+            timeout: Seconds before the call is abandoned (defaults to the route's)
+            response_format: Optional structured output format, e.g. {"type": "json_object"}
+
+        Returns:
+            Completion text, stripped
+
+        Raises:
+            asyncio.TimeoutError: If the call exceeds the timeout or deadline
+            APITimeoutError: If the OpenAI client's own timeout fired first
+            CircuitOpenError: If OpenAI's circuit is open
+        """
+        router = get_model_router()
+        model = router.choose(route)
+        timeout = timeout or router.route(route).timeout
+        try:
+            return await self._complete_on(
+                route, model, messages, temperature, max_tokens, timeout, response_format
+            )
+        except DeadlineExceeded:
+            raise
+        except (asyncio.TimeoutError, APITimeoutError):
+            fallback = router.fallback_for(route, model)
+            if fallback is None:
+                raise
+            logger.warning(f"{route} request timed out on {model}, retrying on {fallback}")
+            return await self._complete_on(
+                route, fallback, messages, temperature, max_tokens, timeout, response_format
+            )
+
+    async def _complete_on(
+        self,
+        route: str,
+        model: str,
+        messages: List[Dict[str, str]],
+        temperature: float,
+        max_tokens: int,
+        timeout: float,
+        response_format: Optional[Dict[str, str]],
+    ) -> str:
+        """Run a completion on a specific model, sharing identical concurrent calls"""
+        key = json.dumps(
+            [model, messages, temperature, max_tokens, response_format], sort_keys=True
+        )
+        return await get_single_flight("openai").do(
+            key,
+            lambda: self._create_completion(
+                route, model, messages, temperature, max_tokens, timeout, response_format
+            ),
+        )
+
+    async def _create_completion(
+        self,
+        route: str,
+        model: str,
+        messages: List[Dict[str, str]],
+        temperature: float,
+        max_tokens: int,
+        timeout: float,
+        response_format: Optional[Dict[str, str]],
+    ) -> str:
+        """Send one chat completion request, recording its latency and usage"""
+        extra = {"response_format": response_format} if response_format else {}
+        router = get_model_router()
+        async with self._semaphore:
+            started = time.monotonic()
+            try:
+                response = await get_dependency("openai").call(
+                    lambda: self.client.chat.completions.create(
+                        model=model,
+                        messages=messages,
+                        temperature=temperature,
+                        max_tokens=max_tokens,
+                        **extra,
+                    ),
+                    timeout=timeout,
+                    hedge=self.settings.OPENAI_HEDGE_ENABLED,
+                )
+            except BaseException as e:
+                elapsed = time.monotonic() - started
+                if _timed_out(e):
+                    router.record(route, model, elapsed)
+                get_llm_ledger().record(route, model, elapsed, call_outcome(e))
+                raise
+        elapsed = time.monotonic() - started
+        router.record(route, model, elapsed)
+        usage = response.usage
+        get_llm_ledger().record(
+            route,
+            model,
+            elapsed,
+            "ok",
+            prompt_tokens=usage.prompt_tokens if usage else None,
+            completion_tokens=usage.completion_tokens if usage else None,
+        )
+        return response.choices[0].message.content.strip()
+
+    def _route_tokens(self, route: str, default: int) -> int:
+        """Completion token limit of a route, or the method's own default"""
+        return get_model_router().route(route).max_tokens or default
 
     def parse_command(self, text: str) -> Dict[str, Any]:
         """
@@ -31,187 +202,10 @@ class AIService:
             Dictionary with parsed command details
         """
         try:
-            import json
-            
             logger.info(f"Parsing command: '{text}'")
-            
-            text_lower = text.lower().strip()
-            logger.debug(f"Lowercase text: '{text_lower}'")
-            
-            # === PATTERN 0: Real-time data queries - CHECK FIRST! ===
-            
-            # Stock price queries
-            stock_keywords = ["stock", "share price", "stock price", "ticker", "market price"]
-            if any(word in text_lower for word in stock_keywords):
-                logger.info("Pattern match: Stock price query detected")
-                # Extract stock symbol - look for common patterns
-                words = text.upper().split()
-                symbol = None
-                for i, word in enumerate(words):
-                    # Look for word after "stock" or standalone ticker symbols
-                    clean_word = ''.join(c for c in word if c.isalpha())
-                    if clean_word in ["AAPL", "GOOGL", "GOOG", "MSFT", "AMZN", "META", "TSLA", "NVDA", "NFLX", "AMD", "INTC", "IBM", "ORCL", "CRM", "ADBE", "PYPL", "UBER", "LYFT", "SPOT", "SNAP", "TWTR", "PINS", "ZM", "SHOP", "SQ", "COIN", "HOOD", "RBLX", "ABNB", "PLTR", "SOFI", "NIO", "RIVN", "LCID", "F", "GM", "TM", "BA", "DIS", "WMT", "TGT", "COST", "HD", "LOW", "NKE", "SBUX", "MCD", "KO", "PEP", "JNJ", "PFE", "MRNA", "BNTX", "UNH", "CVS", "WBA", "JPM", "BAC", "WFC", "C", "GS", "MS", "V", "MA", "AXP"]:
-                        symbol = clean_word
-                        break
-                    # Check if previous word was "stock" or similar
-                    if i > 0 and any(kw in words[i-1].lower() for kw in ["stock", "price", "ticker"]):
-                        if len(clean_word) <= 5 and clean_word.isalpha():
-                            symbol = clean_word
-                            break
-                
-                if not symbol:
-                    # Try to find any word that looks like a ticker (2-5 uppercase letters)
-                    for word in words:
-                        clean_word = ''.join(c for c in word if c.isalpha())
-                        if 1 <= len(clean_word) <= 5 and clean_word.isalpha() and clean_word not in ["THE", "AND", "FOR", "WHAT", "PRICE", "STOCK", "SHOW", "GET", "CHECK"]:
-                            symbol = clean_word
-                            break
-                
-                return {
-                    "action": "get_stock_price",
-                    "parameters": {"symbol": symbol or "AAPL"},
-                    "confidence": 95
-                }
-            
-            # Cryptocurrency queries
-            crypto_keywords = ["bitcoin", "btc", "ethereum", "eth", "crypto", "cryptocurrency", "dogecoin", "doge", "solana", "sol", "cardano", "ada", "ripple", "xrp"]
-            if any(word in text_lower for word in crypto_keywords):
-                logger.info("Pattern match: Cryptocurrency query detected")
-                # Map keywords to symbols
-                symbol = "BTC"  # default
-                if "ethereum" in text_lower or "eth" in text_lower.split():
-                    symbol = "ETH"
-                elif "dogecoin" in text_lower or "doge" in text_lower:
-                    symbol = "DOGE"
-                elif "solana" in text_lower or "sol" in text_lower.split():
-                    symbol = "SOL"
-                elif "cardano" in text_lower or "ada" in text_lower.split():
-                    symbol = "ADA"
-                elif "ripple" in text_lower or "xrp" in text_lower:
-                    symbol = "XRP"
-                
-                return {
-                    "action": "get_crypto_price",
-                    "parameters": {"symbol": symbol},
-                    "confidence": 95
-                }
-            
-            # Time in city queries
-            time_keywords = ["time in", "current time in", "what time", "time now in", "local time"]
-            if any(word in text_lower for word in time_keywords):
-                logger.info("Pattern match: Time query detected")
-                # Extract city name
-                city = "New York"  # default
-                # Common patterns: "time in Tokyo", "what time is it in London"
-                for pattern in ["time in ", "time is it in ", "time now in "]:
-                    if pattern in text_lower:
-                        city = text_lower.split(pattern)[-1].strip().rstrip("?").strip()
-                        break
-                
-                return {
-                    "action": "get_time",
-                    "parameters": {"city": city},
-                    "confidence": 95
-                }
-            
-            # Weather queries
-            weather_keywords = ["weather in", "weather at", "temperature in", "forecast", "how hot", "how cold", "is it raining", "weather today"]
-            if any(word in text_lower for word in weather_keywords):
-                logger.info("Pattern match: Weather query detected")
-                # Extract city name
-                city = "New York"  # default
-                for pattern in ["weather in ", "weather at ", "temperature in ", "forecast for ", "forecast in "]:
-                    if pattern in text_lower:
-                        city = text_lower.split(pattern)[-1].strip().rstrip("?").strip()
-                        break
-                
-                return {
-                    "action": "get_weather",
-                    "parameters": {"city": city},
-                    "confidence": 95
-                }
-            
-            # === PATTERN 1: General Questions (Q&A) ===
-            # This catches most natural language queries
-            question_indicators = ["what", "who", "where", "when", "why", "how", "tell me", "explain", "describe", "?", "meaning", "define", "capital", "population", "distance", "calculate", "convert"]
-            if any(indicator in text_lower for indicator in question_indicators):
-                logger.info("Pattern match: General question detected - routing to Q&A")
-                return {
-                    "action": "ask_question",
-                    "parameters": {"question": text},
-                    "confidence": 90
-                }
-            
-            # === PATTERN 2: Email related ===
-            email_keywords = ["email", "mail", "unread", "inbox", "gmail"]
-            if any(word in text_lower for word in email_keywords):
-                logger.info("Pattern match: Email keywords detected")
-                
-                # Check if it's send_email
-                send_keywords = ["send", "write", "compose", "to", "reply"]
-                if any(word in text_lower for word in send_keywords):
-                    logger.info("Sub-pattern: Send email detected")
-                    # Try to find email address
-                    recipient = ""
-                    for word in text.split():
-                        if "@" in word:
-                            recipient = word.strip()
-                            break
-                    
-                    return {
-                        "action": "send_email",
-                        "parameters": {
-                            "recipient": recipient,
-                            "body": text
-                        },
-                        "confidence": 90
-                    }
-                else:
-                    # Read emails
-                    logger.info("Sub-pattern: Read email detected")
-                    return {
-                        "action": "read_emails",
-                        "parameters": {},
-                        "confidence": 90
-                    }
-            
-            # === PATTERN 3: Task/Schedule related ===
-            task_keywords = ["task", "todo", "reminder", "schedule", "remind", "alarm", "meeting", "appointment"]
-            if any(word in text_lower for word in task_keywords):
-                logger.info("Pattern match: Task/schedule keywords detected")
-                return {
-                    "action": "schedule_task",
-                    "parameters": {"task_name": text},
-                    "confidence": 85
-                }
-            
-            # === PATTERN 4: Summary related ===
-            summary_keywords = ["summary", "daily summary", "overview", "report", "briefing"]
-            if any(word in text_lower for word in summary_keywords):
-                logger.info("Pattern match: Summary keywords detected")
-                return {
-                    "action": "send_message",
-                    "parameters": {"body": text},
-                    "confidence": 80
-                }
-            
-            # === PATTERN 5: Help/Information ===
-            help_keywords = ["help", "commands", "what can you do", "abilities", "features"]
-            if any(word in text_lower for word in help_keywords):
-                logger.info("Pattern match: Help keywords detected")
-                return {
-                    "action": "send_message",
-                    "parameters": {"body": text},
-                    "confidence": 85
-                }
-            
-            # === DEFAULT: Treat everything else as a question ===
-            logger.info("No specific pattern match - treating as general question")
-            return {
-                "action": "ask_question",
-                "parameters": {"question": text},
-                "confidence": 75
-            }
+            parsed = match_intent(text)
+            logger.info(f"Pattern match: {parsed['action']} ({parsed['confidence']})")
+            return parsed
 
         except Exception as e:
             logger.error(f"Error in parse_command: {e}", exc_info=True)
@@ -221,7 +215,7 @@ class AIService:
                 "confidence": 50
             }
 
-    def summarize_email(self, subject: str, body: str, max_length: int = 200) -> str:
+    async def summarize_email(self, subject: str, body: str, max_length: int = 200) -> str:
         """
         Summarize an email using AI
 
@@ -238,19 +232,20 @@ class AIService:
 Summary should be maximum {max_length} characters.
 Focus on key information and action items."""
 
+            body = reduce_for_llm(
+                body, self.settings.EMAIL_SUMMARY_TOKEN_BUDGET, "summarize_email"
+            )
             message_content = f"Subject: {subject}\n\nBody:\n{body}"
 
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
+            summary = await self._complete(
+                "summarize",
+                [
                     {"role": "system", "content": system_prompt},
                     {"role": "user", "content": message_content},
                 ],
                 temperature=0.5,  # Lower temperature for summaries
-                max_tokens=100,
+                max_tokens=self._route_tokens("summarize", 100),
             )
-
-            summary = response.choices[0].message.content.strip()
             logger.debug(f"Email summarized, length: {len(summary)}")
             return summary
 
@@ -258,7 +253,7 @@ Focus on key information and action items."""
             logger.error(f"Failed to summarize email: {e}")
             return "[Unable to generate summary]"
 
-    def generate_reply(
+    async def generate_reply(
         self,
         original_subject: str,
         original_body: str,
@@ -285,17 +280,15 @@ Body: {original_body}
 
 Reply Instruction: {instruction}"""
 
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
+            reply = await self._complete(
+                "reply",
+                [
                     {"role": "system", "content": system_prompt},
                     {"role": "user", "content": message_content},
                 ],
                 temperature=self.temperature,
-                max_tokens=500,
+                max_tokens=self._route_tokens("reply", 500),
             )
-
-            reply = response.choices[0].message.content.strip()
             logger.info("Email reply generated")
             return reply
 
@@ -303,7 +296,74 @@ Reply Instruction: {instruction}"""
             logger.error(f"Failed to generate reply: {e}")
             return "I'll get back to you soon."
 
-    def classify_email_priority(self, subject: str, body: str) -> str:
+    async def classify_email_priority(self, subject: str, body: str, sender: str = "") -> str:
+        """
+        Classify email priority, locally when confident, otherwise using AI
+
+        Args:
+            subject: Email subject
+            body: Email body
+            sender: From header (a classifier feature)
+
+        Returns:
+            Priority level: low, medium, high, urgent
+        """
+        email = {"gmail_id": "", "sender": sender, "subject": subject, "body": body}
+        priority, _ = (await self.classify_email_priorities([email]))[""]
+        return priority
+
+    async def classify_email_priorities(
+        self, emails: List[Dict[str, Any]]
+    ) -> Dict[str, Tuple[str, Optional[str]]]:
+        """
+        Classify the priority of several emails
+
+        The local classifier scores the whole batch at once; only emails it
+        is not confident about (below its measured threshold) are sent to
+        the LLM. A PRIORITY_SHADOW_RATE sample of the confident ones is sent
+        too, so agreement is also measured where the classifier answers
+        alone; the LLM's answers set that threshold.
+
+        Args:
+            emails: Email dicts with gmail_id, sender, subject and body
+
+        Returns:
+            Dict mapping gmail_id to (priority, source), where source is
+            "local", "llm", or None if classification failed
+        """
+        classifier = get_priority_classifier()
+        predictions: List[Optional[Tuple[str, float]]] = [None] * len(emails)
+        if self.settings.PRIORITY_CLASSIFIER_ENABLED and classifier.ready:
+            predictions = classifier.predict(emails)
+
+        results: Dict[str, Tuple[str, Optional[str]]] = {}
+        threshold = classifier.threshold
+        to_llm = []
+        for email, prediction in zip(emails, predictions):
+            confident = prediction is not None and prediction[1] >= threshold
+            if confident and random.random() >= self.settings.PRIORITY_SHADOW_RATE:
+                results[email["gmail_id"]] = (prediction[0], "local")
+            else:
+                to_llm.append((email, prediction, confident))
+
+        labels = await asyncio.gather(
+            *(self._classify_priority_llm(email["subject"], email["body"]) for email, _, _ in to_llm),
+            return_exceptions=True,
+        )
+        for (email, prediction, shadow), label in zip(to_llm, labels):
+            if isinstance(label, Exception):
+                logger.error(f"Failed to classify email: {label}")
+                if shadow:
+                    results[email["gmail_id"]] = (prediction[0], "local")
+                else:
+                    results[email["gmail_id"]] = (prediction[0] if prediction else "medium", None)
+                continue
+            if prediction:
+                classifier.record_agreement(prediction[0], prediction[1], label, shadow=shadow)
+            results[email["gmail_id"]] = (label, "llm")
+        return results
+
+    async def _classify_priority_llm(self, subject: str, body: str) -> str:
         """
         Classify email priority using AI
 
@@ -314,8 +374,7 @@ Reply Instruction: {instruction}"""
         Returns:
             Priority level: low, medium, high, urgent
         """
-        try:
-            system_prompt = """You are an email classifier. Classify the email priority as:
+        system_prompt = """You are an email classifier. Classify the email priority as:
 - low: Regular emails, newsletters, FYI
 - medium: Work emails, regular updates
 - high: Important work, action needed
@@ -323,29 +382,27 @@ Reply Instruction: {instruction}"""
 
 Respond with ONLY the priority level, nothing else."""
 
-            message_content = f"Subject: {subject}\n\nBody:\n{body}"
-
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": message_content},
-                ],
-                temperature=0.3,  # Low temperature for classification
-                max_tokens=10,
-            )
-
-            priority = response.choices[0].message.content.strip().lower()
-            valid_priorities = ["low", "medium", "high", "urgent"]
-            priority = priority if priority in valid_priorities else "medium"
-            logger.debug(f"Email classified as: {priority}")
-            return priority
-
-        except Exception as e:
-            logger.error(f"Failed to classify email: {e}")
-            return "medium"
-
-    def summarize_text(self, text: str, max_length: int = 150) -> str:
+        body = reduce_for_llm(
+            body, self.settings.EMAIL_PRIORITY_TOKEN_BUDGET, "classify_email_priority"
+        )
+        message_content = f"Subject: {subject}\n\nBody:\n{body}"
+
+        priority = await self._complete(
+            "classify",
+            [
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": message_content},
+            ],
+            temperature=0.3,  # Low temperature for classification
+            max_tokens=self._route_tokens("classify", 10),
+        )
+        priority = priority.lower()
+        valid_priorities = ["low", "medium", "high", "urgent"]
+        priority = priority if priority in valid_priorities else "medium"
+        logger.debug(f"Email classified as: {priority}")
+        return priority
+
+    async def summarize_text(self, text: str, max_length: int = 150) -> str:
         """
         Generic text summarization
 
@@ -360,9 +417,15 @@ Respond with ONLY the priority level, nothing else."""
             return text
 
         try:
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
+            text = reduce_for_llm(
+                text, self.settings.TEXT_SUMMARY_TOKEN_BUDGET, "summarize_text"
+            )
+            if len(text) <= max_length:
+                return text
+
+            summary = await self._complete(
+                "summarize",
+                [
                     {
                         "role": "system",
                         "content": f"Summarize the following text in maximum {max_length} characters.",
@@ -370,53 +433,372 @@ Respond with ONLY the priority level, nothing else."""
                     {"role": "user", "content": text},
                 ],
                 temperature=0.5,
-                max_tokens=50,
+                max_tokens=self._route_tokens("summarize", 50),
             )
-
-            summary = response.choices[0].message.content.strip()
             return summary
 
         except Exception as e:
             logger.error(f"Failed to summarize text: {e}")
             return text[:max_length] + "..."
 
-    def answer_question(self, question: str) -> str:
+    async def summarize_emails(
+        self,
+        emails: List[Dict[str, Any]],
+        max_length: int = 150,
+        concurrency: Optional[int] = None,
+    ) -> Dict[str, str]:
+        """
+        Summarize several emails with as few requests as possible
+
+        Bodies are first cleaned and cut to EMAIL_SUMMARY_TOKEN_BUDGET.
+        Emails are packed into batches of at most EMAIL_SUMMARY_BATCH_SIZE
+        emails and EMAIL_SUMMARY_BATCH_TOKENS estimated input tokens, and
+        each batch is summarized in one JSON-mode request. Batches run
+        concurrently, at most concurrency at a time. A batch that fails is split in half and retried; a
+        single email that still fails is left out, so the caller can retry it later.
+
+        Args:
+            emails: Email dictionaries with gmail_id and body
+            max_length: Maximum summary length per email
+            concurrency: Maximum batches in flight (unbounded if None)
+
+        Returns:
+            Dictionary mapping gmail_id to summary, without emails that failed
+        """
+        summaries: Dict[str, str] = {}
+        pending = []
+        for email in emails:
+            body = email.get("body") or ""
+            if len(body) > max_length:
+                body = reduce_for_llm(
+                    body, self.settings.EMAIL_SUMMARY_TOKEN_BUDGET, "summarize_emails"
+                )
+            if len(body) <= max_length:
+                summaries[email["gmail_id"]] = body
+            else:
+                pending.append({"gmail_id": email["gmail_id"], "body": body})
+
+        batches = self._pack_summary_batches(pending)
+        limit = asyncio.Semaphore(concurrency or len(batches) or 1)
+
+        async def summarize(batch: List[Dict[str, Any]]) -> Dict[str, str]:
+            async with limit:
+                return await self._summarize_batch(batch, max_length)
+
+        results = await asyncio.gather(*(summarize(batch) for batch in batches))
+        for result in results:
+            summaries.update(result)
+
+        logger.info(
+            f"Summarized {len(pending)} emails in {len(batches)} batched requests"
+        )
+        return summaries
+
+    def _pack_summary_batches(
+        self, emails: List[Dict[str, Any]]
+    ) -> List[List[Dict[str, Any]]]:
+        """Group emails into batches within the size and token limits"""
+        budget = self.settings.EMAIL_SUMMARY_BATCH_TOKENS
+        batches: List[List[Dict[str, Any]]] = []
+        current: List[Dict[str, Any]] = []
+        used = 0
+        for email in emails:
+            tokens = min(estimate_tokens(email["body"]), budget)
+            if current and (
+                used + tokens > budget
+                or len(current) >= self.settings.EMAIL_SUMMARY_BATCH_SIZE
+            ):
+                batches.append(current)
+                current, used = [], 0
+            current.append(email)
+            used += tokens
+        if current:
+            batches.append(current)
+        return batches
+
+    async def _summarize_batch(
+        self, batch: List[Dict[str, Any]], max_length: int
+    ) -> Dict[str, str]:
+        """Summarize one batch, splitting it in half if the request fails"""
+        # Bodies longer than the whole budget are cut to fit
+        max_chars = self.settings.EMAIL_SUMMARY_BATCH_TOKENS * 4
+        content = "\n\n".join(
+            f"### {email['gmail_id']}\n{email['body'][:max_chars]}" for email in batch
+        )
+        try:
+            reply = await self._complete(
+                "summarize",
+                [
+                    {
+                        "role": "system",
+                        "content": BATCH_SUMMARY_PROMPT.format(max_length=max_length),
+                    },
+                    {"role": "user", "content": content},
+                ],
+                temperature=0.5,
+                max_tokens=self._route_tokens("summarize", 50) * len(batch) + 20,
+                response_format={"type": "json_object"},
+            )
+            summaries = json.loads(reply)["summaries"]
+            return {
+                email["gmail_id"]: str(summaries[email["gmail_id"]]).strip()
+                for email in batch
+            }
+
+        except Exception as e:
+            if len(batch) > 1:
+                logger.warning(
+                    f"Batched summary of {len(batch)} emails failed, splitting: {e}"
+                )
+                middle = len(batch) // 2
+                halves = await asyncio.gather(
+                    self._summarize_batch(batch[:middle], max_length),
+                    self._summarize_batch(batch[middle:], max_length),
+                )
+                return {**halves[0], **halves[1]}
+
+            logger.error(f"Failed to summarize email {batch[0]['gmail_id']}: {e}")
+            return {}
+
+    async def answer_question(
+        self, question: str, fresh: bool = False, user_id: Optional[int] = None
+    ) -> str:
         """
         Answer a general question using OpenAI (real-time Q&A)
 
         Args:
             question: User's question
+            fresh: Skip the answer cache and ask the model again
+            user_id: Telegram user ID whose conversation provides context
 
         Returns:
             AI-generated answer
         """
         try:
+            messages, standalone = await self.build_qa_messages(question, user_id)
+            if standalone and not fresh:
+                cached = await self.get_cached_answer(question)
+                if cached:
+                    logger.info("Answered question from cache")
+                    await self.remember_turn(user_id, question, cached)
+                    return cached
+
             logger.info(f"Answering question: {question}")
-            
-            system_prompt = """You are a helpful personal assistant. Answer questions concisely and accurately.
-If asked about real-time data (weather, stock prices, current news), explain that you don't have access to real-time data but provide helpful general information.
-Keep responses brief but informative (max 200 words).
-Use emojis to make responses friendly."""
 
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": question},
-                ],
-                temperature=0.7,
-                max_tokens=500,
+            answer = await self._complete(
+                "answer",
+                messages,
+                temperature=QA_TEMPERATURE,
+                max_tokens=self._route_tokens("answer", 500),
             )
-
-            answer = response.choices[0].message.content.strip()
             logger.info(f"Question answered successfully")
+            # Answers to follow-ups depend on the conversation, so only
+            # standalone answers are shared through the cache
+            if standalone:
+                await self.cache_answer(question, answer)
+            await self.remember_turn(user_id, question, answer)
             return answer
 
+        except CircuitOpenError as e:
+            return f"❌ {e}"
         except Exception as e:
             logger.error(f"Failed to answer question: {e}")
             return "❌ Sorry, I couldn't process your question. Please try again."
 
-    def generate_daily_summary(
+    async def build_qa_messages(
+        self, question: str, user_id: Optional[int] = None
+    ) -> Tuple[List[Dict[str, str]], bool]:
+        """
+        Build the chat messages for a question
+
+        Includes the user's recent turns and conversation summary when
+        conversation memory is enabled and the conversation is active.
+
+        Args:
+            question: User's question
+            user_id: Telegram user ID, or None for a standalone question
+
+        Returns:
+            Tuple of (messages, standalone)
+        """
+        if user_id is None or not self.settings.CONVERSATION_MEMORY_ENABLED:
+            return [
+                {"role": "system", "content": QA_SYSTEM_PROMPT},
+                {"role": "user", "content": question},
+            ], True
+        store = get_conversation_store()
+        conversation = await store.get(user_id)
+        return store.build_messages(conversation, QA_SYSTEM_PROMPT, question)
+
+    async def remember_turn(self, user_id: Optional[int], question: str, answer: str):
+        """
+        Add a question and its answer to the user's conversation
+
+        Starts a background summary update once enough turns have left
+        the prompt window.
+
+        Args:
+            user_id: Telegram user ID (nothing is stored when None)
+            question: User's question
+            answer: Answer text
+        """
+        if user_id is None or not self.settings.CONVERSATION_MEMORY_ENABLED or not answer:
+            return
+        store = get_conversation_store()
+        conversation = await store.get(user_id)
+        store.record(conversation, question, answer)
+
+        turns = store.turns_to_summarize(conversation)
+        if turns:
+            conversation.folding = True
+            task = asyncio.create_task(self._update_conversation_summary(user_id, conversation, turns))
+            self._background.add(task)
+            task.add_done_callback(self._background.discard)
+
+    async def _update_conversation_summary(
+        self, user_id: int, conversation: Conversation, turns: List[Turn]
+    ):
+        """Fold turns that left the prompt window into the rolling summary"""
+        try:
+            transcript = "\n".join(
+                f"User: {question}\nAssistant: "
+                f"{truncate_to_tokens(answer, CONVERSATION_SUMMARY_ANSWER_TOKENS)}"
+                for question, answer, _ in turns
+            )
+            max_tokens = self._route_tokens(
+                "conversation_summary", self.settings.CONVERSATION_SUMMARY_MAX_TOKENS
+            )
+            summary = await self._complete(
+                "conversation_summary",
+                [
+                    {
+                        "role": "system",
+                        "content": CONVERSATION_SUMMARY_PROMPT.format(max_words=max_tokens * 3 // 4),
+                    },
+                    {
+                        "role": "user",
+                        "content": f"Previous summary: {conversation.summary or '(none)'}\n\n"
+                        f"New exchanges:\n{transcript}",
+                    },
+                ],
+                temperature=0.3,
+                max_tokens=max_tokens,
+            )
+            await get_conversation_store().save_summary(
+                user_id, conversation, summary, turns[-1][2]
+            )
+            logger.info(f"Updated conversation summary for user {user_id} ({len(turns)} turns)")
+        except Exception as e:
+            logger.warning(f"Failed to update conversation summary for user {user_id}: {e}")
+        finally:
+            conversation.folding = False
+
+    async def get_cached_answer(self, question: str) -> Optional[str]:
+        """
+        Look up a previous answer to the same or a similar question
+
+        Args:
+            question: User's question
+
+        Returns:
+            Cached answer, or None on a miss or when caching is disabled
+        """
+        if not self.settings.ANSWER_CACHE_ENABLED:
+            return None
+        # Keyed on the route's primary model, so fallback answers are shared too
+        model = get_model_router().route("answer").model
+        key = AnswerCache.make_key(question, model, QA_TEMPERATURE)
+        answer = await get_answer_cache().get(key)
+        if answer is None and self.settings.SEMANTIC_CACHE_ENABLED:
+            answer = get_semantic_cache().get(question, model)
+        return answer
+
+    async def cache_answer(self, question: str, answer: str):
+        """
+        Store an answer for later identical questions
+
+        Args:
+            question: User's question
+            answer: Complete answer text
+        """
+        if not self.settings.ANSWER_CACHE_ENABLED or not answer:
+            return
+        model = get_model_router().route("answer").model
+        key = AnswerCache.make_key(question, model, QA_TEMPERATURE)
+        await get_answer_cache().set(key, question, answer, model)
+        if self.settings.SEMANTIC_CACHE_ENABLED:
+            get_semantic_cache().add(question, answer, model)
+
+    async def stream_answer(
+        self, question: str, messages: Optional[List[Dict[str, str]]] = None
+    ) -> AsyncIterator[str]:
+        """
+        Answer a general question, yielding the answer as it is generated
+
+        Args:
+            question: User's question
+            messages: Prebuilt chat messages (from build_qa_messages)
+
+        Yields:
+            Answer text fragments in order
+        """
+        logger.info(f"Streaming answer to question: {question}")
+        if messages is None:
+            messages, _ = await self.build_qa_messages(question)
+
+        router = get_model_router()
+        model = router.choose("answer")
+        ledger = get_llm_ledger()
+        async with self._semaphore:
+            started = time.monotonic()
+            try:
+                # Bounds the wait for the stream to start, not the whole answer
+                stream = await get_dependency("openai").call(
+                    lambda: self.client.chat.completions.create(
+                        model=model,
+                        messages=messages,
+                        temperature=QA_TEMPERATURE,
+                        max_tokens=self._route_tokens("answer", 500),
+                        stream=True,
+                        stream_options={"include_usage": True},
+                    ),
+                    timeout=router.route("answer").timeout,
+                )
+            except BaseException as e:
+                elapsed = time.monotonic() - started
+                if _timed_out(e):
+                    router.record("answer", model, elapsed)
+                ledger.record("answer", model, elapsed, call_outcome(e))
+                raise
+
+            first = True
+            usage = None
+            error: Optional[BaseException] = None
+            try:
+                async for chunk in stream:
+                    if chunk.usage:
+                        # Sent as a final chunk without choices
+                        usage = chunk.usage
+                    if chunk.choices and chunk.choices[0].delta.content:
+                        if first:
+                            # The answer route's SLO is time to first token when streaming
+                            router.record("answer", model, time.monotonic() - started)
+                            first = False
+                        yield chunk.choices[0].delta.content
+            except BaseException as e:
+                error = e
+                raise
+            finally:
+                ledger.record(
+                    "answer",
+                    model,
+                    time.monotonic() - started,
+                    call_outcome(error),
+                    prompt_tokens=usage.prompt_tokens if usage else None,
+                    completion_tokens=usage.completion_tokens if usage else None,
+                )
+
+    async def generate_daily_summary(
         self,
         emails_count: int,
         pending_tasks: list,
@@ -441,9 +823,9 @@ Use emojis to make responses friendly."""
 
 Make it motivating and concise."""
 
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
+            summary = await self._complete(
+                "daily_summary",
+                [
                     {
                         "role": "system",
                         "content": "You are a friendly daily summary generator.",
@@ -451,13 +833,23 @@ Make it motivating and concise."""
                     {"role": "user", "content": content},
                 ],
                 temperature=0.7,
-                max_tokens=300,
+                max_tokens=self._route_tokens("daily_summary", 300),
             )
-
-            summary = response.choices[0].message.content.strip()
             logger.info("Daily summary generated")
             return summary
 
         except Exception as e:
             logger.error(f"Failed to generate daily summary: {e}")
             return "Daily summary generation failed. Please check manually."
+
+
+# Global AI service instance
+ai_service: Optional[AIService] = None
+
+
+def get_ai_service() -> AIService:
+    """Get or create the global AI service"""
+    global ai_service
+    if ai_service is None:
+        ai_service = AIService()
+    return ai_service
@@ -0,0 +1,265 @@
+"""Two-tier (memory + SQLite) cache for AI answers"""
+
+import asyncio
+import hashlib
+import logging
+import re
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import List, Optional, Tuple
+
+from app.config import get_settings
+from app.models.database import SessionLocal, AnswerCacheEntry
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_question(question: str) -> str:
+    """
+    Normalize a question so trivially different phrasings share a key
+
+    Args:
+        question: Question text
+
+    Returns:
+        Lowercased question with collapsed whitespace and no trailing punctuation
+    """
+    text = re.sub(r"\s+", " ", question.lower()).strip()
+    return text.rstrip("?!. ")
+
+
+class AnswerCache:
+    """
+    Answer cache with an in-memory LRU tier in front of a SQLite tier
+
+    Entries expire after ttl seconds. The memory tier holds at most
+    memory_size entries; the SQLite tier is trimmed to max_rows, oldest
+    first, every prune_every writes.
+    """
+
+    def __init__(
+        self,
+        ttl: int = 86400,
+        memory_size: int = 1000,
+        max_rows: int = 10000,
+        prune_every: int = 100,
+    ):
+        """
+        Initialize answer cache
+
+        Args:
+            ttl: Seconds an answer stays valid
+            memory_size: Maximum entries in the memory tier
+            max_rows: Maximum rows in the SQLite tier
+            prune_every: Writes between SQLite pruning passes
+        """
+        self.ttl = ttl
+        self.memory_size = memory_size
+        self.max_rows = max_rows
+        self.prune_every = prune_every
+        # key -> (answer, expiry as time.time())
+        self._memory: OrderedDict = OrderedDict()
+        self._writes = 0
+        self.memory_hits = 0
+        self.db_hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(question: str, model: str, temperature: float) -> str:
+        """
+        Build the cache key for a question and model settings
+
+        Args:
+            question: Question text
+            model: Model name
+            temperature: Sampling temperature
+
+        Returns:
+            Hex digest key
+        """
+        raw = f"{model}|{temperature}|{normalize_question(question)}"
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    async def get(self, key: str) -> Optional[str]:
+        """
+        Look up an answer, promoting SQLite hits into memory
+
+        Args:
+            key: Cache key from make_key
+
+        Returns:
+            Cached answer or None
+        """
+        entry = self._memory.get(key)
+        if entry:
+            answer, expires = entry
+            if expires > time.time():
+                self._memory.move_to_end(key)
+                self.memory_hits += 1
+                return answer
+            del self._memory[key]
+
+        try:
+            row = await asyncio.to_thread(self._db_get, key)
+        except Exception as e:
+            logger.warning(f"Answer cache lookup failed: {e}")
+            row = None
+
+        if row:
+            answer, expires = row
+            self._remember(key, answer, expires)
+            self.db_hits += 1
+            return answer
+
+        self.misses += 1
+        return None
+
+    async def set(self, key: str, question: str, answer: str, model: str):
+        """
+        Store an answer in both tiers
+
+        Args:
+            key: Cache key from make_key
+            question: Original question
+            answer: Answer text
+            model: Model that produced the answer
+        """
+        expires = time.time() + self.ttl
+        self._remember(key, answer, expires)
+        self._writes += 1
+        prune = self._writes % self.prune_every == 0
+        try:
+            await asyncio.to_thread(self._db_set, key, question, answer, model, prune)
+        except Exception as e:
+            logger.warning(f"Answer cache write failed: {e}")
+
+    async def recent(self, limit: int) -> List[Tuple[str, str, str, float]]:
+        """
+        Load the most recent unexpired answers from SQLite
+
+        Args:
+            limit: Maximum number of answers
+
+        Returns:
+            List of (question, answer, model, expiry timestamp), newest last
+        """
+        try:
+            return await asyncio.to_thread(self._db_recent, limit)
+        except Exception as e:
+            logger.warning(f"Failed to load cached answers: {e}")
+            return []
+
+    def stats(self) -> dict:
+        """
+        Get cache statistics
+
+        Returns:
+            Dictionary with hit/miss counters and memory tier size
+        """
+        lookups = self.memory_hits + self.db_hits + self.misses
+        return {
+            "memory_hits": self.memory_hits,
+            "db_hits": self.db_hits,
+            "misses": self.misses,
+            "hit_rate": round((self.memory_hits + self.db_hits) / lookups, 3) if lookups else 0.0,
+            "memory_size": len(self._memory),
+        }
+
+    def _remember(self, key: str, answer: str, expires: float):
+        """Insert into the memory tier, evicting the least recently used"""
+        self._memory[key] = (answer, expires)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_size:
+            self._memory.popitem(last=False)
+
+    def _db_get(self, key: str) -> Optional[Tuple[str, float]]:
+        """Read an unexpired answer from SQLite"""
+        db = SessionLocal()
+        try:
+            entry = db.get(AnswerCacheEntry, key)
+            if entry and entry.expires_at > datetime.utcnow():
+                expires = time.time() + (entry.expires_at - datetime.utcnow()).total_seconds()
+                return entry.answer, expires
+            return None
+        finally:
+            db.close()
+
+    def _db_recent(self, limit: int) -> List[Tuple[str, str, str, float]]:
+        """Read the newest unexpired answers from SQLite"""
+        db = SessionLocal()
+        try:
+            now = datetime.utcnow()
+            entries = (
+                db.query(AnswerCacheEntry)
+                .filter(AnswerCacheEntry.expires_at > now)
+                .order_by(AnswerCacheEntry.created_at.desc())
+                .limit(limit)
+                .all()
+            )
+            offset = time.time()
+            return [
+                (
+                    entry.question,
+                    entry.answer,
+                    entry.model,
+                    offset + (entry.expires_at - now).total_seconds(),
+                )
+                for entry in reversed(entries)
+            ]
+        finally:
+            db.close()
+
+    def _db_set(self, key: str, question: str, answer: str, model: str, prune: bool):
+        """Upsert an answer into SQLite, optionally pruning old rows"""
+        db = SessionLocal()
+        try:
+            now = datetime.utcnow()
+            db.merge(
+                AnswerCacheEntry(
+                    key=key,
+                    question=question,
+                    answer=answer,
+                    model=model,
+                    created_at=now,
+                    expires_at=now + timedelta(seconds=self.ttl),
+                )
+            )
+            if prune:
+                db.query(AnswerCacheEntry).filter(
+                    AnswerCacheEntry.expires_at <= now
+                ).delete()
+                overflow = db.query(AnswerCacheEntry).count() - self.max_rows
+                if overflow > 0:
+                    oldest = (
+                        db.query(AnswerCacheEntry.key)
+                        .order_by(AnswerCacheEntry.created_at)
+                        .limit(overflow)
+                        .subquery()
+                    )
+                    db.query(AnswerCacheEntry).filter(
+                        AnswerCacheEntry.key.in_(oldest.select())
+                    ).delete(synchronize_session=False)
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+
+# Global answer cache instance
+answer_cache: Optional[AnswerCache] = None
+
+
+def get_answer_cache() -> AnswerCache:
+    """Get or create the global answer cache"""
+    global answer_cache
+    if answer_cache is None:
+        settings = get_settings()
+        answer_cache = AnswerCache(
+            ttl=settings.ANSWER_CACHE_TTL,
+            memory_size=settings.ANSWER_CACHE_MEMORY_SIZE,
+            max_rows=settings.ANSWER_CACHE_MAX_ROWS,
+        )
+    return answer_cache
@@ -0,0 +1,300 @@
+"""Per-user conversation memory for follow-up questions"""
+
+import asyncio
+import json
+import logging
+import time
+from collections import OrderedDict, deque
+from datetime import timezone
+from typing import Deque, List, Optional, Tuple
+
+from app.config import get_settings
+from app.models.database import SessionLocal, Message, get_state, set_state
+from app.services.text_reducer import estimate_tokens
+
+logger = logging.getLogger(__name__)
+
+# (question, answer, Unix time)
+Turn = Tuple[str, str, float]
+
+# Prefix the Telegram router puts on Q&A replies stored in the messages table
+ANSWER_PREFIX = "🤖 "
+FAILED_ANSWER_PREFIX = "🤖 ❌"
+
+SUMMARY_STATE_KEY = "conversation_summary:{user_id}"
+
+
+class Conversation:
+    """Recent question/answer turns and a rolling summary of older ones"""
+
+    def __init__(self, max_turns: int):
+        """
+        Initialize conversation
+
+        Args:
+            max_turns: Ring buffer size
+        """
+        self.turns: Deque[Turn] = deque(maxlen=max_turns)
+        self.summary = ""
+        # Time of the newest turn already folded into the summary
+        self.summarized_through = 0.0
+        self.folding = False
+
+
+class ConversationStore:
+    """
+    Bounded per-user conversation memory
+
+    Each user gets a ring buffer of recent turns, loaded on first use from
+    the messages table (which the message writer already keeps up to date)
+    and kept in an LRU of at most max_users conversations. Prompts include
+    the newest turns that fit in token_budget, stopping at a gap longer
+    than idle_timeout, plus a rolling summary of everything older. The
+    summary is stored in the bot_state table.
+    """
+
+    def __init__(
+        self,
+        max_users: int = 1000,
+        max_turns: int = 20,
+        token_budget: int = 1000,
+        idle_timeout: int = 1800,
+        summary_min_tokens: int = 150,
+    ):
+        """
+        Initialize conversation store
+
+        Args:
+            max_users: Conversations kept in memory
+            max_turns: Turns kept per conversation
+            token_budget: Max estimated tokens of recent turns sent with a question
+            idle_timeout: Seconds of silence that start a new conversation window
+            summary_min_tokens: Tokens of turns outside the window that trigger a summary update
+        """
+        self.max_users = max_users
+        self.max_turns = max_turns
+        self.token_budget = token_budget
+        self.idle_timeout = idle_timeout
+        self.summary_min_tokens = summary_min_tokens
+        self._conversations: "OrderedDict[int, Conversation]" = OrderedDict()
+        self.loads = 0
+        self.summaries = 0
+
+    async def get(self, user_id: int) -> Conversation:
+        """
+        Get a user's conversation, loading it from the database if needed
+
+        Args:
+            user_id: Telegram user ID
+
+        Returns:
+            Conversation
+        """
+        conversation = self._conversations.get(user_id)
+        if conversation is not None:
+            self._conversations.move_to_end(user_id)
+            return conversation
+
+        try:
+            conversation = await asyncio.to_thread(self._db_load, user_id)
+            self.loads += 1
+        except Exception as e:
+            logger.warning(f"Failed to load conversation for user {user_id}: {e}")
+            conversation = Conversation(self.max_turns)
+
+        # Another task may have loaded it while we were waiting
+        existing = self._conversations.get(user_id)
+        if existing is not None:
+            return existing
+        self._conversations[user_id] = conversation
+        if len(self._conversations) > self.max_users:
+            self._conversations.popitem(last=False)
+        return conversation
+
+    def window(self, conversation: Conversation, now: Optional[float] = None) -> List[Turn]:
+        """
+        Select the recent turns to send with a new question
+
+        Args:
+            conversation: User's conversation
+            now: Current Unix time (defaults to time.time())
+
+        Returns:
+            Turns oldest first; empty if the user has been idle
+        """
+        newer = time.time() if now is None else now
+        selected: List[Turn] = []
+        tokens = 0
+        for turn in reversed(conversation.turns):
+            if newer - turn[2] > self.idle_timeout:
+                break
+            tokens += estimate_tokens(turn[0]) + estimate_tokens(turn[1])
+            if tokens > self.token_budget:
+                break
+            selected.append(turn)
+            newer = turn[2]
+        selected.reverse()
+        return selected
+
+    def build_messages(
+        self, conversation: Conversation, system_prompt: str, question: str
+    ) -> Tuple[List[dict], bool]:
+        """
+        Build chat messages for a question with conversation context
+
+        Args:
+            conversation: User's conversation
+            system_prompt: System prompt for the answer
+            question: New question
+
+        Returns:
+            Tuple of (messages, standalone); standalone is True when no
+            context was added, so the answer does not depend on this user
+        """
+        messages = [{"role": "system", "content": system_prompt}]
+        turns = self.window(conversation)
+        if turns:
+            if conversation.summary:
+                messages.append({
+                    "role": "system",
+                    "content": f"Summary of the earlier conversation: {conversation.summary}",
+                })
+            for turn_question, turn_answer, _ in turns:
+                messages.append({"role": "user", "content": turn_question})
+                messages.append({"role": "assistant", "content": turn_answer})
+        messages.append({"role": "user", "content": question})
+        return messages, not turns
+
+    def record(self, conversation: Conversation, question: str, answer: str):
+        """
+        Append a turn to a conversation
+
+        Args:
+            conversation: User's conversation
+            question: Question text
+            answer: Answer text (without the reply prefix)
+        """
+        conversation.turns.append((question, answer, time.time()))
+
+    def turns_to_summarize(self, conversation: Conversation) -> List[Turn]:
+        """
+        Turns that have left the window but are not in the summary yet
+
+        Args:
+            conversation: User's conversation
+
+        Returns:
+            Turns oldest first, or an empty list while there are too few
+            of them to be worth a summary update (or one is in progress)
+        """
+        if conversation.folding:
+            return []
+        cutoff = len(conversation.turns) - len(self.window(conversation))
+        turns = [
+            turn
+            for turn in list(conversation.turns)[:cutoff]
+            if turn[2] > conversation.summarized_through
+        ]
+        tokens = sum(estimate_tokens(q) + estimate_tokens(a) for q, a, _ in turns)
+        return turns if tokens >= self.summary_min_tokens else []
+
+    async def save_summary(
+        self, user_id: int, conversation: Conversation, summary: str, through: float
+    ):
+        """
+        Replace a conversation's rolling summary and persist it
+
+        Args:
+            user_id: Telegram user ID
+            conversation: User's conversation
+            summary: New summary text
+            through: Time of the newest turn covered by the summary
+        """
+        conversation.summary = summary
+        conversation.summarized_through = through
+        self.summaries += 1
+        value = json.dumps({"summary": summary, "through": through})
+        try:
+            await asyncio.to_thread(self._db_save_summary, user_id, value)
+        except Exception as e:
+            logger.warning(f"Failed to save conversation summary for user {user_id}: {e}")
+
+    def stats(self) -> dict:
+        """
+        Get store statistics
+
+        Returns:
+            Dictionary with conversation counts and settings
+        """
+        return {
+            "conversations": len(self._conversations),
+            "max_users": self.max_users,
+            "turns": sum(len(c.turns) for c in self._conversations.values()),
+            "loads": self.loads,
+            "summaries": self.summaries,
+            "token_budget": self.token_budget,
+        }
+
+    def _db_load(self, user_id: int) -> Conversation:
+        """Rebuild a conversation from the messages and bot_state tables"""
+        conversation = Conversation(self.max_turns)
+        db = SessionLocal()
+        try:
+            rows = (
+                db.query(Message)
+                .filter(
+                    Message.user_id == user_id,
+                    Message.response.like(f"{ANSWER_PREFIX}%"),
+                    ~Message.response.like(f"{FAILED_ANSWER_PREFIX}%"),
+                )
+                .filter((Message.is_command.is_(False)) | (Message.command == "fresh"))
+                .order_by(Message.created_at.desc())
+                .limit(self.max_turns)
+                .all()
+            )
+            for row in reversed(rows):
+                question = row.text
+                if row.is_command:
+                    parts = question.split(maxsplit=1)
+                    question = parts[1] if len(parts) > 1 else ""
+                created = row.created_at.replace(tzinfo=timezone.utc).timestamp()
+                conversation.turns.append(
+                    (question, row.response[len(ANSWER_PREFIX):], created)
+                )
+
+            stored = get_state(db, SUMMARY_STATE_KEY.format(user_id=user_id))
+            if stored:
+                data = json.loads(stored)
+                conversation.summary = data["summary"]
+                conversation.summarized_through = data["through"]
+        finally:
+            db.close()
+        return conversation
+
+    @staticmethod
+    def _db_save_summary(user_id: int, value: str):
+        """Write a summary to the bot_state table"""
+        db = SessionLocal()
+        try:
+            set_state(db, SUMMARY_STATE_KEY.format(user_id=user_id), value)
+        finally:
+            db.close()
+
+
+# Global conversation store instance
+conversation_store: Optional[ConversationStore] = None
+
+
+def get_conversation_store() -> ConversationStore:
+    """Get or create the global conversation store"""
+    global conversation_store
+    if conversation_store is None:
+        settings = get_settings()
+        conversation_store = ConversationStore(
+            max_users=settings.CONVERSATION_MAX_USERS,
+            max_turns=settings.CONVERSATION_MAX_TURNS,
+            token_budget=settings.CONVERSATION_TOKEN_BUDGET,
+            idle_timeout=settings.CONVERSATION_IDLE_TIMEOUT,
+            summary_min_tokens=settings.CONVERSATION_SUMMARY_MIN_TOKENS,
+        )
+    return conversation_store
@@ -0,0 +1,331 @@
+"""Email ingest stage: summarize and classify each email once, when first stored"""
+
+import asyncio
+import logging
+from datetime import datetime
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from googleapiclient.errors import HttpError
+from sqlalchemy import or_
+
+from app.config import get_settings
+from app.models.database import SessionLocal, Email, EmailPriority
+from app.services.ai_service import AIService
+from app.services.gmail_service import GmailService
+from app.services.priority_classifier import get_priority_classifier
+
+logger = logging.getLogger(__name__)
+
+
+def _row_dict(row: Email) -> dict:
+    """Email row as an EmailSchema-shaped dict"""
+    return {
+        "id": row.id,
+        "gmail_id": row.gmail_id,
+        "sender": row.sender,
+        "subject": row.subject,
+        "body": row.body,
+        "summary": row.summary,
+        "priority": row.priority.value if row.priority else EmailPriority.MEDIUM.value,
+        "priority_source": row.priority_source,
+        "is_unread": row.is_unread,
+        "is_replied": row.is_replied,
+        "received_at": row.received_at,
+    }
+
+
+def summary_or_preview(email: dict, max_length: int = 150) -> str:
+    """
+    Text to show for an email: its summary, or while that is pending the
+    start of its body
+
+    Args:
+        email: Email dict with summary and body
+        max_length: Maximum preview length
+
+    Returns:
+        Summary or truncated body
+    """
+    if email.get("summary"):
+        return email["summary"]
+    body = (email.get("body") or "").strip()
+    return body if len(body) <= max_length else body[:max_length] + "..."
+
+
+async def _no_results() -> dict:
+    """Empty result for a step with nothing to do"""
+    return {}
+
+
+class EmailIngest:
+    """
+    Stores emails with their summary and priority computed once
+
+    Read paths list unread message IDs from Gmail, serve the emails already
+    stored as they are, and only fetch, summarize and classify the ones
+    seen for the first time. Emails whose summary or priority could not be
+    computed are stored anyway and completed later by backfill().
+    """
+
+    def __init__(self):
+        """Initialize ingest stage"""
+        self.settings = get_settings()
+        # Serializes inserts so concurrent reads cannot store a message twice
+        self._store_lock = asyncio.Lock()
+        self.ingested = 0
+        self.served_from_db = 0
+        self.backfilled = 0
+        self.enrich_failures = 0
+
+    async def get_unread(
+        self, gmail: GmailService, ai_service: AIService, max_results: int = 10
+    ) -> Tuple[List[dict], int]:
+        """
+        Get unread emails, ingesting the ones not stored yet
+
+        Args:
+            gmail: Gmail service
+            ai_service: AI service for summaries and priorities
+            max_results: Maximum number of emails
+
+        Returns:
+            Tuple of (email dicts in the order Gmail listed them, number of
+            emails stored for the first time)
+        """
+        try:
+            message_ids = await gmail.list_unread_ids(max_results)
+        except HttpError as error:
+            logger.error(f"Failed to list unread emails: {error}")
+            return [], 0
+
+        stored = await asyncio.to_thread(self._db_rows, message_ids)
+        self.served_from_db += len(stored)
+        fetched = await gmail.get_messages([i for i in message_ids if i not in stored])
+        new, inserted = await self.ingest(fetched, ai_service)
+        stored.update(new)
+        return [stored[i] for i in message_ids if i in stored], inserted
+
+    async def ingest(
+        self, emails: List[dict], ai_service: AIService
+    ) -> Tuple[Dict[str, dict], int]:
+        """
+        Summarize, classify and store fetched emails
+
+        Args:
+            emails: Parsed emails from GmailService
+            ai_service: AI service for summaries and priorities
+
+        Returns:
+            Tuple of (stored email dicts by gmail_id, number of rows inserted)
+        """
+        if not emails:
+            return {}, 0
+        await self._enrich(emails, ai_service)
+        async with self._store_lock:
+            rows, inserted = await asyncio.to_thread(self._db_insert, emails)
+        self.ingested += inserted
+        logger.info(f"Ingested {inserted} new emails")
+        await self._retrain(emails)
+        return rows, inserted
+
+    async def backfill(
+        self,
+        ai_service: AIService,
+        limit: Optional[int] = None,
+        email_ids: Optional[Sequence[int]] = None,
+    ) -> int:
+        """
+        Complete stored emails that are missing a summary or priority
+
+        Args:
+            ai_service: AI service for summaries and priorities
+            limit: Maximum emails to process (EMAIL_BACKFILL_BATCH if None)
+            email_ids: Only consider these Email IDs
+
+        Returns:
+            Number of emails processed
+        """
+        rows = await asyncio.to_thread(
+            self._db_incomplete, limit or self.settings.EMAIL_BACKFILL_BATCH, email_ids
+        )
+        if not rows:
+            return 0
+        await self._enrich(rows, ai_service)
+        async with self._store_lock:
+            await asyncio.to_thread(self._db_update, rows)
+        self.backfilled += len(rows)
+        logger.info(f"Backfilled {len(rows)} emails")
+        await self._retrain(rows)
+        return len(rows)
+
+    async def pending(self) -> int:
+        """
+        Count stored emails missing a summary or priority
+
+        Returns:
+            Number of emails backfill() still has to process
+        """
+        return await asyncio.to_thread(self._db_pending)
+
+    def stats(self) -> dict:
+        """
+        Get ingest statistics
+
+        Returns:
+            Dictionary with ingest counters
+        """
+        return {
+            "ingested": self.ingested,
+            "served_from_db": self.served_from_db,
+            "backfilled": self.backfilled,
+            "enrich_failures": self.enrich_failures,
+        }
+
+    async def _enrich(self, emails: List[dict], ai_service: AIService):
+        """Fill in missing summaries and priorities, one batched pass each"""
+        to_summarize = [
+            e for e in emails if self.settings.SUMMARIZE_EMAILS and not e.get("summary")
+        ]
+        to_classify = [e for e in emails if not e.get("priority_source")]
+        summaries, priorities = await asyncio.gather(
+            ai_service.summarize_emails(
+                to_summarize, concurrency=self.settings.GMAIL_SUMMARY_CONCURRENCY
+            )
+            if to_summarize
+            else _no_results(),
+            ai_service.classify_email_priorities(to_classify) if to_classify else _no_results(),
+            return_exceptions=True,
+        )
+        if isinstance(summaries, Exception):
+            logger.error(f"Failed to summarize emails: {summaries}")
+            self.enrich_failures += 1
+            summaries = {}
+        if isinstance(priorities, Exception):
+            logger.error(f"Failed to classify emails: {priorities}")
+            self.enrich_failures += 1
+            priorities = {}
+
+        for email in to_summarize:
+            email["summary"] = summaries.get(email["gmail_id"])
+        for email in to_classify:
+            priority, source = priorities.get(
+                email["gmail_id"], (email.get("priority") or EmailPriority.MEDIUM.value, None)
+            )
+            email["priority"] = priority
+            email["priority_source"] = source
+
+    async def _retrain(self, emails: List[dict]):
+        """Teach the local classifier the new LLM labels"""
+        if not self.settings.PRIORITY_CLASSIFIER_ENABLED:
+            return
+        if not any(e.get("priority_source") == "llm" for e in emails):
+            return
+        try:
+            await get_priority_classifier().retrain()
+        except Exception as e:
+            logger.error(f"Failed to retrain priority classifier: {e}")
+
+    def _complete(self, email: dict) -> bool:
+        """Whether an email needs no more enrichment"""
+        has_summary = bool(email.get("summary")) or not self.settings.SUMMARIZE_EMAILS
+        return has_summary and bool(email.get("priority_source"))
+
+    @staticmethod
+    def _db_rows(gmail_ids: List[str]) -> Dict[str, dict]:
+        """Read stored emails by gmail_id"""
+        if not gmail_ids:
+            return {}
+        db = SessionLocal()
+        try:
+            rows = db.query(Email).filter(Email.gmail_id.in_(gmail_ids)).all()
+            return {row.gmail_id: _row_dict(row) for row in rows}
+        finally:
+            db.close()
+
+    def _db_insert(self, emails: List[dict]) -> Tuple[Dict[str, dict], int]:
+        """Insert emails that are not stored yet"""
+        db = SessionLocal()
+        try:
+            ids = [email["gmail_id"] for email in emails]
+            rows = {
+                row.gmail_id: row
+                for row in db.query(Email).filter(Email.gmail_id.in_(ids)).all()
+            }
+            inserted = 0
+            for email in emails:
+                if email["gmail_id"] in rows:
+                    continue
+                row = Email(
+                    gmail_id=email["gmail_id"],
+                    sender=email["sender"],
+                    subject=email["subject"],
+                    body=email["body"],
+                    summary=email.get("summary"),
+                    priority=EmailPriority(email.get("priority") or EmailPriority.MEDIUM.value),
+                    priority_source=email.get("priority_source"),
+                    received_at=email["received_at"],
+                    processed_at=datetime.utcnow() if self._complete(email) else None,
+                )
+                db.add(row)
+                rows[email["gmail_id"]] = row
+                inserted += 1
+            db.commit()
+            return {gmail_id: _row_dict(row) for gmail_id, row in rows.items()}, inserted
+        finally:
+            db.close()
+
+    def _incomplete_filter(self):
+        """SQL condition for stored emails missing a summary or priority"""
+        missing = [Email.priority_source.is_(None)]
+        if self.settings.SUMMARIZE_EMAILS:
+            missing.append(Email.summary.is_(None))
+        return or_(*missing)
+
+    def _db_pending(self) -> int:
+        """Count stored emails missing a summary or priority"""
+        db = SessionLocal()
+        try:
+            return db.query(Email).filter(self._incomplete_filter()).count()
+        finally:
+            db.close()
+
+    def _db_incomplete(self, limit: int, email_ids: Optional[Sequence[int]]) -> List[dict]:
+        """Read stored emails missing a summary or priority"""
+        db = SessionLocal()
+        try:
+            query = db.query(Email).filter(self._incomplete_filter())
+            if email_ids is not None:
+                query = query.filter(Email.id.in_(email_ids))
+            return [_row_dict(row) for row in query.order_by(Email.id).limit(limit).all()]
+        finally:
+            db.close()
+
+    def _db_update(self, emails: List[dict]):
+        """Store the summaries and priorities computed for existing rows"""
+        db = SessionLocal()
+        try:
+            for email in emails:
+                row = db.get(Email, email["id"])
+                if row is None:
+                    continue
+                row.summary = row.summary or email.get("summary")
+                if not row.priority_source and email.get("priority_source"):
+                    row.priority = EmailPriority(email["priority"])
+                    row.priority_source = email["priority_source"]
+                if self._complete(_row_dict(row)):
+                    row.processed_at = datetime.utcnow()
+            db.commit()
+        finally:
+            db.close()
+
+
+# Global ingest stage instance
+email_ingest: Optional[EmailIngest] = None
+
+
+def get_email_ingest() -> EmailIngest:
+    """Get or create the global email ingest stage"""
+    global email_ingest
+    if email_ingest is None:
+        email_ingest = EmailIngest()
+    return email_ingest
@@ -1,27 +1,75 @@
 """Gmail service for reading and sending emails via Gmail API"""
 
+import asyncio
 import base64
 import logging
 import os
 import json
-from typing import List, Optional
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple, Union
 from email.mime.text import MIMEText
 from pathlib import Path
 from datetime import datetime, timedelta
 
+import httplib2
 from google.auth.transport.requests import Request
 from google.oauth2.service_account import Credentials
 from google.oauth2.credentials import Credentials as UserCredentials
 from google_auth_oauthlib.flow import InstalledAppFlow
+from google.auth.credentials import AnonymousCredentials
 from google.auth.exceptions import RefreshError
+from google_auth_httplib2 import AuthorizedHttp
 from googleapiclient.discovery import build
 from googleapiclient.errors import HttpError
+from googleapiclient.http import BatchHttpRequest, build_http
 
 from app.config import get_settings
 from app.models.schemas import EmailSchema
+from app.services.resilience import DeadlineExceeded, get_dependency
+from app.services.single_flight import get_single_flight
+from app.services.text_reducer import html_to_text
 
 logger = logging.getLogger(__name__)
 
+# Worker threads for message fetches, sized by GMAIL_FETCH_CONCURRENCY
+_fetch_executor: Optional[ThreadPoolExecutor] = None
+
+# httplib2 connections are not thread-safe, so each worker thread gets its own
+_thread_local = threading.local()
+
+# Gmail accepts at most 100 calls per batch request
+MAX_BATCH_SIZE = 100
+
+# Per-message statuses worth fetching again: rate limits and server errors
+RETRIABLE_STATUSES = {429, 500, 502, 503, 504}
+
+# Fetched message: parsed email, None if it could not be parsed, or the error
+FetchResult = Union[Optional[dict], Exception]
+
+
+def _get_fetch_executor() -> ThreadPoolExecutor:
+    """Get or create the shared message fetch thread pool"""
+    global _fetch_executor
+    if _fetch_executor is None:
+        _fetch_executor = ThreadPoolExecutor(
+            max_workers=get_settings().GMAIL_FETCH_CONCURRENCY,
+            thread_name_prefix="gmail-fetch",
+        )
+    return _fetch_executor
+
+
+def _retriable(error: Exception) -> bool:
+    """Whether a failed message or batch fetch should be tried again"""
+    if isinstance(error, HttpError):
+        if error.resp.status == 403:
+            # Gmail reports per-user rate limits as 403 rateLimitExceeded
+            details = error.error_details if isinstance(error.error_details, list) else []
+            reasons = {d.get("reason") for d in details if isinstance(d, dict)}
+            return bool(reasons & {"rateLimitExceeded", "userRateLimitExceeded"})
+        return error.resp.status in RETRIABLE_STATUSES
+    return isinstance(error, (ConnectionError, TimeoutError, httplib2.HttpLib2Error))
+
 
 class GmailService:
     """Service for Gmail operations including read, send, and OAuth2 authentication"""
@@ -30,13 +78,27 @@ class GmailService:
         """Initialize Gmail service"""
         self.settings = get_settings()
         self.service = None
+        self._credentials = None
+        # Concurrent identical list and message requests share one API call
+        self._flight = get_single_flight("gmail")
         self._initialize_service()
 
     def _initialize_service(self):
         """Initialize Gmail API service with OAuth2 credentials"""
         try:
-            creds = self._get_credentials()
-            self.service = build("gmail", "v1", credentials=creds)
+            if self.settings.GMAIL_API_BASE:
+                # Local stand-in (e.g. the load-test fake) - no OAuth
+                creds = AnonymousCredentials()
+                self.service = build(
+                    "gmail",
+                    "v1",
+                    credentials=creds,
+                    client_options={"api_endpoint": self.settings.GMAIL_API_BASE},
+                )
+            else:
+                creds = self._get_credentials()
+                self.service = build("gmail", "v1", credentials=creds)
+            self._credentials = creds
             logger.info("Gmail service initialized successfully")
         except FileNotFoundError as e:
             logger.warning(f"Gmail credentials not found: {e}. Gmail service disabled.")
@@ -104,12 +166,17 @@ class GmailService:
 
         return creds
 
-    def get_unread_emails(
+    async def get_unread_emails(
         self, max_results: int = 10, summary_ai=None
     ) -> List[EmailSchema]:
         """
         Fetch unread emails from Gmail
 
+        Messages are fetched in batch requests (GMAIL_BATCH_SIZE) and
+        summarized in parallel batches (GMAIL_SUMMARY_CONCURRENCY). Emails
+        keep the order Gmail listed them in; messages that fail to fetch
+        are skipped.
+
         Args:
             max_results: Maximum number of emails to fetch
             summary_ai: Optional AI service for summarizing emails
@@ -118,22 +185,16 @@ class GmailService:
             List of email schemas
         """
         try:
-            results = self.service.users().messages().list(
-                userId="me", q="is:unread", maxResults=max_results
-            ).execute()
+            message_ids = await self.list_unread_ids(max_results)
+            emails = await self._fetch_messages(message_ids)
 
-            messages = results.get("messages", [])
-            emails = []
-
-            for message in messages:
-                email_data = self._parse_message(message["id"])
-                if email_data:
-                    # Optionally summarize with AI
-                    if summary_ai:
-                        email_data["summary"] = summary_ai.summarize_text(
-                            email_data["body"]
-                        )
-                    emails.append(email_data)
+            # Optionally summarize with AI, several emails per request
+            if summary_ai and emails:
+                summaries = await summary_ai.summarize_emails(
+                    emails, concurrency=self.settings.GMAIL_SUMMARY_CONCURRENCY
+                )
+                for email_data in emails:
+                    email_data["summary"] = summaries.get(email_data["gmail_id"])
 
             logger.info(f"Retrieved {len(emails)} unread emails")
             return emails
@@ -142,9 +203,220 @@ class GmailService:
             logger.error(f"Failed to fetch emails: {error}")
             return []
 
+    async def list_unread_ids(self, max_results: int = 10) -> List[str]:
+        """
+        List unread message IDs without fetching the messages
+
+        Args:
+            max_results: Maximum number of IDs
+
+        Returns:
+            Gmail message IDs, newest first
+        """
+        results = await self._list_messages("is:unread", max_results)
+        return [m["id"] for m in results.get("messages", [])]
+
+    async def get_messages(self, message_ids: List[str]) -> List[dict]:
+        """
+        Fetch and parse messages by ID
+
+        Args:
+            message_ids: Gmail message IDs
+
+        Returns:
+            Parsed emails in the order of message_ids, without failed ones
+        """
+        if not message_ids:
+            return []
+        return await self._fetch_messages(message_ids)
+
+    async def _list_messages(self, query: str, max_results: int) -> dict:
+        """
+        List messages matching a search query
+
+        Args:
+            query: Gmail search query
+            max_results: Maximum number of messages
+
+        Returns:
+            messages.list response
+        """
+        request = self.service.users().messages().list(
+            userId="me", q=query, maxResults=max_results
+        )
+        return await self._flight.do(
+            ("list", query, max_results),
+            lambda: get_dependency("gmail").call(
+                lambda: asyncio.to_thread(self._execute, request)
+            ),
+        )
+
+    async def _fetch_messages(self, message_ids: List[str]) -> List[dict]:
+        """
+        Fetch and parse messages on the fetch thread pool
+
+        Args:
+            message_ids: Gmail message IDs
+
+        Returns:
+            Parsed emails in the order of message_ids, without failed ones
+        """
+        batch_size = min(self.settings.GMAIL_BATCH_SIZE, MAX_BATCH_SIZE)
+        if batch_size > 1:
+            fetched = await self._fetch_batched(message_ids, batch_size)
+        else:
+            fetched = await self._fetch_each(message_ids)
+        emails = []
+        for message_id in message_ids:
+            result = fetched.get(message_id)
+            if isinstance(result, Exception):
+                logger.error(f"Failed to fetch message {message_id}: {result}")
+            elif result:
+                # Coalesced callers share the parsed dict; callers add fields to it
+                emails.append(dict(result))
+        return emails
+
+    async def _fetch_each(self, message_ids: List[str]) -> Dict[str, FetchResult]:
+        """Fetch messages with one messages.get request each, in parallel"""
+        loop = asyncio.get_running_loop()
+        executor = _get_fetch_executor()
+        results = await asyncio.gather(
+            *(
+                self._flight.do(
+                    ("message", message_id),
+                    lambda message_id=message_id: loop.run_in_executor(
+                        executor, self._parse_message, message_id
+                    ),
+                )
+                for message_id in message_ids
+            ),
+            return_exceptions=True,
+        )
+        return dict(zip(message_ids, results))
+
+    async def _fetch_batched(
+        self, message_ids: List[str], batch_size: int
+    ) -> Dict[str, FetchResult]:
+        """Fetch messages in batch requests of up to batch_size, in parallel"""
+        unique = list(dict.fromkeys(message_ids))
+        chunks = [
+            tuple(unique[i:i + batch_size]) for i in range(0, len(unique), batch_size)
+        ]
+        results = await asyncio.gather(
+            *(
+                self._flight.do(("batch", chunk), lambda chunk=chunk: self._fetch_batch(chunk))
+                for chunk in chunks
+            ),
+            return_exceptions=True,
+        )
+        fetched: Dict[str, FetchResult] = {}
+        for chunk, result in zip(chunks, results):
+            if isinstance(result, Exception):
+                fetched.update(dict.fromkeys(chunk, result))
+            else:
+                fetched.update(result)
+        return fetched
+
+    async def _fetch_batch(self, message_ids: Tuple[str, ...]) -> Dict[str, FetchResult]:
+        """
+        Fetch messages in one batch request, retrying the ones that failed
+
+        Messages that failed with a rate-limit or server error, or all of
+        them if the batch request itself failed that way, are sent again in
+        a smaller batch after an exponential backoff, up to
+        GMAIL_BATCH_RETRIES times.
+
+        Args:
+            message_ids: Unique Gmail message IDs, at most MAX_BATCH_SIZE
+
+        Returns:
+            Message ID -> parsed email, None if unparseable, or the final error
+        """
+        loop = asyncio.get_running_loop()
+        executor = _get_fetch_executor()
+        retries = self.settings.GMAIL_BATCH_RETRIES
+        results: Dict[str, FetchResult] = {}
+        pending = list(message_ids)
+        for attempt in range(retries + 1):
+            if attempt:
+                await asyncio.sleep(self.settings.GMAIL_BATCH_RETRY_DELAY * 2 ** (attempt - 1))
+            try:
+                responses = await get_dependency("gmail").call(
+                    lambda: loop.run_in_executor(executor, self._execute_batch, pending)
+                )
+            except Exception as e:
+                if isinstance(e, DeadlineExceeded) or not _retriable(e) or attempt == retries:
+                    results.update(dict.fromkeys(pending, e))
+                    return results
+                logger.warning(f"Batch fetch of {len(pending)} messages failed, retrying: {e}")
+                continue
+
+            failed = []
+            for message_id in pending:
+                message, error = responses[message_id]
+                if error is None:
+                    results[message_id] = self._to_email(message_id, message)
+                elif _retriable(error) and attempt < retries:
+                    failed.append(message_id)
+                else:
+                    results[message_id] = error
+            if not failed:
+                break
+            logger.warning(
+                f"Retrying {len(failed)} of {len(pending)} messages after batch item errors"
+            )
+            pending = failed
+        return results
+
+    def _execute_batch(self, message_ids: List[str]) -> Dict[str, tuple]:
+        """
+        Get messages in one batch HTTP request on this thread's HTTP client
+
+        Args:
+            message_ids: Unique Gmail message IDs
+
+        Returns:
+            Message ID -> (message resource or None, HttpError or None)
+
+        Raises:
+            HttpError: If the batch request itself failed
+        """
+        responses = {}
+
+        def collect(request_id, response, exception):
+            responses[request_id] = (response, exception)
+
+        if self.settings.GMAIL_API_BASE:
+            # new_batch_http_request() always posts to googleapis.com
+            batch = BatchHttpRequest(
+                callback=collect,
+                batch_uri=f"{self.settings.GMAIL_API_BASE.rstrip('/')}/batch/gmail/v1",
+            )
+        else:
+            batch = self.service.new_batch_http_request(callback=collect)
+        for message_id in message_ids:
+            batch.add(
+                self.service.users().messages().get(userId="me", id=message_id, format="full"),
+                request_id=message_id,
+            )
+        batch.execute(http=self._thread_http())
+        return responses
+
+    def _execute(self, request):
+        """Execute an API request on this thread's HTTP client"""
+        return request.execute(http=self._thread_http())
+
+    def _thread_http(self) -> AuthorizedHttp:
+        """Get this thread's authorized HTTP client"""
+        http = getattr(_thread_local, "http", None)
+        if http is None or http.credentials is not self._credentials:
+            http = AuthorizedHttp(self._credentials, http=build_http())
+            _thread_local.http = http
+        return http
+
     def _parse_message(self, message_id: str) -> Optional[dict]:
         """
-        Parse a Gmail message into email schema
+        Fetch a Gmail message and parse it into email schema
 
         Args:
             message_id: Gmail message ID
@@ -153,10 +425,28 @@ class GmailService:
             Email data dictionary or None if parsing fails
         """
         try:
-            message = self.service.users().messages().get(
-                userId="me", id=message_id, format="full"
-            ).execute()
+            message = self._execute(
+                self.service.users().messages().get(
+                    userId="me", id=message_id, format="full"
+                )
+            )
+        except Exception as e:
+            logger.error(f"Failed to parse message {message_id}: {e}")
+            return None
+        return self._to_email(message_id, message)
 
+    def _to_email(self, message_id: str, message: dict) -> Optional[dict]:
+        """
+        Parse a Gmail message resource into email schema
+
+        Args:
+            message_id: Gmail message ID
+            message: messages.get response (format=full)
+
+        Returns:
+            Email data dictionary or None if parsing fails
+        """
+        try:
             headers = message["payload"]["headers"]
             subject = next(
                 (h["value"] for h in headers if h["name"] == "Subject"), "No Subject"
@@ -199,10 +489,16 @@ class GmailService:
         try:
             if "parts" in message["payload"]:
                 # Multi-part message
+                html = None
                 for part in message["payload"]["parts"]:
                     if part["mimeType"] == "text/plain":
                         data = part["body"].get("data", "")
                         return base64.urlsafe_b64decode(data).decode("utf-8")
+                    if part["mimeType"] == "text/html" and html is None:
+                        html = part["body"].get("data", "")
+                # HTML-only message
+                if html is not None:
+                    return html_to_text(base64.urlsafe_b64decode(html).decode("utf-8")).strip()
             else:
                 # Simple message
                 data = message["payload"]["body"].get("data", "")
@@ -334,7 +630,7 @@ class GmailService:
             logger.error(f"Failed to create draft: {error}")
             return None
 
-    def get_email_by_label(self, label: str, max_results: int = 5) -> List[dict]:
+    async def get_email_by_label(self, label: str, max_results: int = 5) -> List[dict]:
         """
         Get emails by Gmail label
 
@@ -346,17 +642,10 @@ class GmailService:
             List of email data
         """
         try:
-            results = self.service.users().messages().list(
-                userId="me", q=f"label:{label}", maxResults=max_results
-            ).execute()
+            results = await self._list_messages(f"label:{label}", max_results)
 
             messages = results.get("messages", [])
-            emails = []
-
-            for message in messages:
-                email_data = self._parse_message(message["id"])
-                if email_data:
-                    emails.append(email_data)
+            emails = await self._fetch_messages([m["id"] for m in messages])
 
             logger.info(f"Retrieved {len(emails)} emails with label '{label}'")
             return emails
@@ -0,0 +1,240 @@
+"""Keyword intent matching for natural language commands"""
+
+import re
+from typing import Dict, Any, List, Optional, Tuple
+
+# Intents in priority order: when keywords of several intents occur in a
+# message, the first intent listed here wins. Keywords match anywhere in
+# the lowercased text, including inside longer words.
+INTENT_KEYWORDS: Tuple[Tuple[str, Tuple[str, ...]], ...] = (
+    ("stock", ("stock", "share price", "stock price", "ticker", "market price")),
+    ("crypto", (
+        "bitcoin", "btc", "ethereum", "eth", "crypto", "cryptocurrency", "dogecoin",
+        "doge", "solana", "sol", "cardano", "ada", "ripple", "xrp",
+    )),
+    ("time", ("time in", "current time in", "what time", "time now in", "local time")),
+    ("weather", (
+        "weather in", "weather at", "temperature in", "forecast", "how hot",
+        "how cold", "is it raining", "weather today",
+    )),
+    ("question", (
+        "what", "who", "where", "when", "why", "how", "tell me", "explain", "describe",
+        "?", "meaning", "define", "capital", "population", "distance", "calculate",
+        "convert",
+    )),
+    ("email", ("email", "mail", "unread", "inbox", "gmail")),
+    ("task", ("task", "todo", "reminder", "schedule", "remind", "alarm", "meeting", "appointment")),
+    ("summary", ("summary", "daily summary", "overview", "report", "briefing")),
+    ("help", ("help", "commands", "what can you do", "abilities", "features")),
+)
+
+KNOWN_TICKERS = frozenset((
+    "AAPL", "GOOGL", "GOOG", "MSFT", "AMZN", "META", "TSLA", "NVDA", "NFLX", "AMD",
+    "INTC", "IBM", "ORCL", "CRM", "ADBE", "PYPL", "UBER", "LYFT", "SPOT", "SNAP",
+    "TWTR", "PINS", "ZM", "SHOP", "SQ", "COIN", "HOOD", "RBLX", "ABNB", "PLTR",
+    "SOFI", "NIO", "RIVN", "LCID", "F", "GM", "TM", "BA", "DIS", "WMT", "TGT",
+    "COST", "HD", "LOW", "NKE", "SBUX", "MCD", "KO", "PEP", "JNJ", "PFE", "MRNA",
+    "BNTX", "UNH", "CVS", "WBA", "JPM", "BAC", "WFC", "C", "GS", "MS", "V", "MA", "AXP",
+))
+TICKER_STOPWORDS = frozenset(("THE", "AND", "FOR", "WHAT", "PRICE", "STOCK", "SHOW", "GET", "CHECK"))
+TICKER_CUE_RE = re.compile(r"stock|price|ticker")
+
+SEND_EMAIL_RE = re.compile(r"send|write|compose|to|reply")
+TIME_CITY_PATTERNS = ("time in ", "time is it in ", "time now in ")
+WEATHER_CITY_PATTERNS = ("weather in ", "weather at ", "temperature in ", "forecast for ", "forecast in ")
+DEFAULT_CITY = "New York"
+
+
+def _compile_intents() -> List["re.Pattern[str]"]:
+    """
+    Build the combined keyword regexes
+
+    Every intent becomes a named group, ordered by priority. Entry i of the
+    result matches the keywords of the first i + 1 intents, so once an
+    intent has been found the rest of the text is only scanned for
+    higher-priority ones.
+    """
+    groups = []
+    for name, keywords in INTENT_KEYWORDS:
+        ordered = sorted(keywords, key=len, reverse=True)
+        groups.append(f"(?P<{name}>{'|'.join(re.escape(k) for k in ordered)})")
+    return [re.compile("|".join(groups[: i + 1])) for i in range(len(groups))]
+
+
+_INTENT_RES = _compile_intents()
+_INTENT_PRIORITY = {name: i for i, (name, _) in enumerate(INTENT_KEYWORDS)}
+
+
+def find_intent(text_lower: str) -> Optional[str]:
+    """
+    Find the highest-priority intent whose keywords occur in the text
+
+    Scans left to right once. After each hit the search resumes one
+    character later (keywords may overlap) with a regex limited to
+    intents that outrank the best one found so far.
+
+    Args:
+        text_lower: Lowercased message text
+
+    Returns:
+        Intent name, or None if no keyword occurs
+    """
+    best = None
+    pattern = _INTENT_RES[-1]
+    match = pattern.search(text_lower)
+    while match:
+        best = match.lastgroup
+        priority = _INTENT_PRIORITY[best]
+        if priority == 0:
+            break
+        pattern = _INTENT_RES[priority - 1]
+        match = pattern.search(text_lower, match.start() + 1)
+    return best
+
+
+def extract_ticker(text: str) -> Optional[str]:
+    """
+    Extract a stock ticker from a message
+
+    A known ticker wins, then a short word following "stock", "price" or
+    "ticker", then the first short word that is not a stopword.
+
+    Args:
+        text: Original message text
+
+    Returns:
+        Ticker symbol or None
+    """
+    fallback = None
+    previous = ""
+    for word in text.upper().split():
+        clean = "".join(filter(str.isalpha, word))
+        if clean in KNOWN_TICKERS:
+            return clean
+        if clean and len(clean) <= 5:
+            if previous and TICKER_CUE_RE.search(previous.lower()):
+                return clean
+            if fallback is None and clean not in TICKER_STOPWORDS:
+                fallback = clean
+        previous = word
+    return fallback
+
+
+def extract_crypto_symbol(text_lower: str) -> str:
+    """
+    Map a message to the cryptocurrency it mentions
+
+    Args:
+        text_lower: Lowercased message text
+
+    Returns:
+        Crypto symbol, BTC when nothing more specific is mentioned
+    """
+    words = set(text_lower.split())
+    if "ethereum" in text_lower or "eth" in words:
+        return "ETH"
+    if "doge" in text_lower:
+        return "DOGE"
+    if "solana" in text_lower or "sol" in words:
+        return "SOL"
+    if "cardano" in text_lower or "ada" in words:
+        return "ADA"
+    if "ripple" in text_lower or "xrp" in text_lower:
+        return "XRP"
+    return "BTC"
+
+
+def extract_city(text_lower: str, patterns: Tuple[str, ...]) -> str:
+    """
+    Extract the city following the first matching pattern
+
+    Args:
+        text_lower: Lowercased message text
+        patterns: Phrases that precede a city name
+
+    Returns:
+        City name, or the default city
+    """
+    for pattern in patterns:
+        index = text_lower.rfind(pattern)
+        if index != -1:
+            return text_lower[index + len(pattern):].strip().rstrip("?").strip()
+    return DEFAULT_CITY
+
+
+def match_intent(text: str) -> Dict[str, Any]:
+    """
+    Parse a natural language command into an action with parameters
+
+    Args:
+        text: Message text
+
+    Returns:
+        Dictionary with action, parameters and confidence
+    """
+    text_lower = text.lower().strip()
+    intent = find_intent(text_lower)
+
+    if intent == "stock":
+        return {
+            "action": "get_stock_price",
+            "parameters": {"symbol": extract_ticker(text) or "AAPL"},
+            "confidence": 95,
+        }
+
+    if intent == "crypto":
+        return {
+            "action": "get_crypto_price",
+            "parameters": {"symbol": extract_crypto_symbol(text_lower)},
+            "confidence": 95,
+        }
+
+    if intent == "time":
+        return {
+            "action": "get_time",
+            "parameters": {"city": extract_city(text_lower, TIME_CITY_PATTERNS)},
+            "confidence": 95,
+        }
+
+    if intent == "weather":
+        return {
+            "action": "get_weather",
+            "parameters": {"city": extract_city(text_lower, WEATHER_CITY_PATTERNS)},
+            "confidence": 95,
+        }
+
+    if intent == "question":
+        return {
+            "action": "ask_question",
+            "parameters": {"question": text},
+            "confidence": 90,
+        }
+
+    if intent == "email":
+        if SEND_EMAIL_RE.search(text_lower):
+            recipient = next((word.strip() for word in text.split() if "@" in word), "")
+            return {
+                "action": "send_email",
+                "parameters": {"recipient": recipient, "body": text},
+                "confidence": 90,
+            }
+        return {"action": "read_emails", "parameters": {}, "confidence": 90}
+
+    if intent == "task":
+        return {
+            "action": "schedule_task",
+            "parameters": {"task_name": text},
+            "confidence": 85,
+        }
+
+    if intent == "summary":
+        return {"action": "send_message", "parameters": {"body": text}, "confidence": 80}
+
+    if intent == "help":
+        return {"action": "send_message", "parameters": {"body": text}, "confidence": 85}
+
+    return {
+        "action": "ask_question",
+        "parameters": {"question": text},
+        "confidence": 75,
+    }
@@ -0,0 +1,312 @@
+"""Write-behind ledger of LLM calls: model, tokens, latency and outcome"""
+
+import asyncio
+import logging
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+from openai import APITimeoutError
+from sqlalchemy import insert
+
+from app.config import get_settings
+from app.models.database import SessionLocal, LLMCall
+from app.services.resilience import CircuitOpenError
+
+logger = logging.getLogger(__name__)
+
+# Buffered calls kept while the database is failing; older ones are dropped
+MAX_BACKLOG = 10000
+
+
+def call_outcome(error: Optional[BaseException]) -> str:
+    """
+    Classify how a completion call ended
+
+    Args:
+        error: Exception the call raised, or None on success
+
+    Returns:
+        "ok", "timeout", "rejected" (circuit open), "cancelled" or "error"
+    """
+    if error is None:
+        return "ok"
+    if isinstance(error, (asyncio.TimeoutError, APITimeoutError)):
+        return "timeout"
+    if isinstance(error, CircuitOpenError):
+        return "rejected"
+    if isinstance(error, (asyncio.CancelledError, GeneratorExit)):
+        # GeneratorExit: the reader of a streamed answer stopped early
+        return "cancelled"
+    return "error"
+
+
+def _percentile(ordered: List[int], percentile: float) -> Optional[int]:
+    """Value at a percentile of a sorted list"""
+    if not ordered:
+        return None
+    return ordered[min(int(len(ordered) * percentile / 100), len(ordered) - 1)]
+
+
+class LLMLedger:
+    """
+    Buffer LLM call records and append them to the llm_calls table in batches
+
+    Flushes happen when the buffer reaches flush_size or every
+    flush_interval seconds, and once more on stop. Rows are only ever
+    inserted, one multi-row INSERT per flush.
+    """
+
+    def __init__(self, flush_size: int = 100, flush_interval: float = 5.0, enabled: bool = True):
+        """
+        Initialize ledger
+
+        Args:
+            flush_size: Buffered calls that trigger an immediate flush
+            flush_interval: Maximum seconds a call waits before being written
+            enabled: Record calls (when False, record() does nothing)
+        """
+        self.flush_size = flush_size
+        self.flush_interval = flush_interval
+        self.enabled = enabled
+        self._pending: List[Dict[str, Any]] = []
+        self._flush_needed = asyncio.Event()
+        self._lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self.recorded = 0
+        self.rows_written = 0
+        self.dropped = 0
+        self.failures = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+
+    @property
+    def running(self) -> bool:
+        """Whether the background flush task is running"""
+        return self._task is not None and not self._task.done()
+
+    @property
+    def backlog(self) -> int:
+        """Number of calls waiting to be written"""
+        return len(self._pending)
+
+    def start(self):
+        """Start the background flush task"""
+        if self.enabled and not self.running:
+            self._task = asyncio.create_task(self._flush_loop(), name="llm-ledger")
+            logger.info("LLM ledger started")
+
+    async def stop(self):
+        """Stop the flush task and write everything still buffered"""
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        await self.flush()
+        logger.info("LLM ledger stopped")
+
+    def record(
+        self,
+        method: str,
+        model: str,
+        latency: float,
+        outcome: str,
+        prompt_tokens: Optional[int] = None,
+        completion_tokens: Optional[int] = None,
+    ):
+        """
+        Buffer one completion call
+
+        Args:
+            method: Route the call was made for (classify, summarize, ...)
+            model: Model that was called
+            latency: Seconds the call took
+            outcome: Result from call_outcome()
+            prompt_tokens: Input tokens reported by the API
+            completion_tokens: Output tokens reported by the API
+        """
+        if not self.enabled:
+            return
+        self._pending.append(
+            {
+                "created_at": datetime.utcnow(),
+                "method": method,
+                "model": model,
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "latency_ms": int(latency * 1000),
+                "outcome": outcome,
+            }
+        )
+        self.recorded += 1
+        self.prompt_tokens += prompt_tokens or 0
+        self.completion_tokens += completion_tokens or 0
+        if not self.running or len(self._pending) >= self.flush_size:
+            self._flush_needed.set()
+            if not self.running:
+                asyncio.get_running_loop().create_task(self.flush())
+
+    async def flush(self):
+        """Append all buffered calls in one transaction"""
+        async with self._lock:
+            if not self._pending:
+                return
+            rows, self._pending = self._pending, []
+            self._flush_needed.clear()
+            try:
+                await asyncio.to_thread(self._write, rows)
+            except Exception as e:
+                self.failures += 1
+                logger.error(f"Failed to write {len(rows)} LLM calls, will retry: {e}")
+                self._pending = rows + self._pending
+                overflow = len(self._pending) - MAX_BACKLOG
+                if overflow > 0:
+                    self.dropped += overflow
+                    del self._pending[:overflow]
+                return
+            self.rows_written += len(rows)
+
+    async def aggregate(self, days: int = 7) -> dict:
+        """
+        Summarize recorded calls per method
+
+        Args:
+            days: Look back this many days
+
+        Returns:
+            Dictionary with per-method call counts, outcomes, models, latency
+            percentiles of successful calls and token totals per day
+        """
+        await self.flush()
+        since = datetime.utcnow() - timedelta(days=days)
+        rows = await asyncio.to_thread(self._db_calls, since)
+
+        methods: Dict[str, dict] = {}
+        latencies: Dict[str, List[int]] = defaultdict(list)
+        for created_at, method, model, prompt, completion, latency_ms, outcome in rows:
+            entry = methods.setdefault(
+                method,
+                {
+                    "calls": 0,
+                    "outcomes": defaultdict(int),
+                    "models": defaultdict(int),
+                    "prompt_tokens": 0,
+                    "completion_tokens": 0,
+                    "daily_tokens": defaultdict(int),
+                },
+            )
+            entry["calls"] += 1
+            entry["outcomes"][outcome] += 1
+            entry["models"][model] += 1
+            entry["prompt_tokens"] += prompt or 0
+            entry["completion_tokens"] += completion or 0
+            entry["daily_tokens"][created_at.date().isoformat()] += (prompt or 0) + (completion or 0)
+            if outcome == "ok":
+                latencies[method].append(latency_ms)
+
+        for method, entry in methods.items():
+            ordered = sorted(latencies[method])
+            entry["latency_ms"] = {
+                "p50": _percentile(ordered, 50),
+                "p95": _percentile(ordered, 95),
+                "avg": round(sum(ordered) / len(ordered), 1) if ordered else None,
+            }
+            total = entry["prompt_tokens"] + entry["completion_tokens"]
+            entry["tokens_per_day"] = round(total / days, 1)
+            for key in ("outcomes", "models", "daily_tokens"):
+                entry[key] = dict(sorted(entry[key].items()))
+
+        return {
+            "since": since.isoformat(),
+            "days": days,
+            "calls": len(rows),
+            "methods": dict(sorted(methods.items(), key=lambda item: -item[1]["calls"])),
+        }
+
+    def stats(self) -> dict:
+        """
+        Get ledger statistics
+
+        Returns:
+            Dictionary with buffer and write counters
+        """
+        return {
+            "enabled": self.enabled,
+            "running": self.running,
+            "backlog": self.backlog,
+            "recorded": self.recorded,
+            "rows_written": self.rows_written,
+            "dropped": self.dropped,
+            "failures": self.failures,
+        }
+
+    async def _flush_loop(self):
+        """Flush on size threshold or interval until cancelled"""
+        while True:
+            try:
+                await asyncio.wait_for(self._flush_needed.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            await self.flush()
+
+    @staticmethod
+    def _write(rows: List[Dict[str, Any]]):
+        """Insert rows into the llm_calls table"""
+        db = SessionLocal()
+        try:
+            db.execute(insert(LLMCall), rows)
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    @staticmethod
+    def _db_calls(since: datetime) -> List[tuple]:
+        """Read calls recorded since a time"""
+        db = SessionLocal()
+        try:
+            return db.query(
+                LLMCall.created_at,
+                LLMCall.method,
+                LLMCall.model,
+                LLMCall.prompt_tokens,
+                LLMCall.completion_tokens,
+                LLMCall.latency_ms,
+                LLMCall.outcome,
+            ).filter(LLMCall.created_at >= since).all()
+        finally:
+            db.close()
+
+
+# Global ledger instance
+llm_ledger: Optional[LLMLedger] = None
+
+
+def get_llm_ledger() -> LLMLedger:
+    """Get or create the global LLM ledger"""
+    global llm_ledger
+    if llm_ledger is None:
+        settings = get_settings()
+        llm_ledger = LLMLedger(
+            flush_size=settings.LLM_LEDGER_FLUSH_SIZE,
+            flush_interval=settings.LLM_LEDGER_FLUSH_INTERVAL,
+            enabled=settings.LLM_LEDGER_ENABLED,
+        )
+    return llm_ledger
+
+
+async def start_llm_ledger() -> LLMLedger:
+    """Create and start the global LLM ledger"""
+    ledger = get_llm_ledger()
+    ledger.start()
+    return ledger
+
+
+async def stop_llm_ledger():
+    """Flush and stop the global LLM ledger"""
+    global llm_ledger
+    if llm_ledger:
+        await llm_ledger.stop()
+        llm_ledger = None
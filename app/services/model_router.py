@@ -0,0 +1,235 @@
+"""Per-method model routing with fallback when a model misses its latency SLO"""
+
+import logging
+import time
+from collections import deque
+from typing import Dict, Optional
+
+from app.config import ModelRoute, get_settings
+
+logger = logging.getLogger(__name__)
+
+# Recent primary-model latencies kept per route
+LATENCY_WINDOW = 50
+
+
+class RouteState:
+    """Runtime state of one route"""
+
+    def __init__(self, config: ModelRoute):
+        """
+        Initialize route state
+
+        Args:
+            config: Resolved route configuration (model and timeout set)
+        """
+        self.config = config
+        self.latencies: deque = deque(maxlen=LATENCY_WINDOW)
+        self.fallback_until = 0.0
+        self.times_degraded = 0
+        self.calls: Dict[str, int] = {}
+
+    @property
+    def degraded(self) -> bool:
+        """Whether requests currently go to the fallback model"""
+        return time.monotonic() < self.fallback_until
+
+
+class ModelRouter:
+    """
+    Chooses the model for each kind of AI request
+
+    Every route (classify, summarize, reply, answer, ...) has its own model,
+    token limit and timeout from MODEL_ROUTES. Latencies of the route's
+    primary model are tracked; when their slo_percentile exceeds the
+    route's latency SLO, the route switches to its fallback model for
+    cooldown seconds and then tries the primary again with fresh samples.
+    """
+
+    def __init__(
+        self,
+        routes: Dict[str, ModelRoute],
+        default_model: str,
+        default_timeout: float,
+        fallback_model: Optional[str] = None,
+        slo_percentile: float = 90.0,
+        min_samples: int = 5,
+        cooldown: float = 120.0,
+    ):
+        """
+        Initialize router
+
+        Args:
+            routes: Route name -> configuration
+            default_model: Model for routes without one
+            default_timeout: Timeout for routes without one
+            fallback_model: Fallback for routes without one
+            slo_percentile: Latency percentile compared with the SLO
+            min_samples: Primary calls needed before the SLO is checked
+            cooldown: Seconds a degraded route stays on its fallback
+        """
+        self.default_model = default_model
+        self.default_timeout = default_timeout
+        self.fallback_model = fallback_model
+        self.slo_percentile = slo_percentile
+        self.min_samples = min_samples
+        self.cooldown = cooldown
+        self._routes: Dict[str, RouteState] = {}
+        for name, config in routes.items():
+            self._routes[name] = RouteState(self._resolve(config))
+
+    def route(self, name: str) -> ModelRoute:
+        """
+        Get a route's configuration
+
+        Args:
+            name: Route name
+
+        Returns:
+            Configuration with model and timeout filled in from the defaults
+        """
+        return self._state(name).config
+
+    def choose(self, name: str) -> str:
+        """
+        Pick the model for the next request on a route
+
+        Args:
+            name: Route name
+
+        Returns:
+            Fallback model while the route is degraded, else its primary model
+        """
+        state = self._state(name)
+        if state.degraded and state.config.fallback_model:
+            return state.config.fallback_model
+        return state.config.model
+
+    def degraded(self, name: str) -> bool:
+        """
+        Whether a route is currently on its fallback model
+
+        Args:
+            name: Route name
+
+        Returns:
+            True while the route's primary model is out of its SLO cooldown
+        """
+        state = self._state(name)
+        return state.degraded and bool(state.config.fallback_model)
+
+    def fallback_for(self, name: str, model: str) -> Optional[str]:
+        """
+        Model to retry with after a call on the given model timed out
+
+        Args:
+            name: Route name
+            model: Model that timed out
+
+        Returns:
+            The route's fallback model, or None if model already was the fallback
+        """
+        fallback = self._state(name).config.fallback_model
+        return fallback if fallback and fallback != model else None
+
+    def record(self, name: str, model: str, seconds: float):
+        """
+        Record the latency of a completed (or timed-out) call
+
+        Args:
+            name: Route name
+            model: Model that served the call
+            seconds: Call latency (the timeout for calls that timed out)
+        """
+        state = self._state(name)
+        state.calls[model] = state.calls.get(model, 0) + 1
+        config = state.config
+        if model != config.model:
+            return
+        state.latencies.append(seconds)
+        if (
+            config.latency_slo is None
+            or not config.fallback_model
+            or state.degraded
+            or len(state.latencies) < self.min_samples
+        ):
+            return
+        observed = self._percentile(state)
+        if observed > config.latency_slo:
+            state.fallback_until = time.monotonic() + self.cooldown
+            state.times_degraded += 1
+            state.latencies.clear()
+            logger.warning(
+                f"Route {name}: p{self.slo_percentile:g} latency of {config.model} "
+                f"{observed:.2f}s exceeds SLO {config.latency_slo:g}s, "
+                f"using {config.fallback_model} for {self.cooldown:g}s"
+            )
+
+    def stats(self) -> dict:
+        """
+        Get routing statistics
+
+        Returns:
+            Dictionary of route name -> models, SLO state and call counts
+        """
+        result = {}
+        for name, state in self._routes.items():
+            config = state.config
+            result[name] = {
+                "model": config.model,
+                "fallback_model": config.fallback_model,
+                "max_tokens": config.max_tokens,
+                "timeout": config.timeout,
+                "latency_slo": config.latency_slo,
+                f"p{self.slo_percentile:g}_ms": round(self._percentile(state) * 1000, 1)
+                if state.latencies
+                else None,
+                "degraded": self.degraded(name),
+                "times_degraded": state.times_degraded,
+                "calls": dict(state.calls),
+            }
+        return result
+
+    def _state(self, name: str) -> RouteState:
+        """Get a route's state, creating a default route for unknown names"""
+        state = self._routes.get(name)
+        if state is None:
+            state = self._routes[name] = RouteState(self._resolve(ModelRoute()))
+        return state
+
+    def _resolve(self, config: ModelRoute) -> ModelRoute:
+        """Fill in a route's unset model, timeout and fallback"""
+        return config.model_copy(
+            update={
+                "model": config.model or self.default_model,
+                "timeout": config.timeout or self.default_timeout,
+                "fallback_model": config.fallback_model or self.fallback_model,
+            }
+        )
+
+    def _percentile(self, state: RouteState) -> float:
+        """Latency percentile of a route's recent primary calls"""
+        ordered = sorted(state.latencies)
+        index = min(int(len(ordered) * self.slo_percentile / 100), len(ordered) - 1)
+        return ordered[index]
+
+
+# Global router instance
+model_router: Optional[ModelRouter] = None
+
+
+def get_model_router() -> ModelRouter:
+    """Get or create the global model router"""
+    global model_router
+    if model_router is None:
+        settings = get_settings()
+        model_router = ModelRouter(
+            settings.MODEL_ROUTES,
+            default_model=settings.OPENAI_MODEL,
+            default_timeout=settings.OPENAI_TIMEOUT,
+            fallback_model=settings.OPENAI_FALLBACK_MODEL,
+            slo_percentile=settings.MODEL_SLO_PERCENTILE,
+            min_samples=settings.MODEL_SLO_MIN_SAMPLES,
+            cooldown=settings.MODEL_FALLBACK_COOLDOWN,
+        )
+    return model_router
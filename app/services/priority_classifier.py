@@ -0,0 +1,379 @@
+"""Local email priority classifier trained on LLM-assigned priorities"""
+
+import asyncio
+import logging
+import re
+import time
+import zlib
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.config import get_settings
+from app.models.database import SessionLocal, Email, EmailPriority
+from app.services.text_reducer import clean_email_text
+
+logger = logging.getLogger(__name__)
+
+PRIORITIES = [priority.value for priority in EmailPriority]
+
+_WORD_RE = re.compile(r"[a-z0-9']+")
+_ADDRESS_RE = re.compile(r"[\w.+-]+@([\w-]+\.[\w.-]+)")
+
+# Body words used as features (the opening of an email carries its intent)
+BODY_WORDS = 300
+
+# Rows read from the database per training step
+TRAIN_BATCH_ROWS = 1000
+
+# Lower edges of the confidence bins agreement is measured in; they are
+# also the candidate thresholds (naive Bayes confidences crowd near 1)
+CONFIDENCE_EDGES = (0.0, 0.5, 0.7, 0.8, 0.9, 0.95, 0.98, 0.99, 0.995, 0.999)
+
+# Comparisons kept per bin before older ones are halved away
+CALIBRATION_WINDOW = 1000
+
+
+def email_features(sender: str, subject: str, body: str) -> List[str]:
+    """
+    Extract features from an email
+
+    Args:
+        sender: From header
+        subject: Subject line
+        body: Body text
+
+    Returns:
+        Feature strings: sender address and domain, subject words and
+        leading body words, each namespaced by field
+    """
+    features = []
+    match = _ADDRESS_RE.search(sender.lower())
+    if match:
+        features.append(f"from:{match.group(0)}")
+        features.append(f"domain:{match.group(1)}")
+    features += [f"s:{word}" for word in _WORD_RE.findall(subject.lower())]
+    body_words = _WORD_RE.findall(clean_email_text(body).lower())[:BODY_WORDS]
+    features += [f"b:{word}" for word in body_words]
+    return features
+
+
+def hash_features(emails: Sequence[dict], dim: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Hash the features of a batch of emails
+
+    Args:
+        emails: Dicts with sender, subject and body
+        dim: Number of hash buckets
+
+    Returns:
+        Tuple of (email index, bucket) arrays with one entry per feature
+        occurrence, i.e. a sparse count matrix in coordinate form
+    """
+    rows: List[int] = []
+    buckets: List[int] = []
+    for row, email in enumerate(emails):
+        features = email_features(
+            email.get("sender", ""), email.get("subject", ""), email.get("body", "")
+        )
+        rows += [row] * len(features)
+        buckets += [zlib.crc32(feature.encode("utf-8")) % dim for feature in features]
+    return np.array(rows, dtype=np.intp), np.array(buckets, dtype=np.intp)
+
+
+class PriorityClassifier:
+    """
+    Multinomial naive Bayes over hashed email features
+
+    Training only adds counts, so new labelled emails are learned without
+    revisiting old ones. A batch of emails is scored with vectorized
+    lookups of per-bucket log likelihoods.
+
+    Naive Bayes confidences are not calibrated, so the threshold for
+    answering locally is measured rather than taken from the score: LLM
+    labels for emails with a prediction (including a shadow sample of
+    confident ones) are compared per confidence bin, and the threshold is
+    the lowest bin edge above which the estimated agreement reaches
+    target_agreement. Until enough comparisons exist the configured
+    threshold is used.
+    """
+
+    def __init__(
+        self,
+        dim: int = 16384,
+        min_samples: int = 50,
+        alpha: float = 1.0,
+        threshold: float = 0.9,
+        target_agreement: float = 0.95,
+        calibration_min_samples: int = 50,
+    ):
+        """
+        Initialize classifier
+
+        Args:
+            dim: Number of hash buckets
+            min_samples: Training emails needed before predictions are used
+            alpha: Additive smoothing
+            threshold: Confidence threshold used until calibrated
+            target_agreement: Agreement with the LLM required for local answers
+            calibration_min_samples: Comparisons needed to set a threshold
+        """
+        self.dim = dim
+        self.min_samples = min_samples
+        self.alpha = alpha
+        self.default_threshold = threshold
+        self.target_agreement = target_agreement
+        self.calibration_min_samples = calibration_min_samples
+        self.feature_counts = np.zeros((len(PRIORITIES), dim), dtype=np.float64)
+        self.class_counts = np.zeros(len(PRIORITIES), dtype=np.float64)
+        # Highest Email.id learned; retrain() continues after it
+        self.trained_through = 0
+        self._log_likelihood: Optional[np.ndarray] = None
+        self._log_prior: Optional[np.ndarray] = None
+        self._lock = asyncio.Lock()
+        self.predictions = 0
+        self.predict_seconds = 0.0
+        self.compared = 0
+        self.agreed = 0
+        self.shadow_compared = 0
+        self.shadow_agreed = 0
+        # Per confidence bin: predictions made, LLM comparisons, agreements
+        self._volume = np.zeros(len(CONFIDENCE_EDGES))
+        self._bin_compared = np.zeros(len(CONFIDENCE_EDGES))
+        self._bin_agreed = np.zeros(len(CONFIDENCE_EDGES))
+
+    @property
+    def samples(self) -> int:
+        """Number of training emails"""
+        return int(self.class_counts.sum())
+
+    @property
+    def ready(self) -> bool:
+        """Whether enough emails have been learned for predictions"""
+        return self.samples >= self.min_samples
+
+    def learn(self, emails: Sequence[dict], labels: Sequence[str]):
+        """
+        Add labelled emails to the model
+
+        Args:
+            emails: Dicts with sender, subject and body
+            labels: Priority of each email
+        """
+        if not emails:
+            return
+        rows, buckets = hash_features(emails, self.dim)
+        classes = np.array([PRIORITIES.index(label) for label in labels], dtype=np.intp)
+        np.add.at(self.feature_counts, (classes[rows], buckets), 1.0)
+        np.add.at(self.class_counts, classes, 1.0)
+        self._log_likelihood = None
+
+    def predict(self, emails: Sequence[dict]) -> List[Tuple[str, float]]:
+        """
+        Classify a batch of emails
+
+        Args:
+            emails: Dicts with sender, subject and body
+
+        Returns:
+            (priority, confidence) per email; confidence is the posterior
+            probability of the chosen priority
+        """
+        if not emails:
+            return []
+        started = time.perf_counter()
+        if self._log_likelihood is None:
+            smoothed = self.feature_counts + self.alpha
+            self._log_likelihood = np.log(smoothed / smoothed.sum(axis=1, keepdims=True)).T
+            self._log_prior = np.log((self.class_counts + 1.0) / (self.samples + len(PRIORITIES)))
+
+        rows, buckets = hash_features(emails, self.dim)
+        scores = np.tile(self._log_prior, (len(emails), 1))
+        np.add.at(scores, rows, self._log_likelihood[buckets])
+        scores -= scores.max(axis=1, keepdims=True)
+        probabilities = np.exp(scores)
+        probabilities /= probabilities.sum(axis=1, keepdims=True)
+        best = probabilities.argmax(axis=1)
+
+        self.predictions += len(emails)
+        self.predict_seconds += time.perf_counter() - started
+        confidences = probabilities[np.arange(len(emails)), best]
+        np.add.at(self._volume, self._bins(confidences), 1.0)
+        return [
+            (PRIORITIES[index], float(probabilities[row, index]))
+            for row, index in enumerate(best)
+        ]
+
+    def record_agreement(
+        self, predicted: str, confidence: float, llm_priority: str, shadow: bool = False
+    ):
+        """
+        Compare a local prediction with the LLM's answer for the same email
+
+        Args:
+            predicted: Local prediction
+            confidence: Confidence of the prediction
+            llm_priority: LLM classification
+            shadow: The email was confident and only sent to the LLM as a sample
+        """
+        agreed = predicted == llm_priority
+        self.compared += 1
+        self.agreed += agreed
+        if shadow:
+            self.shadow_compared += 1
+            self.shadow_agreed += agreed
+        index = self._bins(np.array([confidence]))[0]
+        self._bin_compared[index] += 1
+        self._bin_agreed[index] += agreed
+        if self._bin_compared[index] >= CALIBRATION_WINDOW:
+            # Let the measurement follow the model as it learns
+            self._bin_compared[index] /= 2
+            self._bin_agreed[index] /= 2
+
+    @property
+    def calibrated(self) -> bool:
+        """Whether enough comparisons exist to measure the threshold"""
+        return bool(self._bin_compared.sum() >= self.calibration_min_samples)
+
+    @property
+    def threshold(self) -> float:
+        """
+        Minimum confidence for answering without the LLM
+
+        Returns:
+            The lowest bin edge whose estimated agreement reaches
+            target_agreement, above 1 (no local answers) if none does, or
+            the configured threshold while uncalibrated
+        """
+        if not self.calibrated:
+            return self.default_threshold
+        for index, edge in enumerate(CONFIDENCE_EDGES):
+            agreement = self._estimated_agreement(index)
+            if agreement is not None and agreement >= self.target_agreement:
+                return edge
+        return 1.01
+
+    def _estimated_agreement(self, index: int) -> Optional[float]:
+        """
+        Agreement expected for predictions in bins index and above
+
+        Each bin's measured agreement is weighted by how many predictions
+        fall in it, since shadow sampling compares confident bins at a lower
+        rate than the rest. Bins with predictions but no comparisons count
+        as disagreeing.
+
+        Args:
+            index: First bin
+
+        Returns:
+            Estimated agreement, or None without enough comparisons
+        """
+        compared = self._bin_compared[index:]
+        if compared.sum() < self.calibration_min_samples:
+            return None
+        volume = self._volume[index:]
+        if not volume.sum():
+            return None
+        rates = np.divide(
+            self._bin_agreed[index:], compared, out=np.zeros_like(compared), where=compared > 0
+        )
+        return float((rates * volume).sum() / volume.sum())
+
+    @staticmethod
+    def _bins(confidences: np.ndarray) -> np.ndarray:
+        """Confidence bin of each confidence"""
+        return np.searchsorted(CONFIDENCE_EDGES, confidences, side="right") - 1
+
+    async def retrain(self) -> int:
+        """
+        Learn LLM-labelled emails stored since the last training run
+
+        Returns:
+            Number of emails learned
+        """
+        async with self._lock:
+            learned = 0
+            while True:
+                rows = await asyncio.to_thread(self._db_labelled, self.trained_through)
+                if not rows:
+                    break
+                self.learn(
+                    [{"sender": r[1], "subject": r[2], "body": r[3]} for r in rows],
+                    [r[4] for r in rows],
+                )
+                self.trained_through = rows[-1][0]
+                learned += len(rows)
+            if learned:
+                logger.info(f"Priority classifier learned {learned} emails ({self.samples} total)")
+            return learned
+
+    def stats(self) -> dict:
+        """
+        Get classifier statistics
+
+        Returns:
+            Dictionary with training size, agreement with the LLM, the
+            measured threshold and latency
+        """
+        return {
+            "samples": self.samples,
+            "ready": self.ready,
+            "class_counts": dict(zip(PRIORITIES, self.class_counts.astype(int).tolist())),
+            "predictions": self.predictions,
+            "avg_predict_ms": round(self.predict_seconds * 1000 / self.predictions, 3)
+            if self.predictions
+            else 0.0,
+            "llm_comparisons": self.compared,
+            "agreement_rate": round(self.agreed / self.compared, 3) if self.compared else None,
+            "shadow_comparisons": self.shadow_compared,
+            "shadow_agreement_rate": round(self.shadow_agreed / self.shadow_compared, 3)
+            if self.shadow_compared
+            else None,
+            "calibrated": self.calibrated,
+            "threshold": self.threshold,
+            "bins": {
+                f"{edge:g}": {
+                    "predictions": int(self._volume[i]),
+                    "compared": int(self._bin_compared[i]),
+                    "agreement": round(self._bin_agreed[i] / self._bin_compared[i], 3)
+                    if self._bin_compared[i]
+                    else None,
+                }
+                for i, edge in enumerate(CONFIDENCE_EDGES)
+            },
+        }
+
+    @staticmethod
+    def _db_labelled(after_id: int) -> List[tuple]:
+        """Read the next batch of LLM-labelled emails after an Email.id"""
+        db = SessionLocal()
+        try:
+            return [
+                (row.id, row.sender, row.subject, row.body, row.priority.value)
+                for row in db.query(Email)
+                .filter(Email.id > after_id, Email.priority_source == "llm")
+                .order_by(Email.id)
+                .limit(TRAIN_BATCH_ROWS)
+                .all()
+            ]
+        finally:
+            db.close()
+
+
+# Global classifier instance
+priority_classifier: Optional[PriorityClassifier] = None
+
+
+def get_priority_classifier() -> PriorityClassifier:
+    """Get or create the global priority classifier"""
+    global priority_classifier
+    if priority_classifier is None:
+        settings = get_settings()
+        priority_classifier = PriorityClassifier(
+            dim=settings.PRIORITY_CLASSIFIER_DIM,
+            min_samples=settings.PRIORITY_CLASSIFIER_MIN_SAMPLES,
+            threshold=settings.PRIORITY_CLASSIFIER_THRESHOLD,
+            target_agreement=settings.PRIORITY_TARGET_AGREEMENT,
+            calibration_min_samples=settings.PRIORITY_CALIBRATION_MIN_SAMPLES,
+        )
+    return priority_classifier
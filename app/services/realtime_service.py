@@ -6,6 +6,10 @@ from typing import Optional, Dict, Any
 import aiohttp
 import pytz
 
+from app.config import get_settings
+from app.services.resilience import CircuitOpenError, DeadlineExceeded, get_dependency
+from app.services.single_flight import get_single_flight
+
 logger = logging.getLogger(__name__)
 
 
@@ -17,11 +21,58 @@ class RealtimeService:
         # Free API endpoints (no key required for basic usage)
         self.stock_api = "https://query1.finance.yahoo.com/v8/finance/chart"
         self.weather_api = "https://wttr.in"
-    
+        self.timeout = get_settings().REALTIME_TIMEOUT
+        # Concurrent lookups of the same symbol or city share one request
+        self._flight = get_single_flight("realtime")
+
+    async def _get_json(self, dependency: str, url: str) -> Optional[dict]:
+        """
+        GET a JSON API through its circuit breaker
+
+        Requests are hedged when slow and bounded by the request deadline.
+        Server errors raise (and count against the circuit); other non-200
+        responses, like unknown symbols, return None.
+
+        Args:
+            dependency: Dependency name (e.g. yahoo_finance)
+            url: Request URL
+
+        Returns:
+            Parsed JSON, or None for a non-200 response
+
+        Raises:
+            CircuitOpenError: If the dependency's circuit is open
+            DeadlineExceeded: If the request deadline passes
+        """
+
+        async def fetch():
+            async with aiohttp.ClientSession() as session:
+                async with session.get(url) as response:
+                    if response.status >= 500 or response.status == 429:
+                        response.raise_for_status()
+                    if response.status != 200:
+                        return None
+                    return await response.json()
+
+        return await get_dependency(dependency).call(fetch, timeout=self.timeout, hedge=True)
+
     async def get_stock_price(self, symbol: str) -> Dict[str, Any]:
         """
         Get real-time stock price using Yahoo Finance
 
+        Args:
+            symbol: Stock ticker symbol (e.g., AAPL, GOOGL, MSFT)
+
+        Returns:
+            Dictionary with stock data
+        """
+        key = ("stock", symbol.upper().strip())
+        return dict(await self._flight.do(key, lambda: self._fetch_stock_price(symbol)))
+
+    async def _fetch_stock_price(self, symbol: str) -> Dict[str, Any]:
+        """
+        Fetch a stock price from Yahoo Finance
+
         Args:
             symbol: Stock ticker symbol (e.g., AAPL, GOOGL, MSFT)
 
@@ -32,35 +83,35 @@ class RealtimeService:
             symbol = symbol.upper().strip()
             url = f"{self.stock_api}/{symbol}?interval=1d&range=1d"
             
-            async with aiohttp.ClientSession() as session:
-                async with session.get(url, timeout=10) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        result = data.get("chart", {}).get("result", [])
-                        
-                        if result:
-                            meta = result[0].get("meta", {})
-                            price = meta.get("regularMarketPrice", 0)
-                            prev_close = meta.get("previousClose", 0)
-                            currency = meta.get("currency", "USD")
-                            name = meta.get("shortName", symbol)
-                            
-                            # Calculate change
-                            change = price - prev_close
-                            change_percent = (change / prev_close * 100) if prev_close else 0
-                            
-                            return {
-                                "success": True,
-                                "symbol": symbol,
-                                "name": name,
-                                "price": round(price, 2),
-                                "change": round(change, 2),
-                                "change_percent": round(change_percent, 2),
-                                "currency": currency,
-                            }
+            data = await self._get_json("yahoo_finance", url)
+            if data:
+                result = data.get("chart", {}).get("result", [])
+
+                if result:
+                    meta = result[0].get("meta", {})
+                    price = meta.get("regularMarketPrice", 0)
+                    prev_close = meta.get("previousClose", 0)
+                    currency = meta.get("currency", "USD")
+                    name = meta.get("shortName", symbol)
+
+                    # Calculate change
+                    change = price - prev_close
+                    change_percent = (change / prev_close * 100) if prev_close else 0
+
+                    return {
+                        "success": True,
+                        "symbol": symbol,
+                        "name": name,
+                        "price": round(price, 2),
+                        "change": round(change, 2),
+                        "change_percent": round(change_percent, 2),
+                        "currency": currency,
+                    }
                         
             return {"success": False, "error": f"Stock symbol '{symbol}' not found"}
             
+        except (CircuitOpenError, DeadlineExceeded):
+            raise
         except Exception as e:
             logger.error(f"Error fetching stock price: {e}")
             return {"success": False, "error": str(e)}
@@ -69,6 +120,19 @@ class RealtimeService:
         """
         Get current weather for a city using wttr.in (free, no API key)
 
+        Args:
+            city: City name
+
+        Returns:
+            Dictionary with weather data
+        """
+        key = ("weather", city.strip().lower())
+        return dict(await self._flight.do(key, lambda: self._fetch_weather(city)))
+
+    async def _fetch_weather(self, city: str) -> Dict[str, Any]:
+        """
+        Fetch current weather for a city from wttr.in
+
         Args:
             city: City name
 
@@ -79,37 +143,37 @@ class RealtimeService:
             city = city.strip().replace(" ", "+")
             url = f"{self.weather_api}/{city}?format=j1"
             
-            async with aiohttp.ClientSession() as session:
-                async with session.get(url, timeout=10) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        current = data.get("current_condition", [{}])[0]
-                        location = data.get("nearest_area", [{}])[0]
-                        
-                        city_name = location.get("areaName", [{}])[0].get("value", city)
-                        country = location.get("country", [{}])[0].get("value", "")
-                        
-                        temp_c = current.get("temp_C", "N/A")
-                        temp_f = current.get("temp_F", "N/A")
-                        feels_like_c = current.get("FeelsLikeC", "N/A")
-                        humidity = current.get("humidity", "N/A")
-                        description = current.get("weatherDesc", [{}])[0].get("value", "Unknown")
-                        wind_kmph = current.get("windspeedKmph", "N/A")
-                        
-                        return {
-                            "success": True,
-                            "city": city_name,
-                            "country": country,
-                            "temperature_c": temp_c,
-                            "temperature_f": temp_f,
-                            "feels_like_c": feels_like_c,
-                            "humidity": humidity,
-                            "description": description,
-                            "wind_kmph": wind_kmph,
-                        }
+            data = await self._get_json("wttr", url)
+            if data:
+                current = data.get("current_condition", [{}])[0]
+                location = data.get("nearest_area", [{}])[0]
+
+                city_name = location.get("areaName", [{}])[0].get("value", city)
+                country = location.get("country", [{}])[0].get("value", "")
+
+                temp_c = current.get("temp_C", "N/A")
+                temp_f = current.get("temp_F", "N/A")
+                feels_like_c = current.get("FeelsLikeC", "N/A")
+                humidity = current.get("humidity", "N/A")
+                description = current.get("weatherDesc", [{}])[0].get("value", "Unknown")
+                wind_kmph = current.get("windspeedKmph", "N/A")
+
+                return {
+                    "success": True,
+                    "city": city_name,
+                    "country": country,
+                    "temperature_c": temp_c,
+                    "temperature_f": temp_f,
+                    "feels_like_c": feels_like_c,
+                    "humidity": humidity,
+                    "description": description,
+                    "wind_kmph": wind_kmph,
+                }
             
             return {"success": False, "error": f"Weather data not found for '{city}'"}
             
+        except (CircuitOpenError, DeadlineExceeded):
+            raise
         except Exception as e:
             logger.error(f"Error fetching weather: {e}")
             return {"success": False, "error": str(e)}
@@ -233,6 +297,19 @@ class RealtimeService:
         """
         Get cryptocurrency price
 
+        Args:
+            symbol: Crypto symbol (BTC, ETH, etc.)
+
+        Returns:
+            Dictionary with crypto data
+        """
+        key = ("crypto", symbol.upper().strip())
+        return dict(await self._flight.do(key, lambda: self._fetch_crypto_price(symbol)))
+
+    async def _fetch_crypto_price(self, symbol: str) -> Dict[str, Any]:
+        """
+        Fetch a cryptocurrency price from CoinGecko
+
         Args:
             symbol: Crypto symbol (BTC, ETH, etc.)
 
@@ -269,26 +346,26 @@ class RealtimeService:
             coin_id = coin_ids.get(symbol, symbol.lower())
             url = f"https://api.coingecko.com/api/v3/simple/price?ids={coin_id}&vs_currencies=usd&include_24hr_change=true"
             
-            async with aiohttp.ClientSession() as session:
-                async with session.get(url, timeout=10) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        
-                        if coin_id in data:
-                            price = data[coin_id].get("usd", 0)
-                            change_24h = data[coin_id].get("usd_24h_change", 0)
-                            
-                            return {
-                                "success": True,
-                                "symbol": symbol,
-                                "name": coin_id.title(),
-                                "price": round(price, 2),
-                                "change_24h": round(change_24h, 2),
-                                "currency": "USD",
-                            }
+            data = await self._get_json("coingecko", url)
+            if data:
+
+                if coin_id in data:
+                    price = data[coin_id].get("usd", 0)
+                    change_24h = data[coin_id].get("usd_24h_change", 0)
+
+                    return {
+                        "success": True,
+                        "symbol": symbol,
+                        "name": coin_id.title(),
+                        "price": round(price, 2),
+                        "change_24h": round(change_24h, 2),
+                        "currency": "USD",
+                    }
             
             return {"success": False, "error": f"Cryptocurrency '{symbol}' not found"}
             
+        except (CircuitOpenError, DeadlineExceeded):
+            raise
         except Exception as e:
             logger.error(f"Error fetching crypto price: {e}")
             return {"success": False, "error": str(e)}
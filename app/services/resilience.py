@@ -0,0 +1,416 @@
+"""Circuit breakers, request deadlines and hedged requests for upstream calls"""
+
+import asyncio
+import logging
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import Context, ContextVar, copy_context
+from typing import Awaitable, Callable, Dict, Iterator, Optional, TypeVar
+
+from app.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Dependency name -> name shown to users when its circuit is open
+DEPENDENCIES = {
+    "openai": "The AI service",
+    "yahoo_finance": "The stock price service",
+    "coingecko": "The crypto price service",
+    "wttr": "The weather service",
+    "gmail": "Gmail",
+}
+
+# Absolute deadline (time.monotonic()) of the request being handled
+_deadline: ContextVar[Optional[float]] = ContextVar("deadline", default=None)
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a dependency whose circuit is open"""
+
+    def __init__(self, dependency: str, retry_after: float):
+        """
+        Initialize error
+
+        Args:
+            dependency: Dependency name
+            retry_after: Seconds until the circuit lets a probe through
+        """
+        self.dependency = dependency
+        self.retry_after = retry_after
+        label = DEPENDENCIES.get(dependency, dependency)
+        seconds = max(int(retry_after + 0.999), 1)
+        super().__init__(
+            f"{label} is not responding right now. "
+            f"Please try again in {seconds} second{'s' if seconds != 1 else ''}."
+        )
+
+
+class DeadlineExceeded(asyncio.TimeoutError):
+    """Raised when a request's deadline has passed before an upstream call"""
+
+
+@contextmanager
+def deadline(seconds: Optional[float]) -> Iterator[None]:
+    """
+    Bound the total time upstream calls may take within this context
+
+    Nested deadlines can only shorten the current one. Tasks created inside
+    the context inherit it.
+
+    Args:
+        seconds: Time budget, or None for no deadline
+    """
+    if seconds is None:
+        yield
+        return
+    current = _deadline.get()
+    limit = time.monotonic() + seconds
+    token = _deadline.set(limit if current is None else min(current, limit))
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def detached_context() -> Context:
+    """
+    Copy of the current context without a deadline
+
+    Used for work shared by several requests, which must not be cut
+    short by the deadline of whichever request happened to start it.
+
+    Returns:
+        Context to run the shared work in
+    """
+    context = copy_context()
+    context.run(_deadline.set, None)
+    return context
+
+
+def remaining_time(timeout: Optional[float] = None) -> Optional[float]:
+    """
+    Time left for an upstream call
+
+    Args:
+        timeout: The call's own timeout
+
+    Returns:
+        The smaller of timeout and the time to the current deadline (None
+        if there is neither)
+
+    Raises:
+        DeadlineExceeded: If the deadline has already passed
+    """
+    limit = _deadline.get()
+    if limit is None:
+        return timeout
+    left = limit - time.monotonic()
+    if left <= 0:
+        raise DeadlineExceeded("Request deadline exceeded")
+    return left if timeout is None else min(timeout, left)
+
+
+def is_upstream_failure(error: BaseException) -> bool:
+    """
+    Whether an error says the upstream service is unhealthy
+
+    Timeouts, connection errors and 5xx or 429 responses count; other
+    HTTP statuses (bad request, context length, auth, not found) are the
+    caller's problem and must not open the circuit for everyone.
+
+    Args:
+        error: Exception raised by an upstream call
+
+    Returns:
+        False for client errors (4xx other than 408 and 429), else True
+    """
+    status = getattr(error, "status_code", None)
+    if status is None:
+        status = getattr(error, "status", None)
+    if not isinstance(status, int):
+        return True
+    return status >= 500 or status in (408, 429)
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker with half-open probing
+
+    Closed: calls go through; failure_threshold consecutive failures open
+    the circuit. Open: calls fail fast with CircuitOpenError for
+    reset_timeout seconds. Half-open: one probe call goes through; success
+    closes the circuit, failure opens it again.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, name: str, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        """
+        Initialize circuit breaker
+
+        Args:
+            name: Dependency name
+            failure_threshold: Consecutive failures that open the circuit
+            reset_timeout: Seconds the circuit stays open before a probe
+        """
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.times_opened = 0
+        self.rejected = 0
+        self._probing = False
+
+    def check(self):
+        """
+        Fail fast if a call would be rejected, without starting a probe
+
+        Raises:
+            CircuitOpenError: If the circuit is open
+        """
+        if self.state == self.CLOSED:
+            return
+        retry_after = self.opened_at + self.reset_timeout - time.monotonic()
+        if retry_after > 0 or self._probing:
+            raise CircuitOpenError(self.name, max(retry_after, 0.0))
+
+    def before_call(self):
+        """
+        Admit a call, moving an expired open circuit to half-open
+
+        Raises:
+            CircuitOpenError: If the call must not go through
+        """
+        try:
+            self.check()
+        except CircuitOpenError:
+            self.rejected += 1
+            raise
+        if self.state != self.CLOSED:
+            self.state = self.HALF_OPEN
+            self._probing = True
+            logger.info(f"Circuit for {self.name} half-open, sending probe")
+
+    def record_success(self):
+        """Record a successful call"""
+        if self.state != self.CLOSED:
+            logger.info(f"Circuit for {self.name} closed")
+        self.state = self.CLOSED
+        self.failures = 0
+        self._probing = False
+
+    def record_failure(self):
+        """Record a failed call"""
+        self.failures += 1
+        if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+            if self.state != self.OPEN:
+                self.times_opened += 1
+                logger.warning(
+                    f"Circuit for {self.name} opened after {self.failures} failures"
+                )
+            self.state = self.OPEN
+            self.opened_at = time.monotonic()
+        self._probing = False
+
+    def release(self):
+        """End a call that neither succeeded nor failed (e.g. cancelled)"""
+        self._probing = False
+
+
+class Dependency:
+    """
+    An upstream service guarded by a circuit breaker
+
+    Calls are bounded by the current request deadline. Idempotent calls can
+    be hedged: if the first attempt is slower than the hedge_percentile of
+    recent successful calls, a second attempt is started and whichever
+    finishes first wins.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30.0,
+        hedge_percentile: float = 95.0,
+        hedge_min_samples: int = 20,
+        latency_window: int = 200,
+    ):
+        """
+        Initialize dependency
+
+        Args:
+            name: Dependency name
+            failure_threshold: Consecutive failures that open the circuit
+            reset_timeout: Seconds the circuit stays open before a probe
+            hedge_percentile: Latency percentile after which to hedge
+            hedge_min_samples: Successful calls needed before hedging
+            latency_window: Recent latencies kept for the percentile
+        """
+        self.name = name
+        self.breaker = CircuitBreaker(name, failure_threshold, reset_timeout)
+        self.hedge_percentile = hedge_percentile
+        self.hedge_min_samples = hedge_min_samples
+        self._latencies: deque = deque(maxlen=latency_window)
+        self.calls = 0
+        self.failures = 0
+        self.client_errors = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+
+    def check(self):
+        """
+        Fail fast if the dependency's circuit is open
+
+        Raises:
+            CircuitOpenError: If the circuit is open
+        """
+        self.breaker.check()
+
+    def hedge_delay(self) -> Optional[float]:
+        """Seconds to wait before hedging, or None without enough samples"""
+        if len(self._latencies) < self.hedge_min_samples:
+            return None
+        ordered = sorted(self._latencies)
+        index = min(int(len(ordered) * self.hedge_percentile / 100), len(ordered) - 1)
+        return ordered[index]
+
+    async def call(
+        self,
+        call: Callable[[], Awaitable[T]],
+        timeout: Optional[float] = None,
+        hedge: bool = False,
+    ) -> T:
+        """
+        Call the dependency through its circuit breaker
+
+        Timeouts, transport errors and 5xx or 429 responses count as
+        failures; client errors (see is_upstream_failure) are raised without
+        counting against the circuit.
+
+        Args:
+            call: Function returning the awaitable to run (called twice when hedging)
+            timeout: Seconds before the call is abandoned (capped by the deadline)
+            hedge: Allow a hedged second attempt
+
+        Returns:
+            Result of the call
+
+        Raises:
+            CircuitOpenError: If the circuit is open
+            DeadlineExceeded: If the request deadline has passed
+            asyncio.TimeoutError: If the call times out
+        """
+        budget = remaining_time(timeout)
+        # Timing out on the request's deadline says nothing about the dependency
+        cut_by_deadline = budget is not None and (timeout is None or budget < timeout)
+        self.breaker.before_call()
+        self.calls += 1
+        started = time.monotonic()
+        try:
+            delay = self.hedge_delay() if hedge else None
+            if delay is not None and (budget is None or delay < budget):
+                result = await asyncio.wait_for(self._hedged(call, delay), budget)
+            else:
+                result = await asyncio.wait_for(call(), budget)
+        except asyncio.CancelledError:
+            self.breaker.release()
+            raise
+        except asyncio.TimeoutError:
+            if cut_by_deadline:
+                self.breaker.release()
+                raise DeadlineExceeded("Request deadline exceeded")
+            self.failures += 1
+            self.breaker.record_failure()
+            raise
+        except Exception as e:
+            if not is_upstream_failure(e):
+                self.client_errors += 1
+                self.breaker.release()
+                raise
+            self.failures += 1
+            self.breaker.record_failure()
+            raise
+        self._latencies.append(time.monotonic() - started)
+        self.breaker.record_success()
+        return result
+
+    async def _hedged(self, call: Callable[[], Awaitable[T]], delay: float) -> T:
+        """Run a call, starting a second attempt if the first takes longer than delay"""
+        first = asyncio.ensure_future(call())
+        done, _ = await asyncio.wait({first}, timeout=delay)
+        if done:
+            return first.result()
+
+        self.hedges += 1
+        second = asyncio.ensure_future(call())
+        pending = {first, second}
+        error: Optional[BaseException] = None
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is second:
+                            self.hedge_wins += 1
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
+
+    def stats(self) -> dict:
+        """
+        Get dependency statistics
+
+        Returns:
+            Dictionary with circuit state and call counters
+        """
+        delay = self.hedge_delay()
+        return {
+            "state": self.breaker.state,
+            "consecutive_failures": self.breaker.failures,
+            "times_opened": self.breaker.times_opened,
+            "rejected": self.breaker.rejected,
+            "calls": self.calls,
+            "failures": self.failures,
+            "client_errors": self.client_errors,
+            "hedges": self.hedges,
+            "hedge_wins": self.hedge_wins,
+            "hedge_after_ms": round(delay * 1000, 1) if delay is not None else None,
+        }
+
+
+# Global dependencies by name
+_dependencies: Dict[str, Dependency] = {}
+
+
+def get_dependency(name: str) -> Dependency:
+    """
+    Get or create a named dependency
+
+    Args:
+        name: Dependency name (one of DEPENDENCIES)
+
+    Returns:
+        Dependency
+    """
+    dependency = _dependencies.get(name)
+    if dependency is None:
+        settings = get_settings()
+        dependency = _dependencies[name] = Dependency(
+            name,
+            failure_threshold=settings.CIRCUIT_FAILURE_THRESHOLD,
+            reset_timeout=settings.CIRCUIT_RESET_TIMEOUT,
+            hedge_percentile=settings.HEDGE_PERCENTILE,
+            hedge_min_samples=settings.HEDGE_MIN_SAMPLES,
+        )
+    return dependency
@@ -0,0 +1,295 @@
+"""Near-duplicate question cache using hashed bag-of-words vectors"""
+
+import logging
+import re
+import time
+import zlib
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from app.config import get_settings
+from app.services.answer_cache import get_answer_cache
+
+logger = logging.getLogger(__name__)
+
+# Words, numbers (with decimals) and the symbols that change what is asked
+_TOKEN_RE = re.compile(r"[a-z0-9]+(?:\.[0-9]+)?|[-+*/^%=<>$€£¥°]")
+
+# Filler words that do not change what is being asked. Wh-words other than
+# "what" are kept: "who invented X" and "when was X invented" differ.
+STOPWORDS = frozenset((
+    "a", "about", "an", "and", "are", "be", "by", "can", "could", "define", "describe",
+    "did", "do", "does", "explain", "for", "give", "i", "in", "is", "it", "me", "meaning",
+    "my", "of", "on", "or", "please", "re", "s", "show", "t", "tell", "that", "the", "this",
+    "to", "was", "were", "what", "whats", "with", "would", "you",
+))
+
+# Common abbreviations, expanded so "what's ML" meets "machine learning"
+ABBREVIATIONS = {
+    "ai": "artificial intelligence",
+    "api": "application programming interface",
+    "db": "database",
+    "js": "javascript",
+    "llm": "large language model",
+    "ml": "machine learning",
+    "nlp": "natural language processing",
+    "os": "operating system",
+    "py": "python",
+    "ui": "user interface",
+}
+
+# Words that fix when something is asked about. Tense words are reduced to
+# their tense so "who was" meets "who were" but never "who is".
+TENSE_WORDS = {
+    "was": "<past>", "were": "<past>", "did": "<past>", "had": "<past>",
+    "been": "<past>", "used": "<past>", "will": "<future>", "shall": "<future>",
+}
+TIME_WORDS = frozenset((
+    "after", "ago", "before", "current", "currently", "former", "future", "last",
+    "latest", "next", "now", "past", "previous", "recent", "recently", "today",
+    "tomorrow", "tonight", "yesterday",
+))
+
+# Equal to a word, so reordered questions ("X faster than Y" / "Y faster
+# than X") fall well below the threshold
+BIGRAM_WEIGHT = 1.0
+
+
+def _tokens(question: str) -> List[str]:
+    """Lowercase tokens with abbreviations expanded"""
+    tokens = []
+    for token in _TOKEN_RE.findall(question.lower()):
+        tokens.extend(ABBREVIATIONS.get(token, token).split())
+    return tokens
+
+
+def _is_exact(token: str) -> bool:
+    """Whether a token must appear unchanged in a matching question"""
+    return (
+        not token.isalpha() or token in TENSE_WORDS or token in TIME_WORDS
+    )
+
+
+def question_features(question: str) -> List[Tuple[str, float]]:
+    """
+    Extract weighted features from a question
+
+    Content words (lightly stemmed), numbers, operator symbols, and
+    adjacent pairs of these, so word order counts.
+
+    Args:
+        question: Question text
+
+    Returns:
+        List of (feature, weight) pairs
+    """
+    words = [
+        word[:-1] if len(word) > 3 and word.isalpha() and word.endswith("s") else word
+        for word in _tokens(question)
+        if word not in STOPWORDS
+    ]
+    features = [(word, 1.0) for word in words]
+    features += [(f"{a} {b}", BIGRAM_WEIGHT) for a, b in zip(words, words[1:])]
+    return features
+
+
+def exact_features(question: str) -> str:
+    """
+    Extract the features a cached question must share exactly
+
+    Numbers, operator symbols, tense and time words, in order, so
+    "2+3" never meets "2*3" and "who is" never meets "who was".
+
+    Args:
+        question: Question text
+
+    Returns:
+        Space-separated exact features (empty if there are none)
+    """
+    return " ".join(
+        TENSE_WORDS.get(token, token) for token in _tokens(question) if _is_exact(token)
+    )
+
+
+def embed_question(question: str, dim: int) -> np.ndarray:
+    """
+    Embed a question as a signed, hashed, L2-normalized feature vector
+
+    Uses crc32 so vectors are stable across processes.
+
+    Args:
+        question: Question text
+        dim: Vector size
+
+    Returns:
+        float32 vector (all zeros if the question has no content words)
+    """
+    vector = np.zeros(dim, dtype=np.float32)
+    for feature, weight in question_features(question):
+        digest = zlib.crc32(feature.encode("utf-8"))
+        vector[digest % dim] += weight if digest & 0x80000000 else -weight
+    norm = np.linalg.norm(vector)
+    if norm:
+        vector /= norm
+    return vector
+
+
+class SemanticCache:
+    """
+    Answer cache matching questions by cosine similarity
+
+    Vectors live in a preallocated (capacity x dim) matrix, so adding an
+    answer writes one row and a lookup is a single matrix-vector product.
+    When full, the least recently used row is overwritten. Rows older than
+    ttl seconds are ignored by lookups and reused first. Re-adding the same
+    question replaces its row.
+    """
+
+    def __init__(
+        self,
+        capacity: int = 10000,
+        dim: int = 256,
+        threshold: float = 0.85,
+        ttl: int = 86400,
+    ):
+        """
+        Initialize semantic cache
+
+        Args:
+            capacity: Maximum number of cached answers
+            dim: Embedding size
+            threshold: Minimum cosine similarity for a hit
+            ttl: Seconds an answer stays valid
+        """
+        self.capacity = capacity
+        self.dim = dim
+        self.threshold = threshold
+        self.ttl = ttl
+        self._vectors = np.zeros((capacity, dim), dtype=np.float32)
+        self._expires = np.zeros(capacity, dtype=np.float64)
+        self._last_used = np.zeros(capacity, dtype=np.float64)
+        self._answers: List[Optional[Tuple[str, str, str]]] = [None] * capacity
+        # Model plus exact features per row; only rows sharing both can match
+        self._groups = np.full(capacity, "", dtype=object)
+        # (group, vector bytes) -> row, so re-adding a question replaces its row
+        self._rows: Dict[Tuple[str, bytes], int] = {}
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, question: str, model: str) -> Optional[str]:
+        """
+        Find the answer to the most similar earlier question
+
+        Args:
+            question: Question text
+            model: Model the answer must come from
+
+        Returns:
+            Cached answer, or None if nothing is similar enough
+        """
+        query = embed_question(question, self.dim)
+        if self.size == 0 or not query.any():
+            self.misses += 1
+            return None
+
+        now = time.time()
+        scores = self._vectors[: self.size] @ query
+        # Rows from other models, with other numbers, symbols or tense, or past
+        # their expiry can never match
+        group = f"{model}|{exact_features(question)}"
+        scores[self._groups[: self.size] != group] = -np.inf
+        scores[self._expires[: self.size] <= now] = -np.inf
+        row = int(np.argmax(scores))
+        entry = self._answers[row]
+        if scores[row] >= self.threshold:
+            self._last_used[row] = now
+            self.hits += 1
+            logger.debug(
+                f"Semantic cache hit ({scores[row]:.2f}): '{question}' ~ '{entry[0]}'"
+            )
+            return entry[1]
+
+        self.misses += 1
+        return None
+
+    def add(self, question: str, answer: str, model: str, expires: Optional[float] = None):
+        """
+        Index an answer
+
+        Args:
+            question: Question text
+            answer: Answer text
+            model: Model that produced the answer
+            expires: Expiry as a Unix timestamp (defaults to now + ttl)
+        """
+        vector = embed_question(question, self.dim)
+        if not vector.any():
+            return
+
+        now = time.time()
+        group = f"{model}|{exact_features(question)}"
+        key = (group, vector.tobytes())
+        row = self._rows.get(key)
+        if row is None:
+            if self.size < self.capacity:
+                row = self.size
+                self.size += 1
+            else:
+                # Expired rows have the oldest possible use time
+                last_used = np.where(self._expires <= now, 0.0, self._last_used)
+                row = int(np.argmin(last_used))
+                self._rows.pop((self._groups[row], self._vectors[row].tobytes()), None)
+            self._rows[key] = row
+        # Otherwise re-asked (e.g. with /fresh): replace the older answer
+
+        self._vectors[row] = vector
+        self._expires[row] = expires if expires is not None else now + self.ttl
+        self._last_used[row] = now
+        self._answers[row] = (question, answer, model)
+        self._groups[row] = group
+
+    def stats(self) -> dict:
+        """
+        Get cache statistics
+
+        Returns:
+            Dictionary with hit/miss counters and size
+        """
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            "size": self.size,
+            "capacity": self.capacity,
+            "threshold": self.threshold,
+        }
+
+
+# Global semantic cache instance
+semantic_cache: Optional[SemanticCache] = None
+
+
+def get_semantic_cache() -> SemanticCache:
+    """Get or create the global semantic cache"""
+    global semantic_cache
+    if semantic_cache is None:
+        settings = get_settings()
+        semantic_cache = SemanticCache(
+            capacity=settings.SEMANTIC_CACHE_SIZE,
+            dim=settings.SEMANTIC_CACHE_DIM,
+            threshold=settings.SEMANTIC_CACHE_THRESHOLD,
+            ttl=settings.ANSWER_CACHE_TTL,
+        )
+    return semantic_cache
+
+
+async def warm_semantic_cache():
+    """Index the most recent answers from the persistent answer cache"""
+    cache = get_semantic_cache()
+    entries = await get_answer_cache().recent(cache.capacity)
+    for question, answer, model, expires in entries:
+        cache.add(question, answer, model, expires=expires)
+    logger.info(f"Semantic cache warmed with {len(entries)} answers")
@@ -0,0 +1,355 @@
+"""Rate-limited outbound queue for Telegram messages"""
+
+import asyncio
+import enum
+import itertools
+import logging
+import time
+from collections import deque
+from typing import Optional, Callable, Awaitable, Any, Dict, Tuple
+
+from app.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+# Sender receives a sendMessage payload and returns (HTTP status, response JSON)
+Sender = Callable[[Dict[str, Any]], Awaitable[Tuple[int, Dict[str, Any]]]]
+
+
+class SendPriority(enum.IntEnum):
+    """Outbound message priority lanes (lower is sent first)"""
+
+    INTERACTIVE = 0
+    NOTIFICATION = 1
+
+
+class TokenBucket:
+    """Token bucket rate limiter"""
+
+    def __init__(self, rate: float, capacity: float):
+        """
+        Initialize token bucket
+
+        Args:
+            rate: Tokens added per second
+            capacity: Maximum burst size
+        """
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+
+    def _refill(self):
+        """Add tokens for the time elapsed since the last refill"""
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self):
+        """Wait until a token is available and take it"""
+        while True:
+            self._refill()
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return
+            await asyncio.sleep((1 - self.tokens) / self.rate)
+
+    def delay(self) -> float:
+        """Seconds until a token is available (0 if one is available now)"""
+        self._refill()
+        return max(0.0, (1 - self.tokens) / self.rate)
+
+
+class SendQueue:
+    """
+    Outbound Telegram dispatcher with rate limiting and priority lanes
+
+    Messages wait in a priority queue and are sent through a global token
+    bucket plus one bucket per chat. A 429 response pauses all sending for
+    the retry_after period Telegram asks for, then the message is retried.
+
+    Only one message per chat is in flight at a time: later messages to a
+    busy chat wait in that chat's backlog and are put back on the queue
+    when the earlier one is sent, and a message to a chat whose bucket is
+    empty is parked until it refills. Workers therefore never wait on one
+    chat while messages to other chats are queued.
+    """
+
+    def __init__(
+        self,
+        sender: Sender,
+        workers: int = 4,
+        max_size: int = 1000,
+        global_rate: float = 30.0,
+        chat_rate: float = 1.0,
+        chat_burst: float = 3.0,
+        max_retries: int = 3,
+    ):
+        """
+        Initialize send queue
+
+        Args:
+            sender: Async function that performs the sendMessage call
+            workers: Number of concurrent sender tasks
+            max_size: Maximum queued messages before new ones are dropped
+            global_rate: Messages per second across all chats
+            chat_rate: Messages per second to a single chat
+            chat_burst: Burst size allowed per chat
+            max_retries: Retries after 429 responses before dropping
+        """
+        self.sender = sender
+        self.workers = max(1, workers)
+        self.chat_rate = chat_rate
+        self.chat_burst = chat_burst
+        self.max_retries = max_retries
+        self.max_size = max_size
+        self._queue: asyncio.PriorityQueue = asyncio.PriorityQueue()
+        self._seq = itertools.count()
+        self._global_bucket = TokenBucket(global_rate, global_rate)
+        self._chat_buckets: Dict[Any, TokenBucket] = {}
+        # Chats with a message in flight or parked -> messages queued behind it
+        self._backlogs: Dict[Any, deque] = {}
+        self._parked: set = set()
+        # Messages accepted and not yet sent, failed or dropped
+        self._pending = 0
+        self._drained = asyncio.Event()
+        self._drained.set()
+        self._paused_until = 0.0
+        self._tasks = []
+        self.rate_limited = 0
+        self._lanes = {
+            lane: {"sent": 0, "failed": 0, "dropped": 0, "wait_total": 0.0, "wait_max": 0.0}
+            for lane in SendPriority
+        }
+
+    @property
+    def running(self) -> bool:
+        """Whether sender tasks are running"""
+        return bool(self._tasks)
+
+    def start(self):
+        """Start sender tasks"""
+        if self.running:
+            return
+        self._tasks = [
+            asyncio.create_task(self._worker(), name=f"send-worker-{i}")
+            for i in range(self.workers)
+        ]
+        logger.info(f"Started {self.workers} send workers")
+
+    async def stop(self, drain_timeout: float = 10.0):
+        """
+        Stop sender tasks after flushing queued messages
+
+        Args:
+            drain_timeout: Seconds to wait for queued messages to be sent
+        """
+        if not self.running:
+            return
+        try:
+            await asyncio.wait_for(self._drained.wait(), timeout=drain_timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"Send queue not drained, dropping {self._pending} messages")
+
+        for handle in self._parked:
+            handle.cancel()
+        self._parked.clear()
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        logger.info("Send workers stopped")
+
+    async def send(
+        self,
+        payload: Dict[str, Any],
+        priority: SendPriority = SendPriority.INTERACTIVE,
+    ) -> Tuple[int, Dict[str, Any]]:
+        """
+        Queue a sendMessage payload and wait for it to be delivered
+
+        Args:
+            payload: sendMessage payload (must include chat_id)
+            priority: Priority lane
+
+        Returns:
+            Tuple of HTTP status and response JSON (status 0 if dropped)
+        """
+        priority = SendPriority(priority)
+        future = asyncio.get_running_loop().create_future()
+        if self._pending >= self.max_size:
+            self._lanes[priority]["dropped"] += 1
+            logger.warning(f"Send queue full, dropping message to chat {payload.get('chat_id')}")
+            return 0, {"ok": False, "description": "Send queue full"}
+        self._pending += 1
+        self._drained.clear()
+        # The last field marks a chat's next message, which may pass its backlog
+        self._queue.put_nowait((priority, next(self._seq), time.monotonic(), payload, future, False))
+        return await future
+
+    def stats(self) -> dict:
+        """
+        Get dispatcher statistics
+
+        Returns:
+            Dictionary with queue depth, per-lane counters and wait times
+        """
+        lanes = {}
+        for lane, counters in self._lanes.items():
+            sent = counters["sent"] + counters["failed"]
+            lanes[lane.name.lower()] = {
+                "sent": counters["sent"],
+                "failed": counters["failed"],
+                "dropped": counters["dropped"],
+                "wait_avg_ms": round(counters["wait_total"] / sent * 1000, 2) if sent else 0.0,
+                "wait_max_ms": round(counters["wait_max"] * 1000, 2),
+            }
+        return {
+            "running": self.running,
+            "depth": self._pending,
+            "busy_chats": len(self._backlogs),
+            "rate_limited": self.rate_limited,
+            "lanes": lanes,
+        }
+
+    def _chat_bucket(self, chat_id: Any) -> TokenBucket:
+        """Get the rate limiter for a chat"""
+        if chat_id not in self._chat_buckets:
+            if len(self._chat_buckets) > 10000:
+                self._prune_chats()
+            self._chat_buckets[chat_id] = TokenBucket(self.chat_rate, self.chat_burst)
+        return self._chat_buckets[chat_id]
+
+    def _prune_chats(self):
+        """Forget chats that have been idle long enough to refill their bucket"""
+        idle_after = self.chat_burst / self.chat_rate
+        now = time.monotonic()
+        for chat_id in list(self._chat_buckets):
+            if (
+                chat_id not in self._backlogs
+                and now - self._chat_buckets[chat_id].updated > idle_after
+            ):
+                del self._chat_buckets[chat_id]
+
+    def _park(self, item: tuple, delay: float):
+        """Put a chat's next message back on the queue once its bucket has a token"""
+        def requeue():
+            self._parked.discard(handle)
+            self._queue.put_nowait(item)
+
+        handle = asyncio.get_running_loop().call_later(delay, requeue)
+        self._parked.add(handle)
+
+    def _release(self, chat_id: Any):
+        """Hand a chat's next backlogged message back to the queue"""
+        backlog = self._backlogs.get(chat_id)
+        if backlog:
+            self._queue.put_nowait(backlog.popleft()[:-1] + (True,))
+        else:
+            self._backlogs.pop(chat_id, None)
+
+    async def _worker(self):
+        """Send queued messages while respecting rate limits"""
+        while True:
+            item = await self._queue.get()
+            priority, _, enqueued_at, payload, future, is_next = item
+            chat_id = payload.get("chat_id")
+            if not is_next:
+                if chat_id in self._backlogs:
+                    # An earlier message to this chat is in flight; keep order behind it
+                    self._backlogs[chat_id].append(item)
+                    continue
+                self._backlogs[chat_id] = deque()
+
+            bucket = self._chat_bucket(chat_id)
+            wait = bucket.delay()
+            if wait > 0:
+                self._park(item[:-1] + (True,), wait)
+                continue
+
+            lanes = self._lanes[priority]
+            try:
+                waited = time.monotonic() - enqueued_at
+                lanes["wait_total"] += waited
+                lanes["wait_max"] = max(lanes["wait_max"], waited)
+
+                result = await self._deliver(payload, bucket)
+                lanes["sent" if result[0] == 200 else "failed"] += 1
+                if not future.done():
+                    future.set_result(result)
+            except Exception as e:
+                lanes["failed"] += 1
+                if not future.done():
+                    future.set_exception(e)
+            finally:
+                self._pending -= 1
+                if not self._pending:
+                    self._drained.set()
+                self._release(chat_id)
+
+    async def _deliver(
+        self, payload: Dict[str, Any], bucket: TokenBucket
+    ) -> Tuple[int, Dict[str, Any]]:
+        """Send one payload, retrying after 429 responses"""
+        for attempt in range(self.max_retries + 1):
+            delay = self._paused_until - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            await bucket.acquire()
+            await self._global_bucket.acquire()
+
+            status, data = await self.sender(payload)
+            if status != 429:
+                return status, data
+
+            self.rate_limited += 1
+            retry_after = (data.get("parameters") or {}).get("retry_after", 1)
+            self._paused_until = max(self._paused_until, time.monotonic() + retry_after)
+            logger.warning(
+                f"Telegram rate limit hit for chat {payload.get('chat_id')}, "
+                f"retrying in {retry_after}s (attempt {attempt + 1})"
+            )
+        return status, data
+
+
+# Global send queue instance
+send_queue: Optional[SendQueue] = None
+
+
+def get_send_queue() -> Optional[SendQueue]:
+    """Get the global send queue, if started"""
+    return send_queue
+
+
+async def start_send_queue(sender: Sender) -> SendQueue:
+    """
+    Create and start the global send queue
+
+    Args:
+        sender: Async function that performs the sendMessage call
+
+    Returns:
+        Running send queue
+    """
+    global send_queue
+    if send_queue is None:
+        settings = get_settings()
+        send_queue = SendQueue(
+            sender,
+            workers=settings.SEND_WORKERS,
+            max_size=settings.SEND_QUEUE_SIZE,
+            global_rate=settings.TELEGRAM_GLOBAL_RATE,
+            chat_rate=settings.TELEGRAM_CHAT_RATE,
+            chat_burst=settings.TELEGRAM_CHAT_BURST,
+            max_retries=settings.MAX_RETRIES,
+        )
+    send_queue.start()
+    return send_queue
+
+
+async def stop_send_queue():
+    """Flush and stop the global send queue"""
+    global send_queue
+    if send_queue:
+        await send_queue.stop(get_settings().UPDATE_DRAIN_TIMEOUT)
+        send_queue = None
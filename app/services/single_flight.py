@@ -0,0 +1,135 @@
+"""Coalescing of identical concurrent upstream calls"""
+
+import asyncio
+import logging
+from functools import partial
+from typing import Awaitable, Callable, Dict, Hashable, Optional, TypeVar
+
+from app.config import get_settings
+from app.services.resilience import DeadlineExceeded, detached_context, remaining_time
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Upstream dependencies with a shared single-flight group
+FLIGHT_NAMES = ("openai", "realtime", "gmail")
+
+
+async def _wait(awaitable: Awaitable[T]) -> T:
+    """Await an awaitable inside a task"""
+    return await awaitable
+
+
+class SingleFlight:
+    """
+    Shares one in-flight call among concurrent callers with the same key
+
+    The first caller for a key starts the call as a task; callers that
+    arrive while it runs await the same task and get the same result or
+    exception. A cancelled caller does not cancel the shared call. Results
+    are not cached: once a call finishes, the next caller starts a new one.
+
+    The shared task runs without a request deadline, so no caller is cut
+    short by another's budget; each caller waits for it only until its
+    own deadline.
+    """
+
+    def __init__(self, name: str, enabled: bool = True):
+        """
+        Initialize single-flight group
+
+        Args:
+            name: Group name used in logs and metrics
+            enabled: Coalesce calls (when False, every call runs on its own)
+        """
+        self.name = name
+        self.enabled = enabled
+        self._inflight: Dict[Hashable, asyncio.Future] = {}
+        self.calls = 0
+        self.coalesced = 0
+
+    async def do(self, key: Hashable, call: Callable[[], Awaitable[T]]) -> T:
+        """
+        Run a call, or join the identical call already in flight
+
+        Args:
+            key: Identifies identical requests
+            call: Function returning the awaitable to run
+
+        Returns:
+            Result of the (shared) call
+
+        Raises:
+            DeadlineExceeded: If this caller's deadline passes first
+        """
+        if not self.enabled:
+            self.calls += 1
+            return await call()
+
+        future = self._inflight.get(key)
+        if future is None:
+            self.calls += 1
+            context = detached_context()
+            future = asyncio.get_running_loop().create_task(
+                _wait(context.run(call)), context=context
+            )
+            self._inflight[key] = future
+            future.add_done_callback(partial(self._finished, key))
+        else:
+            self.coalesced += 1
+            logger.debug(f"Coalesced {self.name} call {key!r}")
+        try:
+            return await asyncio.wait_for(asyncio.shield(future), remaining_time())
+        except asyncio.TimeoutError:
+            if future.done():
+                # The call itself timed out
+                raise
+            raise DeadlineExceeded("Request deadline exceeded")
+
+    @property
+    def in_flight(self) -> int:
+        """Number of distinct calls currently running"""
+        return len(self._inflight)
+
+    def stats(self) -> dict:
+        """
+        Get coalescing statistics
+
+        Returns:
+            Dictionary with call counters
+        """
+        return {
+            "calls": self.calls,
+            "coalesced": self.coalesced,
+            "in_flight": self.in_flight,
+            "enabled": self.enabled,
+        }
+
+    def _finished(self, key: Hashable, future: asyncio.Future):
+        """Forget a finished call"""
+        if self._inflight.get(key) is future:
+            del self._inflight[key]
+        if not future.cancelled():
+            # Mark the exception retrieved in case every caller went away
+            future.exception()
+
+
+# Global single-flight groups by name
+_flights: Dict[str, SingleFlight] = {}
+
+
+def get_single_flight(name: str) -> SingleFlight:
+    """
+    Get or create a named single-flight group
+
+    Args:
+        name: Group name (one of FLIGHT_NAMES)
+
+    Returns:
+        Single-flight group
+    """
+    flight: Optional[SingleFlight] = _flights.get(name)
+    if flight is None:
+        flight = _flights[name] = SingleFlight(name, enabled=get_settings().SINGLE_FLIGHT_ENABLED)
+    return flight
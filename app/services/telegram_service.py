@@ -1,16 +1,148 @@
 """Telegram bot service for message handling and command processing"""
 
+import html
 import logging
 import hmac
 import hashlib
-from typing import Optional, Dict, Any
+import re
+from typing import Optional, Dict, Any, List, Tuple, AsyncIterator
 import aiohttp
 import asyncio
 
 from app.config import get_settings
+from app.services.send_queue import SendPriority, get_send_queue
 
 logger = logging.getLogger(__name__)
 
+# Telegram rejects messages longer than this
+MAX_MESSAGE_LENGTH = 4096
+
+# HTML tags and entities are split out so they are never cut in half
+_HTML_TOKEN_RE = re.compile(r"(<[^>]+>|&#?\w+;)")
+_HTML_TAG_RE = re.compile(r"<[^>]+>")
+
+
+def split_html_text(text: str, limit: int = MAX_MESSAGE_LENGTH) -> List[str]:
+    """
+    Split HTML message text into chunks Telegram will accept
+
+    Chunks break at newlines or spaces where possible, never inside a tag
+    or entity. Tags still open at a break are closed at the end of the
+    chunk and reopened at the start of the next one.
+
+    Args:
+        text: Message text (Telegram HTML)
+        limit: Maximum chunk length
+
+    Returns:
+        List of chunks in order
+    """
+    if len(text) <= limit:
+        return [text]
+
+    chunks: List[str] = []
+    open_tags: List[Tuple[str, str]] = []  # (tag name, opening tag)
+    current = ""
+
+    def closing() -> str:
+        return "".join(f"</{name}>" for name, _ in reversed(open_tags))
+
+    def flush():
+        nonlocal current
+        # A chunk of only whitespace and tags is dropped; its open tags carry over
+        if _HTML_TAG_RE.sub("", current).strip():
+            chunks.append(current + closing())
+        current = "".join(tag for _, tag in open_tags)
+
+    for token in _HTML_TOKEN_RE.split(text):
+        if not token:
+            continue
+
+        if _HTML_TOKEN_RE.fullmatch(token):
+            # Atomic token; an opening tag also needs room for its closing tag
+            name = token[1:-1].split()[0].lstrip("/") if token.startswith("<") else ""
+            extra = len(f"</{name}>") if token.startswith("<") and not token.startswith("</") else 0
+            if len(current) + len(token) + extra + len(closing()) > limit:
+                flush()
+            current += token
+            if token.startswith("</"):
+                for i in range(len(open_tags) - 1, -1, -1):
+                    if open_tags[i][0] == name:
+                        del open_tags[i]
+                        break
+            elif token.startswith("<"):
+                open_tags.append((name, token))
+            continue
+
+        while token:
+            room = limit - len(current) - len(closing())
+            if len(token) <= room:
+                current += token
+                break
+            if room <= 0:
+                if current == "".join(tag for _, tag in open_tags):
+                    raise ValueError("Message markup is too deeply nested to split")
+                flush()
+                continue
+
+            head = token[:room]
+            cut = head.rfind("\n")
+            if cut < room // 2:
+                cut = max(cut, head.rfind(" "))
+            cut = cut + 1 if cut > 0 else room
+            current += token[:cut]
+            token = token[cut:]
+            flush()
+
+    flush()
+    return chunks
+
+
+# Shared HTTP session for all Telegram API calls (one keep-alive pool per process)
+_http_session: Optional[aiohttp.ClientSession] = None
+
+
+def get_http_session() -> aiohttp.ClientSession:
+    """
+    Get or create the shared Telegram HTTP session
+
+    The session is normally created by start_http_session() in the app
+    lifespan; it is created lazily here for callers outside the app
+    (scripts, one-off jobs).
+
+    Returns:
+        Shared aiohttp client session
+    """
+    global _http_session
+    if _http_session is None or _http_session.closed:
+        settings = get_settings()
+        connector = aiohttp.TCPConnector(
+            limit=settings.TELEGRAM_POOL_LIMIT,
+            limit_per_host=settings.TELEGRAM_POOL_LIMIT_PER_HOST,
+            ttl_dns_cache=settings.TELEGRAM_DNS_CACHE_TTL,
+            keepalive_timeout=settings.TELEGRAM_KEEPALIVE_TIMEOUT,
+        )
+        _http_session = aiohttp.ClientSession(
+            connector=connector,
+            timeout=aiohttp.ClientTimeout(total=settings.TELEGRAM_REQUEST_TIMEOUT),
+        )
+    return _http_session
+
+
+async def start_http_session():
+    """Create the shared Telegram HTTP session"""
+    get_http_session()
+    logger.info("Telegram HTTP session started")
+
+
+async def close_http_session():
+    """Close the shared Telegram HTTP session"""
+    global _http_session
+    if _http_session and not _http_session.closed:
+        await _http_session.close()
+        logger.info("Telegram HTTP session closed")
+    _http_session = None
+
 
 class TelegramService:
     """Service for handling Telegram bot operations"""
@@ -18,7 +150,7 @@ class TelegramService:
     def __init__(self):
         """Initialize Telegram service"""
         self.settings = get_settings()
-        self.api_url = f"https://api.telegram.org/bot{self.settings.TELEGRAM_BOT_TOKEN}"
+        self.api_url = f"{self.settings.TELEGRAM_API_BASE}/bot{self.settings.TELEGRAM_BOT_TOKEN}"
         self.user_id = self.settings.TELEGRAM_USER_ID
 
     def verify_webhook_signature(
@@ -45,18 +177,94 @@ class TelegramService:
         text: str,
         chat_id: Optional[int] = None,
         parse_mode: str = "HTML",
+        priority: SendPriority = SendPriority.INTERACTIVE,
     ) -> bool:
         """
         Send a message via Telegram
 
+        Goes through the rate-limited send queue when it is running.
+        Messages over Telegram's length limit are split into several.
+
         Args:
             text: Message text
             chat_id: Telegram chat ID (defaults to user ID)
             parse_mode: Message parse mode (HTML, Markdown, etc.)
+            priority: Send queue lane (interactive replies go first)
 
         Returns:
             True if sent successfully
         """
+        message_ids = await self.send_long_message(text, chat_id, parse_mode, priority)
+        return all(message_id is not None for message_id in message_ids)
+
+    async def send_long_message(
+        self,
+        text: str,
+        chat_id: Optional[int] = None,
+        parse_mode: str = "HTML",
+        priority: SendPriority = SendPriority.INTERACTIVE,
+    ) -> List[Optional[int]]:
+        """
+        Send a message of any length, split into ordered chunks
+
+        With the send queue running all chunks are queued at once, so no
+        chunk waits for the previous round trip to be enqueued; the queue
+        still delivers them to the chat in order.
+
+        Args:
+            text: Message text
+            chat_id: Telegram chat ID (defaults to user ID)
+            parse_mode: Message parse mode (HTML, Markdown, etc.)
+            priority: Send queue lane (interactive replies go first)
+
+        Returns:
+            Message ID of each chunk in order (None for chunks that failed)
+        """
+        if parse_mode == "HTML":
+            chunks = split_html_text(text)
+        else:
+            chunks = [
+                text[i:i + MAX_MESSAGE_LENGTH]
+                for i in range(0, len(text), MAX_MESSAGE_LENGTH)
+            ] or [text]
+
+        if len(chunks) == 1:
+            return [await self.send_and_get_id(chunks[0], chat_id, parse_mode, priority)]
+
+        logger.info(f"Sending message in {len(chunks)} chunks")
+        queue = get_send_queue()
+        if queue and queue.running:
+            return list(await asyncio.gather(*(
+                self.send_and_get_id(chunk, chat_id, parse_mode, priority)
+                for chunk in chunks
+            )))
+
+        return [
+            await self.send_and_get_id(chunk, chat_id, parse_mode, priority)
+            for chunk in chunks
+        ]
+
+    async def send_and_get_id(
+        self,
+        text: str,
+        chat_id: Optional[int] = None,
+        parse_mode: str = "HTML",
+        priority: SendPriority = SendPriority.INTERACTIVE,
+    ) -> Optional[int]:
+        """
+        Send a single message via Telegram and return its message ID
+
+        The text must fit in one message; use send_long_message otherwise.
+
+        Args:
+            text: Message text
+            chat_id: Telegram chat ID (defaults to user ID)
+            parse_mode: Message parse mode (HTML, Markdown, etc.)
+            priority: Send queue lane (interactive replies go first)
+
+        Returns:
+            Telegram message ID, or None if sending failed
+        """
         if not chat_id:
             chat_id = self.user_id
 
@@ -67,19 +275,109 @@ class TelegramService:
         }
 
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.post(
-                    f"{self.api_url}/sendMessage", json=payload
-                ) as response:
-                    if response.status == 200:
-                        logger.info(f"Message sent to chat {chat_id}")
-                        return True
-                    else:
-                        logger.error(f"Failed to send message: {response.status}")
-                        return False
+            queue = get_send_queue()
+            if queue and queue.running:
+                status, data = await queue.send(payload, priority)
+            else:
+                status, data = await self.post_message(payload)
+
+            if status == 200:
+                logger.info(f"Message sent to chat {chat_id}")
+                return (data.get("result") or {}).get("message_id", 0)
+            else:
+                logger.error(f"Failed to send message: {status}")
+                return None
         except Exception as e:
             logger.error(f"Error sending message: {e}")
-            return False
+            return None
+
+    async def send_streaming_message(
+        self,
+        fragments: AsyncIterator[str],
+        chat_id: Optional[int] = None,
+        prefix: str = "",
+        placeholder: str = "⏳ Thinking...",
+        edit_interval: float = 1.0,
+    ) -> Tuple[Optional[str], bool]:
+        """
+        Post a placeholder message and edit it as text streams in
+
+        Edits are throttled to one per edit_interval seconds to stay under
+        Telegram's edit rate limits. Streamed text is HTML-escaped. Text
+        that outgrows one message continues in additional messages.
+
+        Args:
+            fragments: Async iterator of text fragments
+            chat_id: Telegram chat ID (defaults to user ID)
+            prefix: HTML prepended to the streamed text
+            placeholder: Text shown until the first fragment arrives
+            edit_interval: Minimum seconds between edits
+
+        Returns:
+            Tuple of (streamed text, unescaped and empty if the stream failed
+            before any text arrived, or None if the placeholder could not be
+            sent; whether the stream finished without an error)
+        """
+        if not chat_id:
+            chat_id = self.user_id
+
+        message_id = await self.send_and_get_id(prefix + placeholder, chat_id)
+        if message_id is None:
+            return None, False
+
+        message_ids = [message_id]
+        shown = [prefix + placeholder]
+
+        async def render(body: str):
+            for i, chunk in enumerate(split_html_text(body)):
+                if i >= len(message_ids):
+                    message_ids.append(await self.send_and_get_id(chunk, chat_id))
+                    shown.append(chunk)
+                elif chunk != shown[i] and message_ids[i] is not None:
+                    await self.edit_message(chat_id, message_ids[i], chunk)
+                    shown[i] = chunk
+
+        loop = asyncio.get_running_loop()
+        text = ""
+        completed = False
+        last_edit = loop.time()
+        try:
+            async for fragment in fragments:
+                text += fragment
+                if loop.time() - last_edit >= edit_interval:
+                    await render(prefix + html.escape(text) + " ▌")
+                    last_edit = loop.time()
+            completed = True
+        except Exception as e:
+            # Keep whatever arrived; the placeholder is replaced below
+            logger.error(f"Error while streaming message: {e}")
+
+        if text:
+            await render(prefix + html.escape(text))
+        else:
+            await render(prefix + "❌ Sorry, I couldn't process your question. Please try again.")
+
+        return text, completed
+
+    async def post_message(self, payload: Dict[str, Any]) -> Tuple[int, Dict[str, Any]]:
+        """
+        Call sendMessage directly, bypassing the send queue
+
+        Args:
+            payload: sendMessage payload
+
+        Returns:
+            Tuple of HTTP status and response JSON
+        """
+        session = get_http_session()
+        async with session.post(
+            f"{self.api_url}/sendMessage", json=payload
+        ) as response:
+            try:
+                data = await response.json()
+            except (aiohttp.ContentTypeError, ValueError):
+                data = {}
+            return response.status, data
 
     async def send_document(
         self,
@@ -103,23 +401,22 @@ class TelegramService:
 
         try:
             with open(file_path, "rb") as file:
-                files = {"document": file}
-                data = {"chat_id": chat_id}
+                data = aiohttp.FormData()
+                data.add_field("chat_id", str(chat_id))
                 if caption:
-                    data["caption"] = caption
-
-                async with aiohttp.ClientSession() as session:
-                    async with session.post(
-                        f"{self.api_url}/sendDocument",
-                        data=data,
-                        files=files,
-                    ) as response:
-                        if response.status == 200:
-                            logger.info(f"Document sent to chat {chat_id}")
-                            return True
-                        else:
-                            logger.error(f"Failed to send document: {response.status}")
-                            return False
+                    data.add_field("caption", caption)
+                data.add_field("document", file)
+
+                session = get_http_session()
+                async with session.post(
+                    f"{self.api_url}/sendDocument", data=data
+                ) as response:
+                    if response.status == 200:
+                        logger.info(f"Document sent to chat {chat_id}")
+                        return True
+                    else:
+                        logger.error(f"Failed to send document: {response.status}")
+                        return False
         except Exception as e:
             logger.error(f"Error sending document: {e}")
             return False
@@ -137,20 +434,78 @@ class TelegramService:
         payload = {"url": webhook_url}
 
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.post(
-                    f"{self.api_url}/setWebhook", json=payload
-                ) as response:
-                    if response.status == 200:
-                        logger.info(f"Webhook set to {webhook_url}")
-                        return True
-                    else:
-                        logger.error(f"Failed to set webhook: {response.status}")
-                        return False
+            session = get_http_session()
+            async with session.post(
+                f"{self.api_url}/setWebhook", json=payload
+            ) as response:
+                if response.status == 200:
+                    logger.info(f"Webhook set to {webhook_url}")
+                    return True
+                else:
+                    logger.error(f"Failed to set webhook: {response.status}")
+                    return False
         except Exception as e:
             logger.error(f"Error setting webhook: {e}")
             return False
 
+    async def delete_webhook(self) -> bool:
+        """
+        Remove the Telegram webhook (required before using getUpdates)
+
+        Returns:
+            True if successful
+        """
+        try:
+            session = get_http_session()
+            async with session.post(f"{self.api_url}/deleteWebhook") as response:
+                if response.status == 200:
+                    logger.info("Webhook removed")
+                    return True
+                else:
+                    logger.error(f"Failed to remove webhook: {response.status}")
+                    return False
+        except Exception as e:
+            logger.error(f"Error removing webhook: {e}")
+            return False
+
+    async def get_updates(
+        self, offset: Optional[int] = None, timeout: int = 30, limit: int = 100
+    ) -> List[Dict[str, Any]]:
+        """
+        Long-poll Telegram for new updates
+
+        Args:
+            offset: First update ID to return (confirms all earlier updates)
+            timeout: Long-polling timeout in seconds
+            limit: Maximum number of updates per batch
+
+        Returns:
+            List of update objects
+
+        Raises:
+            RuntimeError: If Telegram returns an error
+        """
+        payload = {
+            "timeout": timeout,
+            "limit": limit,
+            "allowed_updates": ["message"],
+        }
+        if offset is not None:
+            payload["offset"] = offset
+
+        session = get_http_session()
+        async with session.post(
+            f"{self.api_url}/getUpdates",
+            json=payload,
+            timeout=aiohttp.ClientTimeout(total=timeout + 10),
+        ) as response:
+            data = await response.json()
+            if response.status != 200 or not data.get("ok"):
+                raise RuntimeError(
+                    f"getUpdates failed: {response.status} {data.get('description')}"
+                )
+            return data.get("result", [])
+
     async def get_me(self) -> Optional[Dict[str, Any]]:
         """
         Get bot information
@@ -159,13 +514,13 @@ class TelegramService:
             Bot information or None if failed
         """
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(f"{self.api_url}/getMe") as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        logger.info(f"Bot info retrieved: {data['result']['username']}")
-                        return data.get("result")
-                    return None
+            session = get_http_session()
+            async with session.get(f"{self.api_url}/getMe") as response:
+                if response.status == 200:
+                    data = await response.json()
+                    logger.info(f"Bot info retrieved: {data['result']['username']}")
+                    return data.get("result")
+                return None
         except Exception as e:
             logger.error(f"Error getting bot info: {e}")
             return None
@@ -297,11 +652,11 @@ class TelegramService:
         }
 
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.post(
-                    f"{self.api_url}/editMessageText", json=payload
-                ) as response:
-                    return response.status == 200
+            session = get_http_session()
+            async with session.post(
+                f"{self.api_url}/editMessageText", json=payload
+            ) as response:
+                return response.status == 200
         except Exception as e:
             logger.error(f"Error editing message: {e}")
             return False
@@ -320,11 +675,11 @@ class TelegramService:
         payload = {"chat_id": chat_id, "message_id": message_id}
 
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.post(
-                    f"{self.api_url}/deleteMessage", json=payload
-                ) as response:
-                    return response.status == 200
+            session = get_http_session()
+            async with session.post(
+                f"{self.api_url}/deleteMessage", json=payload
+            ) as response:
+                return response.status == 200
         except Exception as e:
             logger.error(f"Error deleting message: {e}")
             return False
@@ -0,0 +1,231 @@
+"""Reduce email text to what is worth sending to the LLM"""
+
+import logging
+import re
+from collections import defaultdict
+from html.parser import HTMLParser
+from typing import Dict, List
+
+logger = logging.getLogger(__name__)
+
+# Lines that start the quoted history of a reply
+QUOTE_HEADER_RE = re.compile(
+    r"^\s*(?:"
+    r"On\s.{0,200}\swrote:\s*$"
+    r"|-{2,}\s*Original Message\s*-{2,}"
+    r"|_{10,}\s*$"
+    r"|From:\s.+\n\s*(?:Sent|Date):\s"
+    r")",
+    re.IGNORECASE | re.MULTILINE,
+)
+
+# A forward header and the header fields under it. The forwarded message
+# follows it and is the content, so only the header block is removed
+FORWARD_HEADER_RE = re.compile(
+    r"^[ \t]*(?:-{2,}\s*Forwarded message\s*-{2,}|Begin forwarded message:)[^\n]*\n"
+    r"(?:[ \t]*(?:(?:From|Date|Sent|Subject|To|Cc|Reply-To):[^\n]*)?\n)*",
+    re.IGNORECASE | re.MULTILINE,
+)
+
+# Lines that start a signature
+SIGNATURE_RE = re.compile(
+    r"^(?:--\s*$|Sent from my \w+|Get Outlook for \w+)",
+    re.IGNORECASE | re.MULTILINE,
+)
+
+# Footer lines from mailing tools
+BOILERPLATE_RE = re.compile(
+    r"unsubscribe|view (?:this email |it )?in (?:your |a )?browser|privacy policy"
+    r"|manage (?:your )?(?:email )?preferences|this (?:e-?mail|message) was sent to"
+    r"|you are receiving this|all rights reserved|update your preferences",
+    re.IGNORECASE,
+)
+
+# A footer line is mostly boilerplate: few other words, and short. Longer
+# lines are sentences or whole paragraphs that merely mention a phrase
+BOILERPLATE_MAX_CHARS = 160
+BOILERPLATE_MAX_OTHER_WORDS = 5
+WORD_RE = re.compile(r"[^\W\d_]+")
+
+URL_RE = re.compile(r"https?://\S{40,}")
+HTML_HINT_RE = re.compile(r"<(?:html|body|div|p|br|table|span)\b", re.IGNORECASE)
+BLANK_LINES_RE = re.compile(r"\n\s*\n+")
+SPACES_RE = re.compile(r"[ \t\u00a0]+")
+
+CHARS_PER_TOKEN = 4
+
+# purpose -> [calls, tokens before, tokens after]
+_stats: Dict[str, List[int]] = defaultdict(lambda: [0, 0, 0])
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Roughly estimate the number of tokens in a text (about 4 characters each)
+
+    Args:
+        text: Text to measure
+
+    Returns:
+        Estimated token count
+    """
+    return len(text) // CHARS_PER_TOKEN + 1
+
+
+class _TextExtractor(HTMLParser):
+    """Collects the visible text of an HTML document"""
+
+    BLOCK_TAGS = {"p", "div", "br", "tr", "li", "h1", "h2", "h3", "h4", "table", "blockquote"}
+    SKIP_TAGS = {"script", "style", "head", "title"}
+
+    def __init__(self):
+        """Initialize text extractor"""
+        super().__init__(convert_charrefs=True)
+        self.parts: List[str] = []
+        self._skip = 0
+
+    def handle_starttag(self, tag, attrs):
+        """Start skipping invisible elements and break lines at blocks"""
+        if tag in self.SKIP_TAGS:
+            self._skip += 1
+        elif tag in self.BLOCK_TAGS:
+            self.parts.append("\n")
+
+    def handle_endtag(self, tag):
+        """Stop skipping invisible elements and break lines at blocks"""
+        if tag in self.SKIP_TAGS and self._skip:
+            self._skip -= 1
+        elif tag in self.BLOCK_TAGS:
+            self.parts.append("\n")
+
+    def handle_data(self, data):
+        """Keep visible text"""
+        if not self._skip:
+            self.parts.append(data)
+
+
+def html_to_text(html: str) -> str:
+    """
+    Convert an HTML email body to plain text
+
+    Args:
+        html: HTML source
+
+    Returns:
+        Visible text with block elements on separate lines
+    """
+    parser = _TextExtractor()
+    try:
+        parser.feed(html)
+        parser.close()
+    except Exception as e:
+        logger.debug(f"HTML parsing stopped early: {e}")
+    # convert_charrefs already decoded entities; decoding again would turn
+    # an escaped "&amp;lt;" into "<"
+    return "".join(parser.parts)
+
+
+def _is_boilerplate(line: str) -> bool:
+    """Whether a line is a mailing footer rather than text that mentions one"""
+    if len(line) > BOILERPLATE_MAX_CHARS or not BOILERPLATE_RE.search(line):
+        return False
+    other = WORD_RE.findall(BOILERPLATE_RE.sub(" ", URL_RE.sub(" ", line)))
+    return len(other) <= BOILERPLATE_MAX_OTHER_WORDS
+
+
+def clean_email_text(text: str) -> str:
+    """
+    Remove quoted history, signatures and mailing boilerplate
+
+    Args:
+        text: Email body (plain text or HTML)
+
+    Returns:
+        Cleaned plain text
+    """
+    if HTML_HINT_RE.search(text):
+        text = html_to_text(text)
+    text = text.replace("\r\n", "\n")
+    text = FORWARD_HEADER_RE.sub("\n", text)
+
+    # Everything after the first quote header or signature marker is noise
+    for pattern in (QUOTE_HEADER_RE, SIGNATURE_RE):
+        match = pattern.search(text)
+        if match and match.start() > 0:
+            text = text[: match.start()]
+
+    lines = []
+    for line in text.split("\n"):
+        stripped = line.strip()
+        if stripped.startswith(">") or _is_boilerplate(stripped):
+            continue
+        lines.append(SPACES_RE.sub(" ", URL_RE.sub("[link]", stripped)))
+
+    return BLANK_LINES_RE.sub("\n\n", "\n".join(lines)).strip()
+
+
+def truncate_to_tokens(text: str, budget: int) -> str:
+    """
+    Cut text to an estimated token budget at a word boundary
+
+    Args:
+        text: Text to truncate
+        budget: Maximum estimated tokens
+
+    Returns:
+        Text within the budget, with "..." appended if it was cut
+    """
+    max_chars = budget * CHARS_PER_TOKEN
+    if len(text) <= max_chars:
+        return text
+    cut = text.rfind(" ", 0, max_chars - 3)
+    return text[: cut if cut > max_chars // 2 else max_chars - 3].rstrip() + "..."
+
+
+def reduce_for_llm(text: str, budget: int, purpose: str) -> str:
+    """
+    Clean an email body and fit it into a token budget
+
+    Tokens saved are logged and counted per purpose.
+
+    Args:
+        text: Email body
+        budget: Maximum estimated tokens to keep
+        purpose: Calling method, used to label the statistics
+
+    Returns:
+        Reduced text
+    """
+    if not text:
+        return ""
+    reduced = truncate_to_tokens(clean_email_text(text), budget)
+    before, after = estimate_tokens(text), estimate_tokens(reduced)
+
+    stats = _stats[purpose]
+    stats[0] += 1
+    stats[1] += before
+    stats[2] += after
+    logger.debug(f"{purpose}: reduced input from ~{before} to ~{after} tokens")
+    return reduced
+
+
+def reduction_stats() -> Dict[str, dict]:
+    """
+    Get token reduction statistics
+
+    Returns:
+        Dictionary per purpose with calls, tokens in/out and tokens saved
+    """
+    return {
+        purpose: {
+            "calls": calls,
+            "tokens_in": before,
+            "tokens_out": after,
+            "tokens_saved": before - after,
+        }
+        for purpose, (calls, before, after) in _stats.items()
+    }
+
+
+def total_tokens_saved() -> int:
+    """Total estimated tokens removed across all purposes"""
+    return sum(before - after for _, before, after in _stats.values())
@@ -0,0 +1,286 @@
+"""Write-behind buffer for persisting Telegram messages"""
+
+import asyncio
+import logging
+import time
+from datetime import datetime
+from typing import Optional, Dict, Any, List, Tuple
+
+from sqlalchemy import func
+from sqlalchemy.dialects.sqlite import insert
+
+from app.config import get_settings
+from app.models.database import SessionLocal, Message
+
+logger = logging.getLogger(__name__)
+
+
+class MessageWriter:
+    """
+    Buffer inbound messages and their responses, writing them in batches
+
+    A message and its response recorded before the next flush are merged
+    into a single row insert. Rows are keyed by (user_id, message_id),
+    since Telegram message IDs are only unique within one chat. Flushes
+    happen when the buffer reaches flush_size or every flush_interval
+    seconds, and once more on stop. A failed batch is retried row by row;
+    a row that keeps failing is dropped after max_retries flushes.
+    """
+
+    def __init__(self, flush_size: int = 50, flush_interval: float = 1.0, max_retries: int = 5):
+        """
+        Initialize message writer
+
+        Args:
+            flush_size: Buffered rows that trigger an immediate flush
+            flush_interval: Maximum seconds a row waits before being written
+            max_retries: Failed flushes before a row is dropped
+        """
+        self.flush_size = flush_size
+        self.flush_interval = flush_interval
+        self.max_retries = max_retries
+        self._pending: Dict[Tuple[int, str], Dict[str, Any]] = {}
+        self._attempts: Dict[Tuple[int, str], int] = {}
+        self._flush_needed = asyncio.Event()
+        self._lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self.flushes = 0
+        self.rows_written = 0
+        self.failures = 0
+        self.dropped = 0
+        self.last_flush_ms = 0.0
+        self.max_flush_ms = 0.0
+        self._total_flush_ms = 0.0
+
+    @property
+    def running(self) -> bool:
+        """Whether the background flush task is running"""
+        return self._task is not None and not self._task.done()
+
+    def start(self):
+        """Start the background flush task"""
+        if not self.running:
+            self._task = asyncio.create_task(self._flush_loop(), name="message-writer")
+            logger.info("Message writer started")
+
+    async def stop(self):
+        """Stop the flush task and write everything still buffered"""
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        await self.flush()
+        logger.info("Message writer stopped")
+
+    def record_message(self, message_data: Dict[str, Any]):
+        """
+        Buffer an inbound message
+
+        Args:
+            message_data: Parsed message from TelegramService.parse_message
+        """
+        key = (message_data["user_id"], str(message_data["message_id"]))
+        row = self._pending.setdefault(
+            key, {"user_id": key[0], "telegram_message_id": key[1], "response": None}
+        )
+        row.update(
+            text=message_data["text"],
+            command=message_data["command"],
+            is_command=message_data["is_command"],
+            created_at=datetime.utcnow(),
+        )
+        self._after_record()
+
+    def record_response(self, user_id: int, message_id: Any, response: Optional[str]):
+        """
+        Buffer the response for a previously recorded message
+
+        Args:
+            user_id: Telegram user ID the message came from
+            message_id: Telegram message ID
+            response: Response text sent to the user
+        """
+        key = (user_id, str(message_id))
+        row = self._pending.setdefault(key, {"user_id": key[0], "telegram_message_id": key[1]})
+        row["response"] = response
+        self._after_record()
+
+    @property
+    def backlog(self) -> int:
+        """Number of rows waiting to be written"""
+        return len(self._pending)
+
+    def stats(self) -> dict:
+        """
+        Get writer statistics
+
+        Returns:
+            Dictionary with backlog and flush latency
+        """
+        return {
+            "running": self.running,
+            "backlog": self.backlog,
+            "flushes": self.flushes,
+            "rows_written": self.rows_written,
+            "failures": self.failures,
+            "dropped": self.dropped,
+            "last_flush_ms": round(self.last_flush_ms, 2),
+            "avg_flush_ms": round(self._total_flush_ms / self.flushes, 2) if self.flushes else 0.0,
+            "max_flush_ms": round(self.max_flush_ms, 2),
+        }
+
+    async def flush(self):
+        """Write all buffered rows in one transaction"""
+        async with self._lock:
+            if not self._pending:
+                return
+            rows, self._pending = self._pending, {}
+            self._flush_needed.clear()
+
+            started = time.perf_counter()
+            try:
+                failed = await asyncio.to_thread(self._write, rows)
+            except Exception as e:
+                logger.error(f"Failed to write {len(rows)} messages: {e}")
+                failed = list(rows)
+            for key in rows:
+                if key not in failed:
+                    self._attempts.pop(key, None)
+            if failed:
+                self._rebuffer(rows, failed)
+
+            elapsed = (time.perf_counter() - started) * 1000
+            self.flushes += 1
+            self.rows_written += len(rows) - len(failed)
+            self.last_flush_ms = elapsed
+            self.max_flush_ms = max(self.max_flush_ms, elapsed)
+            self._total_flush_ms += elapsed
+            logger.debug(f"Flushed {len(rows)} messages in {elapsed:.1f}ms")
+
+    def _rebuffer(self, rows: Dict[Tuple[int, str], Dict[str, Any]], failed: List[Tuple[int, str]]):
+        """Put failed rows back for the next flush, dropping ones out of retries"""
+        self.failures += 1
+        retried = 0
+        for key in failed:
+            attempts = self._attempts.get(key, 0) + 1
+            if attempts > self.max_retries:
+                self._attempts.pop(key, None)
+                self.dropped += 1
+                logger.error(
+                    f"Dropping message {key[1]} of user {key[0]} after {attempts} failed writes"
+                )
+                continue
+            self._attempts[key] = attempts
+            # Keep anything recorded while the write ran
+            self._pending[key] = {**rows[key], **self._pending.get(key, {})}
+            retried += 1
+        if retried:
+            logger.warning(f"Failed to write {retried} messages, will retry")
+
+    def _after_record(self):
+        """Trigger a flush when the buffer is full (or no flush task runs)"""
+        if not self.running or len(self._pending) >= self.flush_size:
+            self._flush_needed.set()
+            if not self.running:
+                asyncio.get_running_loop().create_task(self.flush())
+
+    async def _flush_loop(self):
+        """Flush on size threshold or interval until cancelled"""
+        while True:
+            try:
+                await asyncio.wait_for(self._flush_needed.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            await self.flush()
+
+    @classmethod
+    def _write(cls, rows: Dict[Tuple[int, str], Dict[str, Any]]) -> List[Tuple[int, str]]:
+        """
+        Upsert rows into the messages table
+
+        All rows are written in one transaction; if that fails, each row
+        is written on its own so one bad row does not hold back the rest.
+
+        Args:
+            rows: Buffered rows by (user_id, message_id)
+
+        Returns:
+            Keys of the rows that could not be written
+        """
+        db = SessionLocal()
+        try:
+            try:
+                for row in rows.values():
+                    cls._upsert(db, row)
+                db.commit()
+                return []
+            except Exception as e:
+                db.rollback()
+                if len(rows) == 1:
+                    logger.error(f"Failed to write message: {e}")
+                    return list(rows)
+                logger.warning(
+                    f"Batch write of {len(rows)} messages failed, writing one by one: {e}"
+                )
+
+            failed = []
+            for key, row in rows.items():
+                try:
+                    cls._upsert(db, row)
+                    db.commit()
+                except Exception as e:
+                    db.rollback()
+                    logger.error(f"Failed to write message {key[1]} of user {key[0]}: {e}")
+                    failed.append(key)
+            return failed
+        finally:
+            db.close()
+
+    @staticmethod
+    def _upsert(db, row: Dict[str, Any]):
+        """Insert a message row, or set the response of one flushed earlier"""
+        if "text" in row:
+            stmt = insert(Message).values(**row)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[Message.user_id, Message.telegram_message_id],
+                set_={"response": func.coalesce(stmt.excluded.response, Message.response)},
+            )
+            db.execute(stmt)
+        else:
+            # Response for a message flushed in an earlier batch
+            db.query(Message).filter(
+                Message.user_id == row["user_id"],
+                Message.telegram_message_id == row["telegram_message_id"],
+            ).update({"response": row["response"]})
+
+
+# Global message writer instance
+message_writer: Optional[MessageWriter] = None
+
+
+def get_message_writer() -> MessageWriter:
+    """Get or create the global message writer"""
+    global message_writer
+    if message_writer is None:
+        settings = get_settings()
+        message_writer = MessageWriter(
+            flush_size=settings.MESSAGE_FLUSH_SIZE,
+            flush_interval=settings.MESSAGE_FLUSH_INTERVAL,
+            max_retries=settings.MESSAGE_WRITE_RETRIES,
+        )
+    return message_writer
+
+
+async def start_message_writer() -> MessageWriter:
+    """Create and start the global message writer"""
+    writer = get_message_writer()
+    writer.start()
+    return writer
+
+
+async def stop_message_writer():
+    """Flush and stop the global message writer"""
+    global message_writer
+    if message_writer:
+        await message_writer.stop()
+        message_writer = None
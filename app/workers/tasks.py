@@ -6,10 +6,12 @@ from datetime import datetime
 from sqlalchemy.orm import Session
 
 from app.config import get_settings
-from app.models.database import Task, TaskStatus, Email, ScheduledJob
+from app.models.database import Task, TaskStatus, ScheduledJob
 from app.services.gmail_service import GmailService
 from app.services.telegram_service import TelegramService
-from app.services.ai_service import AIService
+from app.services.send_queue import SendPriority
+from app.services.ai_service import AIService, get_ai_service
+from app.services.email_ingest import get_email_ingest, summary_or_preview
 
 logger = logging.getLogger(__name__)
 
@@ -20,6 +22,9 @@ async def check_emails(ai_service: AIService = None) -> dict:
     """
     Background task to check and process unread emails
 
+    Emails seen before are served from the database; new ones are
+    summarized and classified once as they are stored.
+
     Args:
         ai_service: Optional AI service for summarization
 
@@ -34,7 +39,9 @@ async def check_emails(ai_service: AIService = None) -> dict:
         gmail = GmailService()
         telegram = TelegramService()
 
-        emails = gmail.get_unread_emails(max_results=5, summary_ai=ai_service)
+        emails, _ = await get_email_ingest().get_unread(
+            gmail, ai_service or get_ai_service(), max_results=5
+        )
 
         if not emails:
             logger.info("No unread emails")
@@ -44,12 +51,12 @@ async def check_emails(ai_service: AIService = None) -> dict:
         message = f"📧 <b>You have {len(emails)} unread emails:</b>\n\n"
 
         for email in emails[:3]:  # Show top 3
-            summary = email.get("summary", email["body"][:100])
+            summary = summary_or_preview(email, max_length=100)
             message += f"<b>From:</b> {email['sender']}\n"
             message += f"<b>Subject:</b> {email['subject']}\n"
             message += f"<b>Summary:</b> {summary}\n\n"
 
-        await telegram.send_message(message)
+        await telegram.send_message(message, priority=SendPriority.NOTIFICATION)
 
         logger.info(f"Processed {len(emails)} emails")
         return {"status": "success", "count": len(emails)}
@@ -78,7 +85,7 @@ async def send_daily_summary(ai_service: AIService = None) -> dict:
         # Get email count only if Gmail is enabled
         if settings.GMAIL_ENABLED:
             gmail = GmailService()
-            emails = gmail.get_unread_emails(max_results=100)
+            emails = await gmail.get_unread_emails(max_results=100)
             email_count = len(emails)
         else:
             email_count = 0
@@ -94,12 +101,12 @@ async def send_daily_summary(ai_service: AIService = None) -> dict:
         summary += f"✅ Completed today: {len(completed_tasks)}\n\n"
 
         if ai_service:
-            ai_summary = ai_service.generate_daily_summary(
+            ai_summary = await ai_service.generate_daily_summary(
                 email_count, pending_tasks, completed_tasks
             )
             summary += f"<i>{ai_summary}</i>"
 
-        await telegram.send_message(summary)
+        await telegram.send_message(summary, priority=SendPriority.NOTIFICATION)
 
         logger.info("Daily summary sent")
         return {"status": "success"}
@@ -170,19 +177,28 @@ async def cleanup_old_data(db: Session, days: int = 30) -> dict:
         ).delete()
 
         # Clean up old messages
-        from app.models.database import Message
+        from app.models.database import Message, LLMCall
 
         old_messages = db.query(Message).filter(
             Message.created_at < cutoff_date
         ).delete()
 
+        # Clean up old LLM usage records
+        old_llm_calls = db.query(LLMCall).filter(
+            LLMCall.created_at < cutoff_date
+        ).delete()
+
         db.commit()
 
-        logger.info(f"Cleaned up {old_tasks} old tasks and {old_messages} old messages")
+        logger.info(
+            f"Cleaned up {old_tasks} old tasks, {old_messages} old messages "
+            f"and {old_llm_calls} old LLM calls"
+        )
         return {
             "status": "success",
             "deleted_tasks": old_tasks,
             "deleted_messages": old_messages,
+            "deleted_llm_calls": old_llm_calls,
         }
 
     except Exception as e:
@@ -194,6 +210,8 @@ async def sync_gmail_to_db(db: Session) -> dict:
     """
     Sync Gmail unread emails to database
 
+    New emails are summarized and classified as they are stored.
+
     Args:
         db: Database session
 
@@ -202,33 +220,32 @@ async def sync_gmail_to_db(db: Session) -> dict:
     """
     try:
         gmail = GmailService()
-        ai = AIService()
-
-        emails = gmail.get_unread_emails(max_results=10, summary_ai=ai)
-
-        saved_count = 0
-        for email_data in emails:
-            # Check if email already exists
-            existing = db.query(Email).filter(
-                Email.gmail_id == email_data["gmail_id"]
-            ).first()
-
-            if not existing:
-                email = Email(
-                    gmail_id=email_data["gmail_id"],
-                    sender=email_data["sender"],
-                    subject=email_data["subject"],
-                    body=email_data["body"],
-                    summary=email_data.get("summary"),
-                    received_at=email_data["received_at"],
-                )
-                db.add(email)
-                saved_count += 1
+        _, saved_count = await get_email_ingest().get_unread(
+            gmail, get_ai_service(), max_results=10
+        )
 
-        db.commit()
         logger.info(f"Synced {saved_count} new emails to database")
         return {"status": "success", "saved": saved_count}
 
     except Exception as e:
         logger.error(f"Error syncing emails: {e}")
         return {"status": "error", "error": str(e)}
+
+
+async def backfill_emails(ai_service: AIService = None) -> dict:
+    """
+    Summarize and classify stored emails still missing a summary or priority
+
+    Args:
+        ai_service: Optional AI service (the shared one if None)
+
+    Returns:
+        Dictionary with task results
+    """
+    try:
+        processed = await get_email_ingest().backfill(ai_service or get_ai_service())
+        return {"status": "success", "processed": processed}
+
+    except Exception as e:
+        logger.error(f"Error backfilling emails: {e}")
+        return {"status": "error", "error": str(e)}
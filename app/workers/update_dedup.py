@@ -0,0 +1,177 @@
+"""Deduplication of redelivered Telegram updates by update_id"""
+
+import logging
+import time
+from collections import OrderedDict
+from typing import Optional
+
+from app.config import get_settings
+from app.models.database import SessionLocal, get_state, set_state
+
+logger = logging.getLogger(__name__)
+
+WATERMARK_STATE_KEY = "telegram_update_watermark"
+
+
+class UpdateDeduplicator:
+    """
+    Reject Telegram updates that have already been accepted
+
+    Recent update IDs are kept in a bounded LRU window. The highest ID
+    seen is persisted as a high-watermark, so after a restart anything at
+    or below the previous process's watermark is treated as a duplicate.
+
+    Telegram starts a new, random update_id sequence after about a week
+    without updates. An ID more than a window below the watermark cannot
+    be a redelivery, so it is taken as such a reset: the floor and
+    watermark are lowered to it instead of dropping the update.
+
+    Forgotten IDs (accepted but not handled, so Telegram will resend them)
+    hold the persisted watermark below them until they are accepted again,
+    so a restart in between does not drop the resend.
+    """
+
+    def __init__(self, window: int = 10000, persist_interval: float = 1.0):
+        """
+        Initialize deduplicator
+
+        Args:
+            window: Number of recent update IDs to remember
+            persist_interval: Minimum seconds between watermark writes
+        """
+        self.window = window
+        self.persist_interval = persist_interval
+        self._seen: OrderedDict = OrderedDict()
+        self._forgotten: set = set()
+        self._floor = self._load_watermark()
+        self.watermark = self._floor
+        self._saved_watermark = self._floor
+        self._last_persist = 0.0
+        self.duplicates = 0
+        self.resets = 0
+
+    def accept(self, update_id: int) -> bool:
+        """
+        Record an update ID if it has not been seen before
+
+        Args:
+            update_id: Telegram update ID
+
+        Returns:
+            True if the update is new, False if it is a duplicate
+        """
+        if update_id < self.watermark - self.window:
+            logger.warning(
+                f"Update {update_id} is far below watermark {self.watermark}, "
+                "assuming Telegram restarted its update_id sequence"
+            )
+            self._floor = min(self._floor, update_id - 1)
+            self.watermark = update_id
+            self._forgotten.clear()
+            self.resets += 1
+            self.save()
+
+        if update_id in self._seen or update_id <= self._floor:
+            self.duplicates += 1
+            if update_id in self._seen:
+                self._seen.move_to_end(update_id)
+            logger.info(f"Dropping duplicate update {update_id}")
+            return False
+
+        self._seen[update_id] = None
+        if len(self._seen) > self.window:
+            self._seen.popitem(last=False)
+
+        if update_id in self._forgotten:
+            self._forgotten.discard(update_id)
+            self.save()
+        elif update_id > self.watermark:
+            self.watermark = update_id
+            if time.monotonic() - self._last_persist >= self.persist_interval:
+                self.save()
+        return True
+
+    def forget(self, update_id: int):
+        """
+        Remove an update ID so a redelivery will be accepted
+
+        Used when an update was accepted but could not be queued or
+        processed. The persisted watermark is lowered below it right away.
+
+        Args:
+            update_id: Telegram update ID
+        """
+        self._seen.pop(update_id, None)
+        if update_id <= self.watermark:
+            self._forgotten.add(update_id)
+            self.save()
+
+    def save(self):
+        """Persist the high-watermark, kept below any forgotten update ID"""
+        self._last_persist = time.monotonic()
+        # Forgotten IDs a window below the watermark count as a reset when resent
+        self._forgotten = {
+            update_id for update_id in self._forgotten
+            if update_id >= self.watermark - self.window
+        }
+        watermark = self.watermark
+        if self._forgotten:
+            watermark = min(watermark, min(self._forgotten) - 1)
+        if watermark == self._saved_watermark:
+            return
+        db = SessionLocal()
+        try:
+            set_state(db, WATERMARK_STATE_KEY, str(watermark))
+            self._saved_watermark = watermark
+        except Exception as e:
+            logger.error(f"Failed to persist update watermark: {e}")
+        finally:
+            db.close()
+
+    def stats(self) -> dict:
+        """
+        Get deduplication statistics
+
+        Returns:
+            Dictionary with window size, watermark, pending redeliveries,
+            duplicate and reset counts
+        """
+        return {
+            "window": len(self._seen),
+            "watermark": self.watermark,
+            "awaiting_redelivery": len(self._forgotten),
+            "duplicates_dropped": self.duplicates,
+            "sequence_resets": self.resets,
+        }
+
+    def _load_watermark(self) -> int:
+        """Read the persisted high-watermark"""
+        db = SessionLocal()
+        try:
+            value = get_state(db, WATERMARK_STATE_KEY)
+            return int(value) if value else 0
+        except Exception as e:
+            logger.warning(f"Failed to load update watermark: {e}")
+            return 0
+        finally:
+            db.close()
+
+
+# Global deduplicator instance
+update_dedup: Optional[UpdateDeduplicator] = None
+
+
+def get_update_dedup() -> UpdateDeduplicator:
+    """Get or create the global update deduplicator"""
+    global update_dedup
+    if update_dedup is None:
+        update_dedup = UpdateDeduplicator(window=get_settings().UPDATE_DEDUP_WINDOW)
+    return update_dedup
+
+
+def close_update_dedup():
+    """Persist the watermark and drop the global deduplicator"""
+    global update_dedup
+    if update_dedup:
+        update_dedup.save()
+        update_dedup = None
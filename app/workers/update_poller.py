@@ -0,0 +1,169 @@
+"""Long-polling (getUpdates) ingestion of Telegram updates"""
+
+import asyncio
+import logging
+from typing import Optional
+
+from app.config import get_settings
+from app.models.database import SessionLocal, get_state, set_state
+from app.services.telegram_service import TelegramService
+from app.workers.update_queue import UpdateHandler, get_update_queue
+from app.workers.update_dedup import get_update_dedup
+
+logger = logging.getLogger(__name__)
+
+OFFSET_STATE_KEY = "telegram_update_offset"
+
+
+class UpdatePoller:
+    """
+    Fetch Telegram updates with getUpdates and feed the update pipeline
+
+    The next offset is stored in the bot_state table after each batch is
+    handed off, so a restart resumes where the previous process stopped.
+    """
+
+    def __init__(
+        self,
+        handler: UpdateHandler,
+        timeout: int = 30,
+        limit: int = 100,
+        retry_delay: float = 5.0,
+    ):
+        """
+        Initialize update poller
+
+        Args:
+            handler: Async function called with each update when no
+                update queue is running
+            timeout: Long-polling timeout in seconds
+            limit: Maximum updates per batch
+            retry_delay: Seconds to wait after a failed poll
+        """
+        self.handler = handler
+        self.timeout = timeout
+        self.limit = limit
+        self.retry_delay = retry_delay
+        self.telegram = TelegramService()
+        self.offset: Optional[int] = None
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def running(self) -> bool:
+        """Whether the polling task is running"""
+        return self._task is not None and not self._task.done()
+
+    async def start(self):
+        """Remove any webhook and start polling"""
+        if self.running:
+            return
+        self.offset = self._load_offset()
+        await self.telegram.delete_webhook()
+        self._task = asyncio.create_task(self._poll_loop(), name="update-poller")
+        logger.info(f"Update poller started (offset={self.offset})")
+
+    async def stop(self):
+        """Stop polling"""
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+            logger.info("Update poller stopped")
+
+    async def _poll_loop(self):
+        """Fetch and dispatch update batches until cancelled"""
+        while True:
+            try:
+                updates = await self.telegram.get_updates(
+                    offset=self.offset, timeout=self.timeout, limit=self.limit
+                )
+                if updates:
+                    await self._dispatch(updates)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Error polling Telegram updates: {e}")
+                await asyncio.sleep(self.retry_delay)
+
+    async def _dispatch(self, updates: list):
+        """Hand a batch of updates to the pipeline and advance the offset"""
+        queue = get_update_queue()
+        dedup = get_update_dedup()
+        next_offset = self.offset
+        try:
+            for update in updates:
+                if not dedup.accept(update["update_id"]):
+                    next_offset = update["update_id"] + 1
+                    continue
+                if update.get("message", {}).get("text"):
+                    if queue and queue.running:
+                        if not await queue.submit(update):
+                            # Saturated: leave the rest for the next getUpdates call
+                            dedup.forget(update["update_id"])
+                            break
+                    else:
+                        try:
+                            await self.handler(update)
+                        except Exception as e:
+                            logger.error(f"Error handling update {update.get('update_id')}: {e}")
+                next_offset = update["update_id"] + 1
+        finally:
+            if next_offset != self.offset:
+                self.offset = next_offset
+                self._save_offset(next_offset)
+
+        logger.debug(f"Dispatched {len(updates)} updates, next offset {self.offset}")
+
+    def _load_offset(self) -> Optional[int]:
+        """Read the persisted offset"""
+        db = SessionLocal()
+        try:
+            value = get_state(db, OFFSET_STATE_KEY)
+            return int(value) if value else None
+        finally:
+            db.close()
+
+    def _save_offset(self, offset: int):
+        """Persist the next offset"""
+        db = SessionLocal()
+        try:
+            set_state(db, OFFSET_STATE_KEY, str(offset))
+        except Exception as e:
+            logger.error(f"Failed to persist update offset: {e}")
+        finally:
+            db.close()
+
+
+# Global poller instance
+update_poller: Optional[UpdatePoller] = None
+
+
+async def start_update_poller(handler: UpdateHandler) -> UpdatePoller:
+    """
+    Create and start the global update poller
+
+    Args:
+        handler: Async function called with each update
+
+    Returns:
+        Running update poller
+    """
+    global update_poller
+    if update_poller is None:
+        settings = get_settings()
+        update_poller = UpdatePoller(
+            handler,
+            timeout=settings.TELEGRAM_POLL_TIMEOUT,
+            limit=settings.TELEGRAM_POLL_LIMIT,
+            retry_delay=settings.RETRY_DELAY,
+        )
+    await update_poller.start()
+    return update_poller
+
+
+async def stop_update_poller():
+    """Stop the global update poller"""
+    global update_poller
+    if update_poller:
+        await update_poller.stop()
+        update_poller = None
@@ -0,0 +1,222 @@
+"""Bounded worker pool for processing incoming Telegram updates"""
+
+import asyncio
+import logging
+from collections import deque
+from typing import Optional, Callable, Awaitable, Any, Dict, List
+
+from app.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+UpdateHandler = Callable[[Dict[str, Any]], Awaitable[Any]]
+
+
+class UpdateQueue:
+    """
+    Worker pool that drains Telegram updates in the background
+
+    Any free worker takes the next update, so one slow chat never holds
+    up others. Only one update per chat is handled at a time: later
+    updates from a busy chat wait in that chat's backlog and are put back
+    on the queue when the earlier one finishes, so each chat stays in order.
+    """
+
+    def __init__(
+        self,
+        handler: UpdateHandler,
+        workers: int = 4,
+        max_size: int = 100,
+        enqueue_timeout: float = 2.0,
+    ):
+        """
+        Initialize update queue
+
+        Args:
+            handler: Async function called with each update
+            workers: Number of worker tasks
+            max_size: Total number of updates that may wait in the queue
+            enqueue_timeout: Seconds to wait for space before rejecting
+        """
+        self.handler = handler
+        self.workers = max(1, workers)
+        self.max_size = max(1, max_size)
+        self.enqueue_timeout = enqueue_timeout
+        # (update, is_next): is_next marks a chat's next update, which may pass its backlog
+        self._queue: asyncio.Queue = asyncio.Queue()
+        # Chats with an update being handled -> updates queued behind it
+        self._backlogs: Dict[Any, deque] = {}
+        # Updates accepted and not yet handled; bounded by max_size
+        self._slots = asyncio.Semaphore(self.max_size)
+        self._pending = 0
+        self._drained = asyncio.Event()
+        self._drained.set()
+        self._tasks: List[asyncio.Task] = []
+        self.processed = 0
+        self.failed = 0
+        self.rejected = 0
+
+    @property
+    def running(self) -> bool:
+        """Whether worker tasks are running"""
+        return bool(self._tasks)
+
+    def start(self):
+        """Start worker tasks"""
+        if self.running:
+            return
+        self._tasks = [
+            asyncio.create_task(self._worker(i), name=f"update-worker-{i}")
+            for i in range(self.workers)
+        ]
+        logger.info(f"Started {self.workers} update workers")
+
+    async def stop(self, drain_timeout: float = 10.0):
+        """
+        Stop worker tasks, letting queued updates drain first
+
+        Args:
+            drain_timeout: Seconds to wait for queued updates to finish
+        """
+        if not self.running:
+            return
+        try:
+            await asyncio.wait_for(self._drained.wait(), timeout=drain_timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"Update queue not drained, dropping {self._pending} updates")
+
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        logger.info("Update workers stopped")
+
+    async def submit(self, update: Dict[str, Any]) -> bool:
+        """
+        Enqueue an update for background processing
+
+        Waits up to enqueue_timeout for space in the queue; when the pool is
+        saturated the update is rejected so the caller can push back.
+
+        Args:
+            update: Telegram update object
+
+        Returns:
+            True if enqueued, False if the queue is full
+        """
+        try:
+            await asyncio.wait_for(self._slots.acquire(), timeout=self.enqueue_timeout)
+        except asyncio.TimeoutError:
+            self.rejected += 1
+            logger.warning(f"Update queue full, rejecting update {update.get('update_id')}")
+            return False
+        self._pending += 1
+        self._drained.clear()
+        self._queue.put_nowait((update, False))
+        return True
+
+    @property
+    def depth(self) -> int:
+        """Number of updates waiting for a worker"""
+        return self._queue.qsize() + sum(len(backlog) for backlog in self._backlogs.values())
+
+    def stats(self) -> dict:
+        """
+        Get queue statistics
+
+        Returns:
+            Dictionary with queue depth and counters
+        """
+        return {
+            "running": self.running,
+            "workers": self.workers,
+            "depth": self.depth,
+            "capacity": self.max_size,
+            "busy_chats": len(self._backlogs),
+            "processed": self.processed,
+            "failed": self.failed,
+            "rejected": self.rejected,
+        }
+
+    def _release(self, chat_key: Any):
+        """Hand a chat's next backlogged update back to the queue"""
+        backlog = self._backlogs.get(chat_key)
+        if backlog:
+            self._queue.put_nowait((backlog.popleft(), True))
+        else:
+            self._backlogs.pop(chat_key, None)
+
+    async def _worker(self, index: int):
+        """Process updates, one at a time per chat"""
+        while True:
+            update, is_next = await self._queue.get()
+            chat_key = self._chat_key(update)
+            if not is_next:
+                if chat_key in self._backlogs:
+                    # An earlier update from this chat is being handled; keep order behind it
+                    self._backlogs[chat_key].append(update)
+                    continue
+                self._backlogs[chat_key] = deque()
+
+            try:
+                await self.handler(update)
+                self.processed += 1
+            except Exception as e:
+                self.failed += 1
+                logger.error(f"Update worker {index} failed on update {update.get('update_id')}: {e}")
+            finally:
+                self._pending -= 1
+                self._slots.release()
+                if not self._pending:
+                    self._drained.set()
+                self._release(chat_key)
+
+    @staticmethod
+    def _chat_key(update: Dict[str, Any]) -> Any:
+        """Get the ordering key (chat ID) for an update"""
+        message = update.get("message") or {}
+        return (
+            message.get("chat", {}).get("id")
+            or message.get("from", {}).get("id")
+            or update.get("update_id")
+        )
+
+
+# Global update queue instance
+update_queue: Optional[UpdateQueue] = None
+
+
+def get_update_queue() -> Optional[UpdateQueue]:
+    """Get the global update queue, if started"""
+    return update_queue
+
+
+async def start_update_queue(handler: UpdateHandler) -> UpdateQueue:
+    """
+    Create and start the global update queue
+
+    Args:
+        handler: Async function called with each update
+
+    Returns:
+        Running update queue
+    """
+    global update_queue
+    if update_queue is None:
+        settings = get_settings()
+        update_queue = UpdateQueue(
+            handler,
+            workers=settings.UPDATE_WORKERS,
+            max_size=settings.UPDATE_QUEUE_SIZE,
+            enqueue_timeout=settings.UPDATE_ENQUEUE_TIMEOUT,
+        )
+    update_queue.start()
+    return update_queue
+
+
+async def stop_update_queue():
+    """Drain and stop the global update queue"""
+    global update_queue
+    if update_queue:
+        await update_queue.stop(get_settings().UPDATE_DRAIN_TIMEOUT)
+        update_queue = None
@@ -5,12 +5,37 @@ from contextlib import asynccontextmanager
 from datetime import datetime
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, PlainTextResponse
 
 from app.config import get_settings, setup_logging, validate_settings
+from app.metrics import register_gauge, render_prometheus
 from app.models.database import init_db
 from app.models.schemas import HealthCheck
 from app.routers import telegram, scheduler, email
-from app.workers.scheduler import start_scheduler, stop_scheduler
+from app.services.telegram_service import (
+    TelegramService,
+    start_http_session,
+    close_http_session,
+)
+from app.services.send_queue import start_send_queue, stop_send_queue, get_send_queue
+from app.services.answer_cache import get_answer_cache
+from app.services.llm_ledger import start_llm_ledger, stop_llm_ledger, get_llm_ledger
+from app.services.semantic_cache import get_semantic_cache, warm_semantic_cache
+from app.services.model_router import get_model_router
+from app.services.priority_classifier import get_priority_classifier
+from app.services.resilience import DEPENDENCIES, get_dependency
+from app.services.single_flight import FLIGHT_NAMES, get_single_flight
+from app.services.text_reducer import total_tokens_saved
+from app.workers.scheduler import start_scheduler, stop_scheduler, schedule_task
+from app.workers.tasks import backfill_emails
+from app.workers.update_queue import start_update_queue, stop_update_queue, get_update_queue
+from app.workers.update_poller import start_update_poller, stop_update_poller
+from app.workers.update_dedup import close_update_dedup
+from app.workers.message_writer import (
+    start_message_writer,
+    stop_message_writer,
+    get_message_writer,
+)
 from app import __version__
 
 # Configure logging
@@ -45,11 +70,46 @@ async def lifespan(app: FastAPI):
         logger.error(f"Failed to initialize database: {e}")
         raise
 
+    # Rebuild the similar-question index from persisted answers
+    if settings.ANSWER_CACHE_ENABLED and settings.SEMANTIC_CACHE_ENABLED:
+        await warm_semantic_cache()
+
+    # Train the local priority classifier on LLM-labelled emails
+    if settings.PRIORITY_CLASSIFIER_ENABLED:
+        await get_priority_classifier().retrain()
+
+    # Open shared Telegram HTTP session
+    await start_http_session()
+
+    # Start rate-limited outbound send queue
+    await start_send_queue(TelegramService().post_message)
+
+    # Start write-behind message persistence
+    await start_message_writer()
+
+    # Start batched LLM usage recording
+    await start_llm_ledger()
+
+    # Start update worker pool
+    await start_update_queue(telegram.process_update)
+
+    # Fetch updates with getUpdates instead of waiting for the webhook
+    if settings.TELEGRAM_MODE == "polling":
+        await start_update_poller(telegram.process_update)
+
     # Start scheduler
     if settings.SCHEDULER_ENABLED:
         try:
             await start_scheduler()
             logger.info("Scheduler started successfully")
+            # Complete stored emails whose summary or priority failed at ingest
+            if settings.GMAIL_ENABLED:
+                await schedule_task(
+                    "email_backfill",
+                    backfill_emails,
+                    trigger_type="interval",
+                    seconds=settings.EMAIL_BACKFILL_INTERVAL,
+                )
         except Exception as e:
             logger.warning(f"Failed to start scheduler: {e}")
 
@@ -57,13 +117,45 @@ async def lifespan(app: FastAPI):
 
     # Shutdown
     logger.info("Shutting down application")
-    
+
+    try:
+        await stop_update_poller()
+    except Exception as e:
+        logger.warning(f"Error stopping update poller: {e}")
+
+    try:
+        await stop_update_queue()
+    except Exception as e:
+        logger.warning(f"Error stopping update workers: {e}")
+
+    close_update_dedup()
+
+    try:
+        await stop_message_writer()
+    except Exception as e:
+        logger.warning(f"Error flushing message writer: {e}")
+
     try:
         await stop_scheduler()
         logger.info("Scheduler stopped")
     except Exception as e:
         logger.warning(f"Error stopping scheduler: {e}")
 
+    try:
+        await stop_llm_ledger()
+    except Exception as e:
+        logger.warning(f"Error flushing LLM ledger: {e}")
+
+    try:
+        await stop_send_queue()
+    except Exception as e:
+        logger.warning(f"Error stopping send queue: {e}")
+
+    try:
+        await close_http_session()
+    except Exception as e:
+        logger.warning(f"Error closing Telegram HTTP session: {e}")
+
     logger.info("Application shutdown complete")
 
 
@@ -116,6 +208,8 @@ async def health_check() -> dict:
         "debug": settings.DEBUG,
         "timezone": settings.TIMEZONE,
         "scheduler_enabled": settings.SCHEDULER_ENABLED,
+        "telegram_mode": settings.TELEGRAM_MODE,
+        "dependencies": {name: get_dependency(name).stats() for name in DEPENDENCIES},
         "timestamp": datetime.utcnow().isoformat(),
     }
 
@@ -132,6 +226,96 @@ else:
 app.include_router(scheduler.router)
 
 
+# Queue gauges exported alongside the stage histograms
+register_gauge(
+    "bot_update_queue_depth",
+    "Telegram updates waiting for a worker",
+    lambda: get_update_queue().depth,
+)
+register_gauge(
+    "bot_send_queue_depth",
+    "Outbound Telegram messages waiting to be sent",
+    lambda: get_send_queue().stats()["depth"],
+)
+register_gauge(
+    "bot_message_writer_backlog",
+    "Messages waiting to be written to the database",
+    lambda: get_message_writer().backlog,
+)
+register_gauge(
+    "bot_answer_cache_hits_total",
+    "Questions answered from the answer cache",
+    lambda: get_answer_cache().memory_hits + get_answer_cache().db_hits,
+    metric_type="counter",
+)
+register_gauge(
+    "bot_answer_cache_misses_total",
+    "Questions not found in the answer cache",
+    lambda: get_answer_cache().misses,
+    metric_type="counter",
+)
+register_gauge(
+    "bot_semantic_cache_hits_total",
+    "Questions answered from a similar earlier question",
+    lambda: get_semantic_cache().hits,
+    metric_type="counter",
+)
+for flight_name in FLIGHT_NAMES:
+    register_gauge(
+        f"bot_{flight_name}_coalesced_calls_total",
+        f"Identical concurrent {flight_name} requests served by an in-flight call",
+        lambda name=flight_name: get_single_flight(name).coalesced,
+        metric_type="counter",
+    )
+for dependency_name in DEPENDENCIES:
+    register_gauge(
+        f"bot_{dependency_name}_circuit_open",
+        f"1 while the {dependency_name} circuit breaker rejects calls",
+        lambda name=dependency_name: get_dependency(name).breaker.state != "closed",
+    )
+    register_gauge(
+        f"bot_{dependency_name}_hedged_requests_total",
+        f"Second {dependency_name} requests sent because the first was slow",
+        lambda name=dependency_name: get_dependency(name).hedges,
+        metric_type="counter",
+    )
+for route_name in settings.MODEL_ROUTES:
+    register_gauge(
+        f"bot_{route_name}_model_fallback_active",
+        f"1 while {route_name} requests go to the fallback model",
+        lambda name=route_name: get_model_router().degraded(name),
+    )
+register_gauge(
+    "bot_llm_prompt_tokens_total",
+    "Prompt tokens reported for completion calls",
+    lambda: get_llm_ledger().prompt_tokens,
+    metric_type="counter",
+)
+register_gauge(
+    "bot_llm_completion_tokens_total",
+    "Completion tokens reported for completion calls",
+    lambda: get_llm_ledger().completion_tokens,
+    metric_type="counter",
+)
+register_gauge(
+    "bot_llm_input_tokens_saved_total",
+    "Estimated email tokens removed before LLM calls",
+    total_tokens_saved,
+    metric_type="counter",
+)
+
+
+@app.get("/metrics", response_class=PlainTextResponse, tags=["monitoring"])
+async def metrics() -> str:
+    """
+    Prometheus metrics endpoint
+
+    Returns:
+        Per-stage latency histograms and queue gauges in Prometheus text format
+    """
+    return render_prometheus()
+
+
 # API documentation endpoints
 @app.get("/api/docs", tags=["documentation"])
 async def api_documentation() -> dict:
@@ -145,11 +329,17 @@ async def api_documentation() -> dict:
         "app_name": settings.APP_NAME,
         "version": settings.APP_VERSION,
         "endpoints": {
+            "metrics": "GET /metrics - Prometheus latency metrics",
             "telegram": {
                 "webhook": "POST /telegram/webhook - Receive Telegram updates",
                 "command": "POST /telegram/command - Execute a command",
                 "send": "POST /telegram/send - Send a message",
                 "status": "GET /telegram/status - Get bot status",
+                "queue": "GET /telegram/queue - Get update queue status",
+                "send_queue": "GET /telegram/send-queue - Get outbound send queue status",
+                "answer_cache": "GET /telegram/answer-cache - Get answer cache hit/miss counters",
+                "model_routes": "GET /telegram/model-routes - Get per-method model routing and SLO state",
+                "llm_usage": "GET /telegram/llm-usage - Get per-method LLM call counts, latency and tokens",
             },
             "email": {
                 "unread": "GET /email/unread - Get unread emails",
@@ -158,6 +348,9 @@ async def api_documentation() -> dict:
                 "draft": "POST /email/draft - Create a draft",
                 "summary": "GET /email/summary/{id} - Get email summary",
                 "mark_read": "POST /email/mark-read/{id} - Mark as read",
+                "token_savings": "GET /email/token-savings - Tokens removed before LLM calls",
+                "ingest": "GET /email/ingest - Email ingest counters and backfill backlog",
+                "backfill": "POST /email/backfill - Summarize and classify stored emails missing either",
             },
             "scheduler": {
                 "start": "POST /scheduler/start - Start scheduler",
@@ -206,22 +399,28 @@ async def api_info() -> dict:
 async def http_exception_handler(request, exc):
     """Handle HTTP exceptions"""
     logger.error(f"HTTP Exception: {exc.status_code} - {exc.detail}")
-    return {
-        "error": exc.detail,
-        "status_code": exc.status_code,
-        "timestamp": datetime.utcnow().isoformat(),
-    }
+    return JSONResponse(
+        status_code=exc.status_code,
+        content={
+            "error": exc.detail,
+            "status_code": exc.status_code,
+            "timestamp": datetime.utcnow().isoformat(),
+        },
+    )
 
 
 @app.exception_handler(Exception)
 async def general_exception_handler(request, exc):
     """Handle general exceptions"""
     logger.error(f"Unhandled exception: {exc}", exc_info=True)
-    return {
-        "error": "Internal server error",
-        "status_code": 500,
-        "timestamp": datetime.utcnow().isoformat(),
-    }
+    return JSONResponse(
+        status_code=500,
+        content={
+            "error": "Internal server error",
+            "status_code": 500,
+            "timestamp": datetime.utcnow().isoformat(),
+        },
+    )
 
 
 if __name__ == "__main__":
@@ -0,0 +1,258 @@
+"""
+Micro-benchmark for natural language command parsing
+
+Compares the compiled single-pass intent matcher with the original
+keyword cascade it replaced, after checking that both return the same
+result for every command in the corpus.
+
+Usage:
+    python scripts/benchmark_intent_matcher.py [--rounds N]
+"""
+
+import argparse
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.intent_matcher import match_intent  # noqa: E402
+
+# Commands as users send them to the bot
+CORPUS = [
+    "Send an email to john@example.com saying hello",
+    "Read my unread emails",
+    "Schedule a meeting reminder at 2pm",
+    "What are my pending tasks?",
+    "what's the stock price of AAPL",
+    "TSLA stock",
+    "show me the share price for nvidia",
+    "check ticker msft please",
+    "bitcoin price",
+    "how much is eth today",
+    "dogecoin to the moon",
+    "sol price",
+    "what is cardano trading at",
+    "xrp news",
+    "what time is it in Tokyo?",
+    "current time in London",
+    "local time",
+    "weather in Paris",
+    "what's the forecast for Berlin",
+    "is it raining",
+    "how cold is it outside",
+    "who wrote hamlet",
+    "explain quantum computing in simple terms",
+    "define serendipity",
+    "what is the capital of australia",
+    "convert 10 miles to km",
+    "check my inbox",
+    "any new gmail",
+    "reply to the last mail from anna@corp.io",
+    "remind me to call mom tomorrow",
+    "add a todo: buy milk",
+    "set an alarm for 7am",
+    "give me my daily summary",
+    "morning briefing",
+    "weekly report",
+    "help",
+    "list commands",
+    "thanks!",
+    "good morning",
+    "ok",
+    "I need to finish the presentation slides before friday",
+    "lol",
+]
+
+
+def legacy_parse_command(text: str) -> dict:
+    """Original keyword cascade from AIService.parse_command"""
+    text_lower = text.lower().strip()
+
+    # === PATTERN 0: Real-time data queries - CHECK FIRST! ===
+
+    # Stock price queries
+    stock_keywords = ["stock", "share price", "stock price", "ticker", "market price"]
+    if any(word in text_lower for word in stock_keywords):
+        # Extract stock symbol - look for common patterns
+        words = text.upper().split()
+        symbol = None
+        for i, word in enumerate(words):
+            # Look for word after "stock" or standalone ticker symbols
+            clean_word = ''.join(c for c in word if c.isalpha())
+            if clean_word in ["AAPL", "GOOGL", "GOOG", "MSFT", "AMZN", "META", "TSLA", "NVDA", "NFLX", "AMD", "INTC", "IBM", "ORCL", "CRM", "ADBE", "PYPL", "UBER", "LYFT", "SPOT", "SNAP", "TWTR", "PINS", "ZM", "SHOP", "SQ", "COIN", "HOOD", "RBLX", "ABNB", "PLTR", "SOFI", "NIO", "RIVN", "LCID", "F", "GM", "TM", "BA", "DIS", "WMT", "TGT", "COST", "HD", "LOW", "NKE", "SBUX", "MCD", "KO", "PEP", "JNJ", "PFE", "MRNA", "BNTX", "UNH", "CVS", "WBA", "JPM", "BAC", "WFC", "C", "GS", "MS", "V", "MA", "AXP"]:
+                symbol = clean_word
+                break
+            # Check if previous word was "stock" or similar
+            if i > 0 and any(kw in words[i-1].lower() for kw in ["stock", "price", "ticker"]):
+                if len(clean_word) <= 5 and clean_word.isalpha():
+                    symbol = clean_word
+                    break
+
+        if not symbol:
+            # Try to find any word that looks like a ticker (2-5 uppercase letters)
+            for word in words:
+                clean_word = ''.join(c for c in word if c.isalpha())
+                if 1 <= len(clean_word) <= 5 and clean_word.isalpha() and clean_word not in ["THE", "AND", "FOR", "WHAT", "PRICE", "STOCK", "SHOW", "GET", "CHECK"]:
+                    symbol = clean_word
+                    break
+
+        return {
+            "action": "get_stock_price",
+            "parameters": {"symbol": symbol or "AAPL"},
+            "confidence": 95
+        }
+
+    # Cryptocurrency queries
+    crypto_keywords = ["bitcoin", "btc", "ethereum", "eth", "crypto", "cryptocurrency", "dogecoin", "doge", "solana", "sol", "cardano", "ada", "ripple", "xrp"]
+    if any(word in text_lower for word in crypto_keywords):
+        # Map keywords to symbols
+        symbol = "BTC"  # default
+        if "ethereum" in text_lower or "eth" in text_lower.split():
+            symbol = "ETH"
+        elif "dogecoin" in text_lower or "doge" in text_lower:
+            symbol = "DOGE"
+        elif "solana" in text_lower or "sol" in text_lower.split():
+            symbol = "SOL"
+        elif "cardano" in text_lower or "ada" in text_lower.split():
+            symbol = "ADA"
+        elif "ripple" in text_lower or "xrp" in text_lower:
+            symbol = "XRP"
+
+        return {
+            "action": "get_crypto_price",
+            "parameters": {"symbol": symbol},
+            "confidence": 95
+        }
+
+    # Time in city queries
+    time_keywords = ["time in", "current time in", "what time", "time now in", "local time"]
+    if any(word in text_lower for word in time_keywords):
+        # Extract city name
+        city = "New York"  # default
+        # Common patterns: "time in Tokyo", "what time is it in London"
+        for pattern in ["time in ", "time is it in ", "time now in "]:
+            if pattern in text_lower:
+                city = text_lower.split(pattern)[-1].strip().rstrip("?").strip()
+                break
+
+        return {
+            "action": "get_time",
+            "parameters": {"city": city},
+            "confidence": 95
+        }
+
+    # Weather queries
+    weather_keywords = ["weather in", "weather at", "temperature in", "forecast", "how hot", "how cold", "is it raining", "weather today"]
+    if any(word in text_lower for word in weather_keywords):
+        # Extract city name
+        city = "New York"  # default
+        for pattern in ["weather in ", "weather at ", "temperature in ", "forecast for ", "forecast in "]:
+            if pattern in text_lower:
+                city = text_lower.split(pattern)[-1].strip().rstrip("?").strip()
+                break
+
+        return {
+            "action": "get_weather",
+            "parameters": {"city": city},
+            "confidence": 95
+        }
+
+    # === PATTERN 1: General Questions (Q&A) ===
+    # This catches most natural language queries
+    question_indicators = ["what", "who", "where", "when", "why", "how", "tell me", "explain", "describe", "?", "meaning", "define", "capital", "population", "distance", "calculate", "convert"]
+    if any(indicator in text_lower for indicator in question_indicators):
+        return {
+            "action": "ask_question",
+            "parameters": {"question": text},
+            "confidence": 90
+        }
+
+    # === PATTERN 2: Email related ===
+    email_keywords = ["email", "mail", "unread", "inbox", "gmail"]
+    if any(word in text_lower for word in email_keywords):
+
+        # Check if it's send_email
+        send_keywords = ["send", "write", "compose", "to", "reply"]
+        if any(word in text_lower for word in send_keywords):
+            # Try to find email address
+            recipient = ""
+            for word in text.split():
+                if "@" in word:
+                    recipient = word.strip()
+                    break
+
+            return {
+                "action": "send_email",
+                "parameters": {
+                    "recipient": recipient,
+                    "body": text
+                },
+                "confidence": 90
+            }
+        else:
+            # Read emails
+            return {
+                "action": "read_emails",
+                "parameters": {},
+                "confidence": 90
+            }
+
+    # === PATTERN 3: Task/Schedule related ===
+    task_keywords = ["task", "todo", "reminder", "schedule", "remind", "alarm", "meeting", "appointment"]
+    if any(word in text_lower for word in task_keywords):
+        return {
+            "action": "schedule_task",
+            "parameters": {"task_name": text},
+            "confidence": 85
+        }
+
+    # === PATTERN 4: Summary related ===
+    summary_keywords = ["summary", "daily summary", "overview", "report", "briefing"]
+    if any(word in text_lower for word in summary_keywords):
+        return {
+            "action": "send_message",
+            "parameters": {"body": text},
+            "confidence": 80
+        }
+
+    # === PATTERN 5: Help/Information ===
+    help_keywords = ["help", "commands", "what can you do", "abilities", "features"]
+    if any(word in text_lower for word in help_keywords):
+        return {
+            "action": "send_message",
+            "parameters": {"body": text},
+            "confidence": 85
+        }
+
+    # === DEFAULT: Treat everything else as a question ===
+    return {
+        "action": "ask_question",
+        "parameters": {"question": text},
+        "confidence": 75
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rounds", type=int, default=2000, help="Passes over the corpus")
+    args = parser.parse_args()
+
+    mismatches = [
+        text for text in CORPUS if legacy_parse_command(text) != match_intent(text)
+    ]
+    if mismatches:
+        for text in mismatches:
+            print(f"MISMATCH {text!r}: {legacy_parse_command(text)} != {match_intent(text)}")
+        sys.exit(1)
+
+    calls = args.rounds * len(CORPUS)
+    print(f"{len(CORPUS)} commands x {args.rounds} rounds, results identical")
+    for name, func in (("legacy cascade", legacy_parse_command), ("compiled matcher", match_intent)):
+        elapsed = min(
+            timeit.repeat(lambda: [func(text) for text in CORPUS], number=args.rounds, repeat=3)
+        )
+        print(f"{name:18} {calls / elapsed:12,.0f} commands/s  {elapsed / calls * 1e6:6.2f} us/command")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+"""
+Benchmark for the local email priority classifier
+
+Trains the classifier on synthetic labelled emails, then reports on
+held-out emails how many it would answer without the LLM (confidence at
+or above the threshold), how often those answers match the label, and
+batch classification latency. It then measures the threshold from half
+of the held-out labels, as the service does from LLM comparisons, and
+reports the agreement it gives on the other half.
+
+Usage:
+    python scripts/benchmark_priority_classifier.py [--train N] [--test N]
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.priority_classifier import PriorityClassifier  # noqa: E402
+
+# priority -> (senders, subject words, body words)
+PROFILES = {
+    "low": (
+        ["news@digest.example.com", "deals@shop.example.com", "noreply@social.example.com"],
+        "weekly digest newsletter offer sale update tips",
+        "unsubscribe discount read more articles trending deals community highlights",
+    ),
+    "medium": (
+        ["colleague@corp.example.com", "team@corp.example.com", "hr@corp.example.com"],
+        "meeting notes project status sync agenda",
+        "attached notes please review when you can thanks for the update next week",
+    ),
+    "high": (
+        ["manager@corp.example.com", "client@partner.example.com"],
+        "action required approval needed review contract",
+        "please approve by friday need your decision contract signature important deliverable",
+    ),
+    "urgent": (
+        ["oncall@corp.example.com", "security@corp.example.com", "ceo@corp.example.com"],
+        "urgent outage down immediately critical incident",
+        "production is down customers affected respond immediately critical security breach asap",
+    ),
+}
+SHARED_WORDS = "hi hello regards the a to of and for you your we this is on in".split()
+
+
+def make_email(rng: random.Random, priority: str) -> dict:
+    """Synthetic email for a priority with some shared and off-profile words"""
+    senders, subject_words, body_words = PROFILES[priority]
+    other = PROFILES[rng.choice(list(PROFILES))]
+    # A third of emails come from a sender usually seen with another priority
+    sender = rng.choice(other[0] if rng.random() < 0.33 else senders)
+    subject = rng.sample(subject_words.split(), 2) + rng.sample(other[1].split(), 2)
+    body = (
+        rng.choices(body_words.split(), k=5)
+        + rng.choices(other[2].split(), k=5)
+        + rng.choices(SHARED_WORDS, k=20)
+    )
+    rng.shuffle(body)
+    return {
+        "sender": f"Someone <{sender}>",
+        "subject": " ".join(subject),
+        "body": " ".join(body),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the local priority classifier")
+    parser.add_argument("--train", type=int, default=2000, help="Training emails")
+    parser.add_argument("--test", type=int, default=1000, help="Held-out emails")
+    parser.add_argument("--batch", type=int, default=50, help="Emails per classification batch")
+    parser.add_argument("--threshold", type=float, default=0.9, help="Confidence threshold")
+    parser.add_argument(
+        "--target", type=float, default=0.95, help="Agreement the measured threshold must reach"
+    )
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    labels = list(PROFILES)
+
+    def sample(n):
+        chosen = [rng.choice(labels) for _ in range(n)]
+        return [make_email(rng, label) for label in chosen], chosen
+
+    train_emails, train_labels = sample(args.train)
+    test_emails, test_labels = sample(args.test)
+
+    classifier = PriorityClassifier(min_samples=0, target_agreement=args.target)
+    started = time.perf_counter()
+    for i in range(0, len(train_emails), args.batch):
+        classifier.learn(train_emails[i:i + args.batch], train_labels[i:i + args.batch])
+    print(f"Learned {args.train} emails in {(time.perf_counter() - started) * 1000:.0f}ms")
+
+    predictions = []
+    timings = []
+    for i in range(0, len(test_emails), args.batch):
+        started = time.perf_counter()
+        predictions += classifier.predict(test_emails[i:i + args.batch])
+        timings.append(time.perf_counter() - started)
+
+    confident = [
+        (predicted, label)
+        for (predicted, confidence), label in zip(predictions, test_labels)
+        if confidence >= args.threshold
+    ]
+    overall = sum(p == label for (p, _), label in zip(predictions, test_labels))
+    agreed = sum(p == label for p, label in confident)
+    print(f"Overall accuracy: {overall / len(test_labels):.1%}")
+    print(
+        f"Answered locally (confidence >= {args.threshold}): "
+        f"{len(confident) / len(test_labels):.1%}, "
+        f"agreement {agreed / max(len(confident), 1):.1%}"
+    )
+    print(
+        f"Batch of {args.batch}: {sum(timings) / len(timings) * 1000:.2f}ms average, "
+        f"{max(timings) * 1000:.2f}ms max"
+    )
+
+    # Measure the threshold on the first half, as LLM comparisons would,
+    # then check the agreement it gives on the second half
+    half = len(test_labels) // 2
+    for (predicted, confidence), label in zip(predictions[:half], test_labels[:half]):
+        classifier.record_agreement(predicted, confidence, label)
+    threshold = classifier.threshold
+    held_out = [
+        (predicted, label)
+        for (predicted, confidence), label in zip(predictions[half:], test_labels[half:])
+        if confidence >= threshold
+    ]
+    agreed = sum(p == label for p, label in held_out)
+    print(
+        f"Measured threshold for {classifier.target_agreement:.0%} agreement: {threshold:g}; "
+        f"answered locally {len(held_out) / (len(test_labels) - half):.1%}, "
+        f"agreement {agreed / max(len(held_out), 1):.1%}"
+    )
+
+
+if __name__ == "__main__":
+    main()
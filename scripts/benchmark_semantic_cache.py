@@ -0,0 +1,99 @@
+"""
+Micro-benchmark for the semantic answer cache
+
+Fills a cache with synthetic questions, then measures add throughput,
+lookup latency percentiles and which paraphrases are answered from the
+cache.
+
+Usage:
+    python scripts/benchmark_semantic_cache.py [--entries N] [--lookups N]
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.semantic_cache import SemanticCache  # noqa: E402
+
+MODEL = "benchmark"
+
+WORDS = (
+    "atom battery bridge cell climate code comet crystal engine enzyme forest galaxy "
+    "gene glacier language market metal network ocean orbit planet protein rain river "
+    "signal soil star sugar tide virus voltage wave"
+).split()
+TEMPLATES = [
+    "how does {a} affect {b} and {c}",
+    "why is {a} related to {b} in {c}",
+    "who studied {a} {b} near {c}",
+    "when does {a} turn into {b} with {c}",
+]
+
+# (cached question, new question, expected hit)
+PARAPHRASES = [
+    ("explain machine learning", "what's ML?", True),
+    ("What is machine learning?", "explain machine learning please", True),
+    ("How do black holes form?", "how do black holes form", True),
+    ("What is the capital of France?", "capital of France?", True),
+    ("What is the capital of France?", "What is the capital of Germany?", False),
+    ("Who invented the telephone?", "When was the telephone invented?", False),
+    ("what is 2+3", "what is 2*3", False),
+    ("convert 10 miles to km", "convert 10 km to miles", False),
+    ("Is Python faster than Java?", "Is Java faster than Python?", False),
+    ("what is 5 plus 3", "what is 3 plus 5", False),
+    ("who is the president of the usa", "who was the president of the usa", False),
+    ("what is the weather today", "what is the weather tomorrow", False),
+]
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(int(pct / 100 * len(ordered)), len(ordered) - 1)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the semantic answer cache")
+    parser.add_argument("--entries", type=int, default=100000, help="Cached questions")
+    parser.add_argument("--lookups", type=int, default=1000, help="Timed lookups")
+    parser.add_argument("--dim", type=int, default=256, help="Embedding size")
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    questions = [
+        rng.choice(TEMPLATES).format(a=a, b=b, c=c)
+        for a, b, c in (rng.sample(WORDS, 3) for _ in range(args.entries))
+    ]
+    cache = SemanticCache(capacity=args.entries, dim=args.dim)
+
+    started = time.perf_counter()
+    for question in questions:
+        cache.add(question, "answer", MODEL)
+    elapsed = time.perf_counter() - started
+    print(f"Added {args.entries} entries in {elapsed:.2f}s ({args.entries / elapsed:,.0f}/s)")
+
+    timings = []
+    for _ in range(args.lookups):
+        question = rng.choice(questions)
+        started = time.perf_counter()
+        cache.get(question, MODEL)
+        timings.append(time.perf_counter() - started)
+    print(
+        f"Lookup over {cache.size} distinct questions: p50 {percentile(timings, 50) * 1000:.2f}ms  "
+        f"p99 {percentile(timings, 99) * 1000:.2f}ms"
+    )
+
+    print("\nParaphrases:")
+    for cached, asked, expected in PARAPHRASES:
+        probe = SemanticCache(capacity=8, dim=args.dim)
+        probe.add(cached, "answer", MODEL)
+        hit = probe.get(asked, MODEL) is not None
+        mark = "ok" if hit == expected else "UNEXPECTED"
+        print(f"  {'hit ' if hit else 'miss'} {mark:10} '{cached}' ~ '{asked}'")
+
+
+if __name__ == "__main__":
+    main()
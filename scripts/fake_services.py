@@ -0,0 +1,442 @@
+"""
+Local stand-ins for the Telegram Bot API, Gmail REST API and OpenAI API
+
+Each fake is a small aiohttp server with configurable latency and error
+injection. Point the app at them with TELEGRAM_API_BASE, GMAIL_API_BASE
+and OPENAI_BASE_URL. Used by scripts/loadtest.py; can also be run on its
+own for manual testing:
+
+    python scripts/fake_services.py --latency 0.05 --error-rate 0.01
+"""
+
+import argparse
+import asyncio
+import base64
+import json
+import random
+import re
+import time
+from collections import defaultdict
+from email.parser import BytesParser
+from email.utils import formatdate
+from typing import Dict, List, Optional, Tuple
+
+from aiohttp import web
+
+
+class FakeService:
+    """Base class: an aiohttp app that delays and fails requests on demand"""
+
+    name = "fake"
+
+    def __init__(
+        self,
+        latency: float = 0.05,
+        jitter: float = 0.0,
+        error_rate: float = 0.0,
+        seed: Optional[int] = None,
+    ):
+        """
+        Initialize fake service
+
+        Args:
+            latency: Seconds added to every request
+            jitter: Random extra latency, up to this many seconds
+            error_rate: Fraction of requests answered with an error
+            seed: Random seed for reproducible jitter and errors
+        """
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.random = random.Random(seed)
+        self.requests = 0
+        self.errors = 0
+        self.app = web.Application(middlewares=[self._inject])
+        self._runner: Optional[web.AppRunner] = None
+        self.url = ""
+
+    @web.middleware
+    async def _inject(self, request: web.Request, handler):
+        """Apply latency and error injection to every request"""
+        self.requests += 1
+        delay = self.latency + self.random.uniform(0, self.jitter)
+        if delay > 0:
+            await asyncio.sleep(delay)
+        if self.error_rate and self.random.random() < self.error_rate:
+            self.errors += 1
+            return self.error_response()
+        return await handler(request)
+
+    def error_response(self) -> web.Response:
+        """Response returned for an injected error"""
+        return web.json_response({"error": "Injected error"}, status=500)
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> str:
+        """
+        Start serving
+
+        Args:
+            host: Interface to bind
+            port: Port to bind (0 picks a free port)
+
+        Returns:
+            Base URL of the running server
+        """
+        self._runner = web.AppRunner(self.app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, host, port)
+        await site.start()
+        bound_host, bound_port = self._runner.addresses[0][:2]
+        self.url = f"http://{bound_host}:{bound_port}"
+        return self.url
+
+    async def stop(self):
+        """Stop serving"""
+        if self._runner:
+            await self._runner.cleanup()
+            self._runner = None
+
+    def stats(self) -> dict:
+        """Request and injected error counts"""
+        return {"requests": self.requests, "errors": self.errors}
+
+
+class FakeTelegram(FakeService):
+    """Telegram Bot API stand-in that records what the bot sends to each chat"""
+
+    name = "telegram"
+
+    def __init__(self, **kwargs):
+        """Initialize fake Telegram API (see FakeService for arguments)"""
+        super().__init__(**kwargs)
+        self._next_message_id = 1
+        # chat_id -> [(monotonic time, method)]
+        self.activity: Dict[int, List[Tuple[float, str]]] = defaultdict(list)
+        self.app.router.add_route("*", "/bot{token}/{method}", self._handle)
+
+    def error_response(self) -> web.Response:
+        """Telegram answers overload with 429 and a retry hint"""
+        return web.json_response(
+            {
+                "ok": False,
+                "error_code": 429,
+                "description": "Too Many Requests: retry after 1",
+                "parameters": {"retry_after": 1},
+            },
+            status=429,
+        )
+
+    async def _payload(self, request: web.Request) -> dict:
+        """Read parameters from the query string, JSON or form body"""
+        payload = dict(request.query)
+        if request.can_read_body:
+            if request.content_type == "application/json":
+                payload.update(await request.json())
+            else:
+                form = await request.post()
+                payload.update({k: v for k, v in form.items() if isinstance(v, str)})
+        return payload
+
+    async def _handle(self, request: web.Request) -> web.Response:
+        """Answer a Bot API method"""
+        method = request.match_info["method"]
+        payload = await self._payload(request)
+        chat_id = payload.get("chat_id")
+        if chat_id is not None:
+            self.activity[int(chat_id)].append((time.monotonic(), method))
+
+        if method in ("sendMessage", "sendDocument"):
+            message_id = self._next_message_id
+            self._next_message_id += 1
+            result = {
+                "message_id": message_id,
+                "date": int(time.time()),
+                "chat": {"id": chat_id, "type": "private"},
+                "text": payload.get("text", ""),
+            }
+        elif method == "editMessageText":
+            result = {
+                "message_id": int(payload.get("message_id", 0)),
+                "chat": {"id": chat_id, "type": "private"},
+                "text": payload.get("text", ""),
+            }
+        elif method == "getMe":
+            result = {"id": 1, "is_bot": True, "first_name": "Fake", "username": "fake_bot"}
+        elif method == "getUpdates":
+            await asyncio.sleep(min(float(payload.get("timeout", 0)), 1.0))
+            result = []
+        else:
+            # deleteMessage, setWebhook, deleteWebhook, ...
+            result = True
+        return web.json_response({"ok": True, "result": result})
+
+
+class FakeGmail(FakeService):
+    """Gmail REST API stand-in serving a generated inbox"""
+
+    name = "gmail"
+
+    def __init__(self, inbox_size: int = 20, **kwargs):
+        """
+        Initialize fake Gmail API
+
+        Args:
+            inbox_size: Number of unread messages in the inbox
+            **kwargs: See FakeService
+        """
+        super().__init__(**kwargs)
+        self.inbox_size = inbox_size
+        self.sent = 0
+        self.batch_items = 0
+        self.item_errors = 0
+        base = "/gmail/v1/users/{user}"
+        self.app.router.add_post("/batch/gmail/v1", self._batch)
+        self.app.router.add_get(base + "/messages", self._list)
+        self.app.router.add_get(base + "/messages/{id}", self._get)
+        self.app.router.add_post(base + "/messages/send", self._send)
+        self.app.router.add_post(base + "/messages/{id}/modify", self._modify)
+        self.app.router.add_post(base + "/drafts", self._draft)
+
+    def error_response(self) -> web.Response:
+        """Gmail answers overload with 503 backendError"""
+        return web.json_response(
+            {"error": {"code": 503, "message": "Injected error", "status": "UNAVAILABLE"}},
+            status=503,
+        )
+
+    def stats(self) -> dict:
+        """Request, error and batch counts"""
+        return {
+            **super().stats(),
+            "batch_items": self.batch_items,
+            "item_errors": self.item_errors,
+        }
+
+    @staticmethod
+    def message(message_id: str) -> dict:
+        """
+        Build a message in Gmail's format=full shape
+
+        The body has a quoted reply chain and a footer, like real mail.
+
+        Args:
+            message_id: Message ID
+
+        Returns:
+            Gmail message resource
+        """
+        body = (
+            f"Hi,\n\nFollowing up on item {message_id}: can you review the attached "
+            "numbers and confirm the schedule by Friday? "
+            + "There are a few open questions on the budget. " * 8
+            + "\n\nThanks,\nAlex\n\n"
+            "On Mon, Jan 6, 2025 at 9:00 AM Sam <sam@example.com> wrote:\n"
+            + "> Earlier message in the thread.\n" * 30
+            + "\nUnsubscribe | Privacy Policy\n"
+        )
+        return {
+            "id": message_id,
+            "threadId": f"t-{message_id}",
+            "labelIds": ["INBOX", "UNREAD"],
+            "payload": {
+                "mimeType": "text/plain",
+                "headers": [
+                    {"name": "Subject", "value": f"Status update {message_id}"},
+                    {"name": "From", "value": "Alex <alex@example.com>"},
+                    {"name": "Date", "value": formatdate(usegmt=True)},
+                ],
+                "body": {"data": base64.urlsafe_b64encode(body.encode()).decode()},
+            },
+        }
+
+    async def _list(self, request: web.Request) -> web.Response:
+        """users.messages.list"""
+        count = min(int(request.query.get("maxResults", 100)), self.inbox_size)
+        messages = [{"id": f"msg{i:04d}", "threadId": f"t-msg{i:04d}"} for i in range(count)]
+        return web.json_response({"messages": messages, "resultSizeEstimate": count})
+
+    async def _get(self, request: web.Request) -> web.Response:
+        """users.messages.get"""
+        return web.json_response(self.message(request.match_info["id"]))
+
+    async def _batch(self, request: web.Request) -> web.Response:
+        """
+        Batch endpoint: a multipart/mixed body of application/http requests
+
+        Only messages.get parts are served. Each part fails on its own with
+        a 503 at the error rate, like Gmail's per-call errors in a batch.
+        """
+        body = await request.read()
+        mime = BytesParser().parsebytes(
+            f"Content-Type: {request.headers['Content-Type']}\r\n\r\n".encode() + body
+        )
+        boundary = f"batch_{self.requests}"
+        parts = []
+        for part in mime.get_payload():
+            self.batch_items += 1
+            request_line = part.get_payload().split("\n", 1)[0]
+            method, path = request_line.split(" ")[:2]
+            match = re.search(r"/messages/([^/?]+)$", path.split("?")[0])
+            if self.error_rate and self.random.random() < self.error_rate:
+                self.item_errors += 1
+                status = "503 Service Unavailable"
+                content = {"error": {"code": 503, "message": "Injected error", "status": "UNAVAILABLE"}}
+            elif method == "GET" and match:
+                status = "200 OK"
+                content = self.message(match.group(1))
+            else:
+                status = "404 Not Found"
+                content = {"error": {"code": 404, "message": "Not found", "status": "NOT_FOUND"}}
+            content_id = part["Content-ID"].strip("<>")
+            parts.append(
+                f"--{boundary}\r\n"
+                "Content-Type: application/http\r\n"
+                f"Content-ID: <response-{content_id}>\r\n\r\n"
+                f"HTTP/1.1 {status}\r\n"
+                "Content-Type: application/json; charset=UTF-8\r\n\r\n"
+                f"{json.dumps(content)}\r\n"
+            )
+        return web.Response(
+            body="".join(parts) + f"--{boundary}--\r\n",
+            headers={"Content-Type": f"multipart/mixed; boundary={boundary}"},
+        )
+
+    async def _send(self, request: web.Request) -> web.Response:
+        """users.messages.send"""
+        self.sent += 1
+        return web.json_response({"id": f"sent{self.sent}", "labelIds": ["SENT"]})
+
+    async def _modify(self, request: web.Request) -> web.Response:
+        """users.messages.modify"""
+        return web.json_response({"id": request.match_info["id"], "labelIds": ["INBOX"]})
+
+    async def _draft(self, request: web.Request) -> web.Response:
+        """users.drafts.create"""
+        return web.json_response({"id": f"draft{self.requests}", "message": {"id": "m"}})
+
+
+class FakeOpenAI(FakeService):
+    """OpenAI chat-completions stand-in with streaming and JSON mode"""
+
+    name = "openai"
+
+    def __init__(self, answer_words: int = 60, token_interval: float = 0.01, **kwargs):
+        """
+        Initialize fake OpenAI API
+
+        Args:
+            answer_words: Words in each generated answer
+            token_interval: Seconds between streamed chunks
+            **kwargs: See FakeService
+        """
+        super().__init__(**kwargs)
+        self.answer_words = answer_words
+        self.token_interval = token_interval
+        self.app.router.add_post("/v1/chat/completions", self._completions)
+
+    def error_response(self) -> web.Response:
+        """OpenAI answers overload with a 500 server_error"""
+        return web.json_response(
+            {"error": {"message": "Injected error", "type": "server_error"}}, status=500
+        )
+
+    def _content(self, body: dict) -> str:
+        """Generate the completion text for a request"""
+        prompt = body["messages"][-1]["content"]
+        if (body.get("response_format") or {}).get("type") == "json_object":
+            ids = re.findall(r"^### (\S+)$", prompt, re.MULTILINE)
+            return json.dumps({"summaries": {i: f"Summary of {i}" for i in ids}})
+        words = f"Fake answer to: {prompt[:40]}".split()
+        words += ["lorem"] * max(self.answer_words - len(words), 0)
+        return " ".join(words[: max(self.answer_words, 1)])
+
+    async def _completions(self, request: web.Request) -> web.StreamResponse:
+        """chat.completions.create"""
+        body = await request.json()
+        content = self._content(body)
+        created = int(time.time())
+        prompt_tokens = sum(len(m["content"]) for m in body["messages"]) // 4 + 1
+        completion_tokens = len(content) // 4 + 1
+        base = {"id": f"chatcmpl-{self.requests}", "created": created, "model": body["model"]}
+
+        if not body.get("stream"):
+            return web.json_response({
+                **base,
+                "object": "chat.completion",
+                "choices": [{
+                    "index": 0,
+                    "message": {"role": "assistant", "content": content},
+                    "finish_reason": "stop",
+                }],
+                "usage": {
+                    "prompt_tokens": prompt_tokens,
+                    "completion_tokens": completion_tokens,
+                    "total_tokens": prompt_tokens + completion_tokens,
+                },
+            })
+
+        response = web.StreamResponse(headers={"Content-Type": "text/event-stream"})
+        await response.prepare(request)
+        for word in content.split(" "):
+            chunk = {
+                **base,
+                "object": "chat.completion.chunk",
+                "choices": [{"index": 0, "delta": {"content": word + " "}, "finish_reason": None}],
+            }
+            await response.write(f"data: {json.dumps(chunk)}\n\n".encode())
+            if self.token_interval:
+                await asyncio.sleep(self.token_interval)
+        final = {
+            **base,
+            "object": "chat.completion.chunk",
+            "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}],
+        }
+        await response.write(f"data: {json.dumps(final)}\n\n".encode())
+        if (body.get("stream_options") or {}).get("include_usage"):
+            usage = {
+                **base,
+                "object": "chat.completion.chunk",
+                "choices": [],
+                "usage": {
+                    "prompt_tokens": prompt_tokens,
+                    "completion_tokens": completion_tokens,
+                    "total_tokens": prompt_tokens + completion_tokens,
+                },
+            }
+            await response.write(f"data: {json.dumps(usage)}\n\n".encode())
+        await response.write(b"data: [DONE]\n\n")
+        await response.write_eof()
+        return response
+
+
+async def _serve(args: argparse.Namespace):
+    """Run all three fakes until interrupted"""
+    options = dict(latency=args.latency, jitter=args.jitter, error_rate=args.error_rate)
+    fakes = [FakeTelegram(**options), FakeGmail(**options), FakeOpenAI(**options)]
+    for offset, fake in enumerate(fakes):
+        await fake.start(port=args.port + offset)
+    telegram, gmail, openai = (fake.url for fake in fakes)
+    print(f"TELEGRAM_API_BASE={telegram}")
+    print(f"GMAIL_API_BASE={gmail}")
+    print(f"OPENAI_BASE_URL={openai}/v1")
+    try:
+        await asyncio.Event().wait()
+    finally:
+        for fake in fakes:
+            await fake.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run fake Telegram, Gmail and OpenAI servers")
+    parser.add_argument("--port", type=int, default=9100, help="First port (Telegram; Gmail +1, OpenAI +2)")
+    parser.add_argument("--latency", type=float, default=0.05, help="Seconds added to every request")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Random extra latency in seconds")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests that fail")
+    try:
+        asyncio.run(_serve(parser.parse_args()))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
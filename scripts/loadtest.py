@@ -0,0 +1,308 @@
+"""
+Load test for the Telegram webhook pipeline against local fake services
+
+Starts fake Telegram, Gmail and OpenAI servers (scripts/fake_services.py),
+runs the app with uvicorn pointed at them, posts updates to
+POST /telegram/webhook at a target rate and reports latency percentiles
+and throughput per intent.
+
+Every update comes from its own chat, so a reply is matched to its update
+by chat id. End-to-end latency runs from posting the update to the last
+message the bot sent or edited in that chat (the final streaming edit for
+streamed answers).
+
+Usage:
+    python scripts/loadtest.py --rate 20 --duration 30
+    python scripts/loadtest.py --rate 50 --openai-latency 0.5 --error-rate 0.02
+
+App settings can be overridden with environment variables as usual
+(e.g. UPDATE_WORKERS=8 STREAM_ANSWERS=false python scripts/loadtest.py).
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from typing import Dict, List, Optional
+
+import aiohttp
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fake_services import FakeGmail, FakeOpenAI, FakeTelegram  # noqa: E402
+
+FIRST_CHAT_ID = 100000
+
+# intent -> message templates ({i} is the request number)
+INTENT_MIX: Dict[str, List[str]] = {
+    "command": ["/start", "/help", "/tasks"],
+    "command_emails": ["/emails"],
+    "ask_question": [
+        "What is the capital of country number {i}?",
+        "Explain how request {i} should be handled",
+    ],
+    "ask_question_cached": ["What is the capital of France?"],
+    "read_emails": ["check my inbox", "any unread emails?"],
+    "schedule_task": ["remind me to call mom about item {i}"],
+    "summary": ["give me a daily summary"],
+}
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """
+    Nearest-rank percentile
+
+    Args:
+        values: Samples
+        pct: Percentile between 0 and 100
+
+    Returns:
+        Percentile value, or 0.0 without samples
+    """
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = max(int(round(pct / 100 * len(ordered) + 0.5)) - 1, 0)
+    return ordered[min(index, len(ordered) - 1)]
+
+
+class Request:
+    """One update sent to the webhook"""
+
+    def __init__(self, number: int, intent: str, text: str):
+        """
+        Initialize request record
+
+        Args:
+            number: Request number (update and message ID)
+            intent: Intent label from INTENT_MIX
+            text: Message text
+        """
+        self.number = number
+        self.intent = intent
+        self.text = text
+        self.chat_id = FIRST_CHAT_ID + number
+        self.sent_at = 0.0
+        self.ack_seconds: Optional[float] = None
+        self.status: Optional[int] = None
+
+    def update(self) -> dict:
+        """Telegram update payload for this request"""
+        user = {"id": self.chat_id, "is_bot": False, "first_name": "Load"}
+        return {
+            "update_id": self.number,
+            "message": {
+                "message_id": self.number,
+                "from": user,
+                "chat": {"id": self.chat_id, "type": "private"},
+                "date": int(time.time()),
+                "text": self.text,
+            },
+        }
+
+
+class ServiceThread:
+    """Runs the fake services on their own event loop, apart from the app under test"""
+
+    def __init__(self):
+        """Initialize service thread"""
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self.loop.run_forever, name="fakes", daemon=True)
+
+    def start(self):
+        """Start the event loop thread"""
+        self.thread.start()
+
+    def call(self, coro):
+        """Run a coroutine on the service loop and wait for its result"""
+        return asyncio.run_coroutine_threadsafe(coro, self.loop).result()
+
+    def stop(self):
+        """Stop the event loop thread"""
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join()
+
+
+def configure_environment(args: argparse.Namespace, fakes: dict, workdir: str):
+    """Point the app at the fakes and an empty database (before importing it)"""
+    os.environ["TELEGRAM_API_BASE"] = fakes["telegram"].url
+    os.environ["GMAIL_API_BASE"] = fakes["gmail"].url
+    os.environ["OPENAI_BASE_URL"] = f"{fakes['openai'].url}/v1"
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(workdir, 'loadtest.db')}"
+    os.environ["TELEGRAM_MODE"] = "webhook"
+    os.environ["SCHEDULER_ENABLED"] = "false"
+    os.environ["GMAIL_ENABLED"] = "true"
+    os.environ.setdefault("TELEGRAM_BOT_TOKEN", "123456:loadtest")
+    os.environ.setdefault("TELEGRAM_USER_ID", str(FIRST_CHAT_ID))
+    os.environ.setdefault("OPENAI_API_KEY", "sk-loadtest")
+    os.environ.setdefault("LOG_LEVEL", args.log_level)
+    os.environ.setdefault("LOG_FILE", os.path.join(workdir, "bot.log"))
+
+
+async def drive(args: argparse.Namespace, app_url: str) -> List[Request]:
+    """Post updates at the target rate and record acknowledgement latency"""
+    intents = list(args.intents or INTENT_MIX)
+    total = int(args.rate * args.duration)
+    requests = []
+    for number in range(1, total + 1):
+        intent = intents[(number - 1) % len(intents)]
+        templates = INTENT_MIX[intent]
+        text = templates[(number // len(intents)) % len(templates)].format(i=number)
+        requests.append(Request(number, intent, text))
+
+    timeout = aiohttp.ClientTimeout(total=60)
+    async with aiohttp.ClientSession(timeout=timeout) as session:
+
+        async def post(request: Request):
+            request.sent_at = time.monotonic()
+            try:
+                async with session.post(
+                    f"{app_url}/telegram/webhook", json=request.update()
+                ) as response:
+                    await response.read()
+                    request.status = response.status
+            except Exception:
+                request.status = 0
+            request.ack_seconds = time.monotonic() - request.sent_at
+
+        started = time.monotonic()
+        tasks = []
+        for index, request in enumerate(requests):
+            delay = started + index / args.rate - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            tasks.append(asyncio.create_task(post(request)))
+        await asyncio.gather(*tasks)
+    return requests
+
+
+async def wait_for_replies(telegram: FakeTelegram, requests: List[Request], args):
+    """Wait until accepted requests got replies and the bot has gone quiet"""
+    accepted = {r.chat_id for r in requests if r.status == 200}
+    deadline = time.monotonic() + args.settle_timeout
+    while time.monotonic() < deadline:
+        replied = accepted.intersection(telegram.activity)
+        last = max((calls[-1][0] for calls in telegram.activity.values()), default=0.0)
+        if len(replied) == len(accepted) and time.monotonic() - last >= args.quiet:
+            return
+        await asyncio.sleep(0.2)
+    print(f"Stopped waiting after {args.settle_timeout}s; some replies may be missing")
+
+
+def report(requests: List[Request], telegram: FakeTelegram, fakes: dict):
+    """Print per-intent latency percentiles and throughput"""
+    started = min(r.sent_at for r in requests)
+    finished = max((calls[-1][0] for calls in telegram.activity.values()), default=started)
+    elapsed = max(finished - started, 1e-9)
+
+    by_intent: Dict[str, List[Request]] = defaultdict(list)
+    for request in requests:
+        by_intent[request.intent].append(request)
+    by_intent["ALL"] = requests
+
+    header = (
+        f"{'intent':22}{'sent':>6}{'ok':>6}{'reply':>7}"
+        f"{'ack p50':>9}{'p95':>8}{'p99':>8}"
+        f"{'e2e p50':>9}{'p95':>8}{'p99':>8}{'rps':>8}"
+    )
+    print()
+    print(header)
+    print("-" * len(header))
+    for intent, group in by_intent.items():
+        acks = [r.ack_seconds for r in group if r.ack_seconds is not None]
+        ok = [r for r in group if r.status == 200]
+        e2e = []
+        for request in ok:
+            calls = telegram.activity.get(request.chat_id)
+            if calls:
+                e2e.append(calls[-1][0] - request.sent_at)
+        ms = lambda values, pct: f"{percentile(values, pct) * 1000:.0f}"  # noqa: E731
+        print(
+            f"{intent:22}{len(group):>6}{len(ok):>6}{len(e2e):>7}"
+            f"{ms(acks, 50):>9}{ms(acks, 95):>8}{ms(acks, 99):>8}"
+            f"{ms(e2e, 50):>9}{ms(e2e, 95):>8}{ms(e2e, 99):>8}"
+            f"{len(e2e) / elapsed:>8.1f}"
+        )
+    print(f"\nLatencies in ms; rps = replies per second over the {elapsed:.1f}s from first update to last reply")
+    statuses = defaultdict(int)
+    for request in requests:
+        statuses[request.status] += 1
+    print(f"Webhook statuses: {dict(statuses)}")
+    for name, fake in fakes.items():
+        print(f"Fake {name}: {fake.stats()}")
+
+
+async def run(args: argparse.Namespace):
+    """Start fakes and app, drive load, report"""
+    import uvicorn
+
+    options = dict(jitter=args.jitter, error_rate=args.error_rate, seed=args.seed)
+    fakes = {
+        "telegram": FakeTelegram(latency=args.telegram_latency, **options),
+        "gmail": FakeGmail(latency=args.gmail_latency, **options),
+        "openai": FakeOpenAI(
+            latency=args.openai_latency, token_interval=args.token_interval, **options
+        ),
+    }
+    services = ServiceThread()
+    services.start()
+    for fake in fakes.values():
+        services.call(fake.start())
+
+    with tempfile.TemporaryDirectory() as workdir:
+        configure_environment(args, fakes, workdir)
+        from main import app
+
+        config = uvicorn.Config(
+            app, host="127.0.0.1", port=args.port, log_level="warning", lifespan="on"
+        )
+        server = uvicorn.Server(config)
+        server_task = asyncio.create_task(server.serve())
+        try:
+            while not server.started:
+                if server_task.done():
+                    return
+                await asyncio.sleep(0.05)
+
+            print(
+                f"Driving {args.rate:g} updates/s for {args.duration:g}s "
+                f"at http://127.0.0.1:{args.port}/telegram/webhook"
+            )
+            requests = await drive(args, f"http://127.0.0.1:{args.port}")
+            await wait_for_replies(fakes["telegram"], requests, args)
+            report(requests, fakes["telegram"], fakes)
+        finally:
+            server.should_exit = True
+            await server_task
+            for fake in fakes.values():
+                services.call(fake.stop())
+            services.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the webhook pipeline")
+    parser.add_argument("--rate", type=float, default=20.0, help="Updates per second")
+    parser.add_argument("--duration", type=float, default=30.0, help="Seconds of load")
+    parser.add_argument(
+        "--intents", nargs="+", choices=sorted(INTENT_MIX), help="Intents to mix (default: all)"
+    )
+    parser.add_argument("--port", type=int, default=8787, help="Port for the app under test")
+    parser.add_argument("--telegram-latency", type=float, default=0.03)
+    parser.add_argument("--gmail-latency", type=float, default=0.08)
+    parser.add_argument("--openai-latency", type=float, default=0.3, help="Time to first token")
+    parser.add_argument("--token-interval", type=float, default=0.01, help="Seconds per streamed chunk")
+    parser.add_argument("--jitter", type=float, default=0.02, help="Random extra latency for all fakes")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of fake calls that fail")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--quiet", type=float, default=2.0, help="Idle seconds that end the run")
+    parser.add_argument("--settle-timeout", type=float, default=60.0, help="Max seconds to wait for replies")
+    parser.add_argument("--log-level", default="WARNING", help="App log level")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()